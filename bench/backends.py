@@ -0,0 +1,269 @@
+# backends.py
+# What the accelerated backends in utils/speedups.py buy on this machine.
+# Every installed combination of event loop (asyncio, uvloop) and JSON codec
+# (json, orjson) runs in its own process, since the shim picks its backends
+# at import, and each reports:
+#
+#   message throughput  bench.messages' unpaced run for each chat-driven game
+#   data load           parsing the JSON catalogs (the fallback when the data
+#                       pack is stale), compiling the data pack, saving and
+#                       loading guild config and quiz rotations, writing and
+#                       reading a raid handoff file, formatting log lines
+#
+#   python -m bench.backends
+#   python -m bench.backends --games gtn flquiz --repeat 50
+#   python -m bench.backends --json results.json
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+LOOPS = ("asyncio", "uvloop")
+CODECS = ("json", "orjson")
+DEFAULT_GAMES = ("gtn", "flquiz", "gtm", "bingo")
+DEFAULT_REPEAT = 20  # timed runs per data operation; the median is reported
+NOISE = 5  # percent; smaller changes aren't marked better or worse
+GUILDS = 500  # guilds in the saved guild config and quiz rotations
+RAID_PLAYERS = 80  # players in the handoff file
+LOG_LINES = 1000  # log records formatted per timed run
+
+
+def _installed(backend: str) -> bool:
+    return backend in ("asyncio", "json") or importlib.util.find_spec(backend) is not None
+
+
+# ---------- Child process: one combination ----------
+def _handoff_state() -> dict:
+    """
+    A handoff file as written mid-raid: the shape of Handover.hand_over's
+    state, with the raid as RaidBoss.export_session writes it. Needs a
+    running loop, since discord.py views do.
+    """
+    from cogs.games.raid_boss import RaidButtons
+    from utils.handover import saved_view
+
+    players = {
+        str(10_000 + n): {
+            "id": 10_000 + n,
+            "name": f"Player {n} ✦",
+            "hp": 1750 - n * 7,
+            "max_hp": 1750,
+            "atk": 90 + n,
+            "defense": 70 + n,
+            "alive": n % 9 != 0,
+            "defending": n % 4 == 0,
+            "action": None,
+            "afk_streak": n % 3,
+            "damage": n * 1234,
+        }
+        for n in range(RAID_PLAYERS)
+    }
+    raid = {
+        "channel_id": 201,
+        "started_by": 10_000,
+        "boss": {"name": "Baphomet", "hp": 4_500_000, "max_hp": 9_000_000, "atk": 900, "defense": 400, "image": "https://example.com/baphomet.png", "berserk": False},
+        "players": players,
+        "player_order": [int(pid) for pid in players],
+        "turn": 12,
+        "choices": {pid: "attack" for pid in list(players)[::2]},
+        "view": saved_view(RaidButtons(), 1 << 60),
+        "turn_ends_at": time.time() + 20,
+    }
+    gateway = {
+        "session_id": "0" * 32,
+        "sequence": 123_456,
+        "resume_url": "wss://gateway-us-east1-b.discord.gg",
+        "guild_ids": [(1 << 40) + n for n in range(GUILDS)],
+    }
+    return {"written_at": time.time(), "gateway": gateway, "games": {"raid": [raid]}}
+
+
+def _data_ops(folder: str) -> dict[str, typing.Callable[[], object]]:
+    from utils import datapack, gamedata
+    from utils.guild_config import GuildConfigStore, GuildSettings
+    from utils.log import JsonFormatter
+    from utils.question_bank import QuestionBank, Rotation, _pool_key
+    from utils.speedups import json_dump, json_load
+
+    catalogs = (
+        (gamedata.MONSTER_DATA_FILE, gamedata.Monster.from_dict, "monsters"),
+        (gamedata.BOSS_FILE, gamedata.Boss.from_dict, "bosses"),
+        (gamedata.QUESTION_FILE, gamedata.Question.from_dict, "questions"),
+    )
+
+    store = GuildConfigStore(os.path.join(folder, "guild_config.json"))
+    store.guilds = {gid: GuildSettings(gid * 3, gid * 5, [gid * 7, gid * 11]) for gid in range(1 << 40, (1 << 40) + GUILDS)}
+
+    questions = gamedata._load(gamedata.QUESTION_FILE, gamedata.Question.from_dict, "questions")
+    bank = QuestionBank(questions, os.path.join(folder, "flquiz_rotation.json"))
+    bank.rotations = {
+        gid: {_pool_key(None, None): Rotation.fresh(len(questions)), _pool_key("lore", "hard"): Rotation.fresh(20)}
+        for gid in range(1 << 40, (1 << 40) + GUILDS)
+    }
+
+    handoff_path = os.path.join(folder, "handover.json")
+    handoff = _handoff_state()
+
+    def write_read_handoff():
+        with open(handoff_path, "w", encoding="utf-8") as f:
+            json_dump(handoff, f)
+        with open(handoff_path, "r", encoding="utf-8") as f:
+            return json_load(f)
+
+    formatter = JsonFormatter()
+    records = []
+    for i in range(LOG_LINES):
+        record = logging.LogRecord("cogs.games.gtn", logging.INFO, __file__, 0, "guess handled", None, None)
+        record.__dict__.update({"guild": 1 << 40, "channel": 201, "user": 10_000 + i, "guess": i, "hint": "higher", "ms": 0.42})
+        records.append(record)
+
+    return {
+        "catalogs from JSON": lambda: [gamedata._load(*catalog) for catalog in catalogs],
+        "data pack build": lambda: datapack.build(os.path.join(folder, "gamedata.pack")),
+        f"guild config save+load ({GUILDS})": lambda: (store.file.write(store.to_dict()), store.load()),
+        f"quiz rotation save+load ({GUILDS})": lambda: (bank.file.write(bank.to_dict()), bank.load()),
+        f"raid handoff write+read ({RAID_PLAYERS})": write_read_handoff,
+        f"log lines ({LOG_LINES})": lambda: [formatter.format(record) for record in records],
+    }
+
+
+def _time_ms(op: typing.Callable[[], object], repeat: int) -> float:
+    op()  # warm up caches and lazy imports
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        op()
+        runs.append(time.perf_counter() - started)
+    return statistics.median(runs) * 1000
+
+
+async def _child(games: list[str], repeat: int) -> dict:
+    from bench import messages
+    from utils import speedups
+
+    result = {"backends": speedups.describe(), "data_ms": {}, "messages": {}}
+    with tempfile.TemporaryDirectory(prefix="backends-") as folder:
+        for name, op in _data_ops(folder).items():
+            result["data_ms"][name] = _time_ms(op, repeat)
+    for game in games:
+        run = (await messages.bench(game, ["max"], messages.RUN_SECONDS))[0]
+        result["messages"][game] = {"achieved": run["achieved"], "p50_us": run["p50_us"], "p99_us": run["p99_us"]}
+    return result
+
+
+def _run_child(args) -> None:
+    from utils import speedups
+
+    logging.disable(logging.WARNING)  # the catalogs' skipped-entry warnings, once per timed run
+
+    result = speedups.run(_child(args.games, args.repeat))
+    with open(args.child, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ---------- Parent: every combination ----------
+def _combination(loop: str, codec: str, args) -> typing.Optional[dict]:
+    with tempfile.TemporaryDirectory(prefix="backends-") as folder:
+        out = os.path.join(folder, "result.json")
+        env = dict(
+            os.environ,
+            BOT_EVENT_LOOP=loop,
+            BOT_JSON=codec,
+            BOT_DATA_DIR=folder,
+            BOT_LOOP_WATCHDOG="0",
+            BOT_MEMORY_WATCH="0",
+        )
+        env.pop("BOT_TRACE_FILE", None)
+        command = [sys.executable, "-m", "bench.backends", "--child", out, "--repeat", str(args.repeat), "--games", *args.games]
+        completed = subprocess.run(command, env=env)
+        if completed.returncode != 0:
+            print(f"{loop} + {codec}: benchmark process failed (exit {completed.returncode})", file=sys.stderr)
+            return None
+        with open(out, "r", encoding="utf-8") as f:
+            result = json.load(f)
+    if result["backends"] != {"loop": loop, "json": codec}:
+        print(f"{loop} + {codec}: ran on {result['backends']} instead; check utils/speedups.py", file=sys.stderr)
+        return None
+    return result
+
+
+def _change(new: float, base: float, higher_is_better: bool) -> str:
+    if not base:
+        return ""
+    change = (new - base) / base * 100
+    better = change > 0 if higher_is_better else change < 0
+    return f" ({change:+.0f}%{'' if abs(change) < NOISE else ' ✓' if better else ' ✗'})"
+
+
+def report(results: dict[str, dict]):
+    labels = list(results)
+    baseline = results.get(labels[0])
+    rows = [("", *labels)]
+    first = next(iter(results.values()))
+    rows.append(("data load, median ms", *[""] * len(labels)))
+    for name in first["data_ms"]:
+        cells = []
+        for label in labels:
+            ms = results[label]["data_ms"][name]
+            cells.append(f"{ms:,.2f}" + ("" if label == labels[0] else _change(ms, baseline["data_ms"][name], False)))
+        rows.append((f"  {name}", *cells))
+    rows.append(("messages/s, unpaced", *[""] * len(labels)))
+    for game in first["messages"]:
+        cells = []
+        for label in labels:
+            rate = results[label]["messages"][game]["achieved"]
+            cells.append(f"{rate:,.0f}" + ("" if label == labels[0] else _change(rate, baseline["messages"][game]["achieved"], True)))
+        rows.append((f"  {game}", *cells))
+    rows.append(("messages p99 µs", *[""] * len(labels)))
+    for game in first["messages"]:
+        cells = []
+        for label in labels:
+            p99 = results[label]["messages"][game]["p99_us"]
+            cells.append(f"{p99:,.1f}" + ("" if label == labels[0] else _change(p99, baseline["messages"][game]["p99_us"], False)))
+        rows.append((f"  {game}", *cells))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths))))
+
+
+def main(argv: typing.Optional[list[str]] = None):
+    from bench.messages import SCENARIOS
+
+    parser = argparse.ArgumentParser(prog="python -m bench.backends", description="Compare the event loop and JSON backends utils/speedups.py can use.")
+    parser.add_argument("--games", nargs="+", choices=sorted(SCENARIOS), default=list(DEFAULT_GAMES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per data operation")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)  # internal: run one combination, write results here
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return _run_child(args)
+
+    results = {}
+    for loop in LOOPS:
+        for codec in CODECS:
+            missing = [backend for backend in (loop, codec) if not _installed(backend)]
+            if missing:
+                print(f"skipping {loop} + {codec}: {', '.join(missing)} not installed")
+                continue
+            result = _combination(loop, codec, args)
+            if result is not None:
+                results[f"{loop} + {codec}"] = result
+    if not results:
+        return
+    report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
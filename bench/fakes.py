@@ -0,0 +1,129 @@
+# fakes.py
+# Minimal stand-ins for the discord objects game handlers touch, so the
+# benchmarks can drive cogs with no gateway connection and no REST calls.
+# Sends are counted, not stored, so long runs don't grow memory.
+
+import asyncio
+import itertools
+import typing
+
+import discord
+from discord.ext import commands
+
+from utils.guild_config import get_guild_config
+
+GUILD_ID = 1
+CHANNEL_ID = 2
+MOD_ROLE_ID = 3
+
+_snowflakes = itertools.count(1 << 40)
+
+
+def snowflake() -> int:
+    """Increasing ids, like message snowflakes sent one after another."""
+    return next(_snowflakes)
+
+
+class FakeRole:
+    __slots__ = ("id",)
+
+    def __init__(self, id: int):
+        self.id = id
+
+
+class FakeGuild:
+    __slots__ = ("id",)
+
+    def __init__(self, id: int = GUILD_ID):
+        self.id = id
+
+
+class FakeUser:
+    __slots__ = ("id", "name", "display_name", "mention", "bot", "roles", "guild")
+
+    def __init__(self, id: int, guild: FakeGuild, mod: bool = False, bot: bool = False):
+        self.id = id
+        self.name = self.display_name = f"user{id}"
+        self.mention = f"<@{id}>"
+        self.bot = bot
+        self.roles = [FakeRole(MOD_ROLE_ID)] if mod else []
+        self.guild = guild
+
+
+class FakeMessage:
+    __slots__ = ("id", "channel", "author", "content", "embeds")
+
+    def __init__(self, channel: "FakeChannel", author: FakeUser, content: typing.Optional[str] = None, embeds: list = ()):
+        self.id = snowflake()
+        self.channel = channel
+        self.author = author
+        self.content = content or ""
+        self.embeds = list(embeds)
+
+    async def edit(self, **kwargs):
+        pass
+
+    async def add_reaction(self, emoji):
+        pass
+
+
+class FakeChannel:
+    def __init__(self, guild: FakeGuild, id: int = CHANNEL_ID):
+        self.id = id
+        self.guild = guild
+        self.sends = 0
+        self.me = FakeUser(0, guild, bot=True)
+        self._waiters: list[tuple[int, asyncio.Future]] = []
+
+    async def send(self, content=None, **kwargs) -> FakeMessage:
+        self.sends += 1
+        if self._waiters:
+            waiting = []
+            for count, future in self._waiters:
+                if self.sends >= count and not future.done():
+                    future.set_result(None)
+                elif not future.done():
+                    waiting.append((count, future))
+            self._waiters = waiting
+        embed = kwargs.get("embed")
+        return FakeMessage(self, self.me, content, kwargs.get("embeds") or ([embed] if embed else []))
+
+    async def wait_sends(self, count: int):
+        """Wait until `count` messages have been sent here in total."""
+        if self.sends >= count:
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((count, future))
+        await future
+
+
+class FakeContext:
+    """Enough of commands.Context for a command callback invoked directly."""
+
+    def __init__(self, channel: FakeChannel, author: FakeUser):
+        self.channel = channel
+        self.author = author
+        self.guild = channel.guild
+        self.interaction = None
+
+    async def send(self, content=None, ephemeral: bool = False, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+    async def reply(self, content=None, mention_author: bool = True, ephemeral: bool = False, **kwargs):
+        return await self.channel.send(content, **kwargs)
+
+
+async def make_bot(*cog_classes) -> commands.Bot:
+    """
+    A bot that never logs in, with the given cogs added and the fake channel
+    configured as a game channel (in memory only; nothing is saved).
+    """
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+    # Binds the client to the running loop as login would; dispatch and wait_for need it
+    await bot._async_setup_hook()
+    settings = get_guild_config(bot).edit(GUILD_ID)
+    settings.mod_role_id = MOD_ROLE_ID
+    settings.channel_ids = {CHANNEL_ID}
+    for cog_class in cog_classes:
+        await bot.add_cog(cog_class(bot))
+    return bot
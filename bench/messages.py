@@ -0,0 +1,321 @@
+# messages.py
+# Per-message cost of each game's hot path: the handler a chat message or
+# command hits while a game is running, driven with fake messages at a fixed
+# offered rate. Reports latency, throughput and allocations per game.
+#
+#   python -m bench.messages                      # every game at 1k, 10k and 100k msgs/s, then unpaced
+#   python -m bench.messages --games gtn flquiz --rates 5000 max
+#   python -m bench.messages --json after.json --baseline before.json
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import typing
+
+from cogs.games.bingo import Bingo
+from cogs.games.flquiz import FLQuiz
+from cogs.games.gtm import MonsterQuiz
+from cogs.games.gtn import NumberGuess
+from utils.gamedata import normalize_answer
+
+from bench.fakes import FakeChannel, FakeContext, FakeGuild, FakeMessage, FakeUser, make_bot
+
+DEFAULT_RATES = ("1000", "10000", "100000", "max")
+RUN_SECONDS = 1.0  # offered load per paced run
+UNPACED_MESSAGES = 20000
+MIN_MESSAGES = 1000
+ALLOC_MESSAGES = 2000  # messages in the separate tracemalloc pass
+PLAYERS = 300  # distinct authors cycling through the messages
+GTN_TARGET = 1013
+BINGO_CARDS = 500
+BINGO_CALLED = 20  # numbers called before the run; too few for a blackout win
+SATURATED = 0.95  # achieved / offered below this marks the run as saturated
+
+
+class Scenario:
+    """One game's per-message path, set up against a fresh bot."""
+
+    name = ""
+
+    async def setup(self):
+        self.guild = FakeGuild()
+        self.channel = FakeChannel(self.guild)
+        self.mod = FakeUser(1, self.guild, mod=True)
+        self.players = [FakeUser(1000 + i, self.guild) for i in range(PLAYERS)]
+        self.rng = random.Random(42)
+
+    def event(self, i: int):
+        """The input for message `i`, built before timing starts."""
+        raise NotImplementedError
+
+    async def handle(self, event):
+        raise NotImplementedError
+
+    async def teardown(self):
+        pass
+
+
+class GuessNumber(Scenario):
+    """NumberGuess.on_message: parse, compare, send a hint. One in ten messages is chatter."""
+
+    name = "gtn"
+
+    async def setup(self):
+        await super().setup()
+        bot = await make_bot(NumberGuess)
+        self.cog = bot.get_cog("NumberGuess")
+        self.cog.sessions.start(self.channel, self.mod.id, target=GTN_TARGET)
+
+    def event(self, i):
+        if i % 10 == 9:
+            content = "good luck everyone"
+        else:
+            guess = self.rng.randint(1, 2025)  # anything but the target, so the game keeps running
+            content = str(guess + 1 if guess >= GTN_TARGET else guess)
+        return FakeMessage(self.channel, self.players[i % PLAYERS], content)
+
+    async def handle(self, message):
+        await self.cog.on_message(message)
+
+
+class _AnswerScenario(Scenario):
+    """Games that dispatch chat as game_answer to a wait_for loop; done when the reply is sent."""
+
+    async def handle(self, message):
+        replied = self.channel.sends + 1
+        await self.cog.on_message(message)
+        await self.channel.wait_sends(replied)
+
+    def event(self, i):
+        return FakeMessage(self.channel, self.players[i % PLAYERS], f"  Not The Answer {i % 50}  ")
+
+    async def teardown(self):
+        self.session.ended = True
+        self.task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self.task
+
+
+class QuizAnswer(_AnswerScenario):
+    """FLQuiz: on_message → dispatch → wait_for check → lock → normalize → "wrong answer" reply."""
+
+    name = "flquiz"
+
+    async def setup(self):
+        await super().setup()
+        bot = await make_bot(FLQuiz)
+        self.cog = bot.get_cog("FLQuiz")
+        self.task = asyncio.create_task(FLQuiz.start_flquiz.callback(self.cog, FakeContext(self.channel, self.mod), 1))
+        await self.channel.wait_sends(2)  # intro, then the first question
+        await asyncio.sleep(0.05)  # let the question loop reach wait_for
+        self.session = self.cog.sessions.get(self.channel)
+
+
+class MonsterAnswer(_AnswerScenario):
+    """MonsterQuiz: on_message → dispatch → wait_for check → lock → answer set lookup → reply."""
+
+    name = "gtm"
+
+    async def setup(self):
+        await super().setup()
+        bot = await make_bot(MonsterQuiz)
+        self.cog = bot.get_cog("MonsterQuiz")
+        if not self.cog.monsters:
+            raise RuntimeError("no monster data")
+        self.session = self.cog.sessions.start(self.channel, self.mod.id)
+        monster = self.cog.monsters[0]
+        self.session.round = {"monster": monster, "guessed": False}
+        self.task = asyncio.create_task(self.cog._wait_for_guess(self.channel, self.session, monster))
+        await asyncio.sleep(0)
+
+
+class Normalize(Scenario):
+    """normalize_answer on its own, over catalog names with stray case and spacing."""
+
+    name = "normalize"
+
+    async def setup(self):
+        await super().setup()
+        bot = await make_bot(MonsterQuiz)
+        names = [name for monster in bot.get_cog("MonsterQuiz").monsters for name in monster.names] or ["Poring"]
+        self.samples = [f"  {name.upper() if i % 2 else name}  " for i, name in enumerate(names)]
+
+    def event(self, i):
+        return self.samples[i % len(self.samples)]
+
+    async def handle(self, text):
+        normalize_answer(text)
+
+
+class _BingoScenario(Scenario):
+    async def setup(self):
+        await super().setup()
+        bot = await make_bot(Bingo)
+        self.cog = bot.get_cog("Bingo")
+        self.game = self.cog.sessions.start(self.channel, self.mod.id, pattern="blackout")
+        self.players = [FakeUser(1000 + i, self.guild) for i in range(BINGO_CARDS)]
+        for player in self.players:
+            self.game.register_card(player.id, self.cog.generate_card())
+        for number in self.rng.sample(sorted(self.game.number_index), BINGO_CALLED):
+            self.game.mark_number(number)
+
+    def event(self, i):
+        return FakeContext(self.channel, self.players[i % len(self.players)])
+
+
+class BingoCall(_BingoScenario):
+    """!bingo: membership, check_bingo against the line counters, reply."""
+
+    name = "bingo"
+
+    async def handle(self, ctx):
+        await Bingo.call_bingo.callback(self.cog, ctx)
+
+
+class BingoNumbers(_BingoScenario):
+    """!bingonumbers: group, sort and format the called numbers."""
+
+    name = "bingonumbers"
+
+    async def handle(self, ctx):
+        await Bingo.show_called_numbers.callback(self.cog, ctx)
+
+
+SCENARIOS = {s.name: s for s in (GuessNumber, QuizAnswer, MonsterAnswer, Normalize, BingoCall, BingoNumbers)}
+
+
+def _percentile(samples: list[float], q: int) -> float:
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1] if len(samples) > 1 else samples[0]
+
+
+async def _drive(scenario: Scenario, events: list, rate: typing.Optional[float]) -> tuple[list[float], list[float], float]:
+    """
+    Feed events at `rate` per second (None: back to back). When the handler
+    falls behind, latency counts from when the event was due, so queueing
+    shows up; when the driver had to wait, it counts from the send (sleep
+    overshoot is the driver's, not the handler's).
+    """
+    latency, service = [], []
+    clock = time.perf_counter
+    start = clock()
+    for i, event in enumerate(events):
+        due = start + i / rate if rate else clock()
+        now = clock()
+        if now < due:
+            await asyncio.sleep(due - now)
+        began = clock()
+        await scenario.handle(event)
+        done = clock()
+        latency.append(done - min(due, began) if now >= due else done - began)
+        service.append(done - began)
+    return latency, service, clock() - start
+
+
+async def _allocations(scenario: Scenario, count: int) -> tuple[float, float]:
+    """(peak KiB above the starting point, bytes kept per message) over `count` unpaced messages."""
+    events = [scenario.event(i) for i in range(count)]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for event in events:
+            await scenario.handle(event)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak - before) / 1024, (current - before) / count
+
+
+async def bench(name: str, rates: list[str], seconds: float) -> list[dict]:
+    scenario = SCENARIOS[name]()
+    await scenario.setup()
+    results = []
+    try:
+        for _ in range(200):  # warm caches and lazy setup before measuring
+            await scenario.handle(scenario.event(0))
+        for rate_text in rates:
+            rate = None if rate_text == "max" else float(rate_text)
+            count = UNPACED_MESSAGES if rate is None else max(MIN_MESSAGES, int(rate * seconds))
+            events = [scenario.event(i) for i in range(count)]
+            latency, service, elapsed = await _drive(scenario, events, rate)
+            achieved = count / elapsed
+            results.append({
+                "game": name,
+                "rate": rate_text,
+                "messages": count,
+                "achieved": achieved,
+                "saturated": rate is not None and achieved < rate * SATURATED,
+                "p50_us": _percentile(latency, 50) * 1e6,
+                "p99_us": _percentile(latency, 99) * 1e6,
+                "max_us": max(latency) * 1e6,
+                "service_p50_us": _percentile(service, 50) * 1e6,
+            })
+        peak_kib, kept = await _allocations(scenario, ALLOC_MESSAGES)
+        for result in results:
+            result["alloc_peak_kib"] = peak_kib
+            result["kept_bytes_per_msg"] = kept
+    finally:
+        await scenario.teardown()
+    return results
+
+
+def _change(new: float, old: typing.Optional[float]) -> str:
+    if not old:
+        return ""
+    return f" ({(new - old) / old * 100:+.0f}%)"
+
+
+def report(results: list[dict], baseline: typing.Optional[dict] = None):
+    columns = ("game", "rate", "achieved/s", "p50 µs", "p99 µs", "max µs", "svc p50 µs", "peak KiB", "kept B/msg")
+    rows = []
+    for r in results:
+        old = (baseline or {}).get((r["game"], r["rate"]), {})
+        rows.append((
+            r["game"],
+            r["rate"],
+            f"{r['achieved']:,.0f}{'*' if r['saturated'] else ''}{_change(r['achieved'], old.get('achieved'))}",
+            f"{r['p50_us']:,.1f}{_change(r['p50_us'], old.get('p50_us'))}",
+            f"{r['p99_us']:,.1f}{_change(r['p99_us'], old.get('p99_us'))}",
+            f"{r['max_us']:,.0f}",
+            f"{r['service_p50_us']:,.1f}{_change(r['service_p50_us'], old.get('service_p50_us'))}",
+            f"{r['alloc_peak_kib']:.1f}",
+            f"{r['kept_bytes_per_msg']:.1f}",
+        ))
+    widths = [max(len(row[i]) for row in rows + [columns]) for i in range(len(columns))]
+    for row in [columns] + rows:
+        print("  ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths))))
+    if any(r["saturated"] for r in results):
+        print("* handler could not keep up with the offered rate; latency includes queueing")
+
+
+async def main(argv: typing.Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m bench.messages", description="Per-message cost of each game's hot path.")
+    parser.add_argument("--games", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--rates", nargs="+", default=list(DEFAULT_RATES), help="messages per second, or 'max' for unpaced")
+    parser.add_argument("--seconds", type=float, default=RUN_SECONDS, help="offered load per paced run")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = {(r["game"], r["rate"]): r for r in json.load(f)}
+
+    results = []
+    for name in args.games:
+        results.extend(await bench(name, args.rates, args.seconds))
+    report(results, baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
@@ -0,0 +1,389 @@
+# replay.py
+# End-to-end load test: replays an event trace against the real bot (every
+# cog from bot.py) wired to the in-process Discord stub, on an event loop
+# whose clock runs `--speed` times faster than real time. Reports REST calls,
+# 429s and latency per route, and how quickly interactions were answered.
+#
+#   python -m bench.replay gtn-300                       # synthetic: 300 users sweep the range
+#   python -m bench.replay raid-80 --speed 40            # synthetic: 80-player raid with button storms
+#   python -m bench.replay raid-80 --write-trace raid.jsonl
+#   python -m bench.replay raid.jsonl --calls-out calls.jsonl
+#   python -m bench.replay gtn-300 --spans-out spans.json   # per-command latency spans (see utils/tracing.py)
+#
+# A trace is JSON lines, one event each, with "at" in virtual seconds:
+#
+#   {"at": 0, "type": "message", "user": 0, "content": "!gtn"}
+#   {"at": 5, "type": "reaction", "user": 3, "emoji": "✅", "title": "Raid Starting"}
+#   {"at": 6, "type": "button", "user": 4, "label": "Join"}
+#   {"at": 7, "type": "modal", "user": 5, "label": "Answer", "value": "1013"}
+#   {"at": 8, "type": "slash", "user": 6, "name": "mystats", "options": {}}
+#
+# "title" (a regex on embed titles) picks the target message; without it the
+# latest message with the button is used. With "after": "<regex>", "at" counts
+# from when a bot message with a matching title appears, e.g. a raid turn.
+# User 0 holds the moderator role.
+
+import argparse
+import asyncio
+import collections
+import json
+import os
+import random
+import selectors
+import statistics
+import sys
+import tempfile
+import time
+import typing
+
+import discord
+from discord.webhook.async_ import AsyncWebhookAdapter
+
+from bench.stub import CHANNEL_ID, GUILD_ID, MOD_ROLE_ID, FakeDiscord
+
+DEFAULT_SPEED = 20.0
+ANCHOR_TIMEOUT = 60.0  # virtual seconds without any event played before waiting "after" groups are given up
+SETTLE_TIMEOUT = 60.0  # virtual seconds after the last event for queued requests to drain
+MODAL_TIMEOUT = 3.0  # virtual seconds for the bot to open a modal
+TYPING_DELAY = 2.0  # virtual seconds between a modal opening and its submission
+ACK_DEADLINE = 3.0  # Discord fails interactions not answered within this
+SEED = 42
+
+
+class _ScaledSelector(selectors.BaseSelector):
+    """Wraps the loop's selector so waits last 1/speed of the requested time."""
+
+    def __init__(self, speed: float):
+        self.speed = speed
+        self.inner = selectors.DefaultSelector()
+
+    def register(self, fileobj, events, data=None):
+        return self.inner.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self.inner.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self.inner.modify(fileobj, events, data)
+
+    def select(self, timeout=None):
+        return self.inner.select(None if timeout is None else timeout / self.speed)
+
+    def close(self):
+        self.inner.close()
+
+    def get_map(self):
+        return self.inner.get_map()
+
+
+class AcceleratedLoop(asyncio.SelectorEventLoop):
+    """An event loop whose clock runs `speed` times faster; sleeps, timers and view timeouts all follow it."""
+
+    def __init__(self, speed: float):
+        super().__init__(_ScaledSelector(speed))
+        self.speed = speed
+        self._origin = time.monotonic()
+
+    def time(self) -> float:
+        return self._origin + (time.monotonic() - self._origin) * self.speed
+
+
+# ---------- Synthetic traces ----------
+def gtn_trace(users: int = 300, rng: typing.Optional[random.Random] = None) -> list[dict]:
+    """
+    One Guess the Number game: players sweep 1–2026 between them (so someone
+    hits the target), mostly in chat, some through the Answer modal, with chatter.
+    """
+    rng = rng or random.Random(SEED)
+    events = [{"at": 0.0, "type": "message", "user": 0, "content": "!gtn"}]
+    guesses = list(range(1, 2027))
+    rng.shuffle(guesses)
+    for i, guess in enumerate(guesses):
+        user = 1 + i % users
+        at = round(2.0 + rng.uniform(0, 100), 3)
+        if rng.random() < 0.15:
+            events.append({"at": at, "type": "modal", "user": user, "label": "Answer", "value": str(guess)})
+        else:
+            events.append({"at": at, "type": "message", "user": user, "content": str(guess)})
+        if rng.random() < 0.1:
+            events.append({"at": at + 0.5, "type": "message", "user": user, "content": "so close"})
+    return sorted(events, key=lambda e: e["at"])
+
+
+def raid_trace(players: int = 80, turns: int = 30, rng: typing.Optional[random.Random] = None) -> list[dict]:
+    """
+    One raid: players join through the Join button or the ✅ reaction, then
+    every turn most of them press an action, some twice, with /mystats and
+    /raidstatus checks mixed in.
+    """
+    rng = rng or random.Random(SEED)
+    events = [{"at": 0.0, "type": "message", "user": 0, "content": "!raidstart"}]
+    for user in range(1, players + 1):
+        at = round(rng.uniform(0.5, 45), 3)
+        if rng.random() < 0.3:
+            events.append({"at": at, "type": "reaction", "user": user, "emoji": "✅", "title": "Raid Starting"})
+        else:
+            events.append({"at": at, "type": "button", "user": user, "label": "Join"})
+    for turn in range(1, turns + 1):
+        after = f"Raid Turn {turn}$"
+        for user in range(1, players + 1):
+            if rng.random() < 0.05:
+                continue  # AFK this turn
+            presses = 2 if rng.random() < 0.1 else 1
+            for _ in range(presses):
+                label = rng.choices(["Attack", "Heal", "Defend"], weights=[0.65, 0.15, 0.2])[0]
+                events.append({"at": round(rng.uniform(0.2, 9.5), 3), "after": after, "type": "button", "user": user, "label": label})
+        for _ in range(3):
+            events.append({"at": round(rng.uniform(0.2, 9.5), 3), "after": after, "type": "slash", "user": rng.randint(1, players), "name": "mystats"})
+        events.append({"at": round(rng.uniform(0.2, 9.5), 3), "after": after, "type": "slash", "user": rng.randint(1, players), "name": "raidstatus"})
+    return events
+
+
+SYNTHETIC = {
+    "gtn-300": lambda: gtn_trace(300),
+    "raid-80": lambda: raid_trace(80),
+}
+
+
+def load_trace(source: str) -> list[dict]:
+    if source in SYNTHETIC:
+        return SYNTHETIC[source]()
+    with open(source, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ---------- Replay ----------
+class Replay:
+    def __init__(self, bot, stub: FakeDiscord, trace: list[dict]):
+        self.bot = bot
+        self.stub = stub
+        self.trace = trace
+        self.fired = 0
+        self.skipped: collections.Counter = collections.Counter()  # reason -> events not delivered
+        self.client_latency: dict[tuple[str, str], list[float]] = collections.defaultdict(list)
+        self.in_flight = 0
+        self.last_played = 0.0
+        self._tasks: set[asyncio.Task] = set()
+
+    def user_count(self) -> int:
+        return max((e.get("user", 0) for e in self.trace), default=0) + 1
+
+    def instrument(self):
+        """Time every REST call from the bot's side, retries and rate limit waits included."""
+        loop = asyncio.get_running_loop()
+        replay = self
+
+        def timed(request):
+            async def wrapper(*args, **kwargs):
+                route = next(a for a in args if isinstance(a, discord.http.Route))
+                started = loop.time()
+                replay.in_flight += 1
+                try:
+                    return await request(*args, **kwargs)
+                finally:
+                    replay.in_flight -= 1
+                    replay.client_latency[(route.method, route.path)].append(loop.time() - started)
+
+            return wrapper
+
+        self.bot.http.request = timed(self.bot.http.request)
+        original = AsyncWebhookAdapter.request
+        AsyncWebhookAdapter.request = timed(original)
+        return lambda: setattr(AsyncWebhookAdapter, "request", original)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def fire(self, event: dict):
+        kind = event["type"]
+        user = event.get("user", 0)
+        if kind == "message":
+            self.stub.message(user, event["content"])
+        elif kind == "slash":
+            self.stub.slash(user, event["name"], event.get("options"))
+        elif kind in ("button", "modal", "reaction"):
+            message = self.stub.find_message(title=event.get("title"), button=event.get("label") if kind != "reaction" else None)
+            if message is None:
+                self.skipped[f"{kind}: no target message"] += 1
+                return
+            if kind == "reaction":
+                self.stub.reaction(user, int(message["id"]), event["emoji"])
+            elif kind == "button":
+                self.stub.click(user, int(message["id"]), self.stub.custom_id(message, event["label"]))
+            else:
+                interaction_id = self.stub.click(user, int(message["id"]), self.stub.custom_id(message, event["label"]))
+                self._spawn(self._submit_modal(user, interaction_id, event["value"]))
+        else:
+            self.skipped[f"unknown event type {kind!r}"] += 1
+            return
+        self.fired += 1
+
+    async def _submit_modal(self, user: int, interaction_id: int, value: str):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + MODAL_TIMEOUT
+        while interaction_id not in self.stub.modals:
+            if loop.time() > deadline:
+                self.skipped["modal: never opened"] += 1
+                return
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(TYPING_DELAY)
+        self.stub.submit_modal(user, self.stub.modals.pop(interaction_id), value)
+
+    async def _play(self, events: list[dict], after: typing.Optional[str], started: float):
+        loop = asyncio.get_running_loop()
+        if after is not None:
+            await self.stub.wait_for_title(after)
+            started = loop.time()
+        for event in sorted(events, key=lambda e: e["at"]):
+            delay = started + event["at"] - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.fire(event)
+            self.last_played = loop.time()
+
+    async def run(self) -> float:
+        """Play the trace, then let queued requests drain; returns virtual seconds elapsed."""
+        loop = asyncio.get_running_loop()
+        started = self.last_played = loop.time()
+        groups: dict[typing.Optional[str], list[dict]] = collections.defaultdict(list)
+        for event in self.trace:
+            groups[event.get("after")].append(event)
+        # anchored groups start waiting right away so they can't miss their message
+        plays = {asyncio.create_task(self._play(events, after, started)): events for after, events in groups.items()}
+        # a game that ends early never shows the later anchors; stop waiting once nothing has played for a while
+        while not all(task.done() for task in plays) and loop.time() - self.last_played < ANCHOR_TIMEOUT:
+            await asyncio.sleep(0.5)
+        for task, events in plays.items():
+            if not task.done():
+                task.cancel()
+                self.skipped["anchor message never appeared"] += len(events)
+            elif not task.cancelled() and task.exception():
+                raise task.exception()
+        deadline = loop.time() + SETTLE_TIMEOUT
+        await asyncio.sleep(1.0)
+        while (self.in_flight or self._tasks) and loop.time() < deadline:
+            await asyncio.sleep(0.5)
+        return loop.time() - started
+
+
+def _percentile(samples: list[float], q: int) -> float:
+    if not samples:
+        return 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1] if len(samples) > 1 else samples[0]
+
+
+def report(replay: Replay, virtual: float, wall: float):
+    stub = replay.stub
+    by_route: dict[tuple[str, str], collections.Counter] = collections.defaultdict(collections.Counter)
+    for call in stub.calls:
+        by_route[(call.method, call.route)][call.status] += 1
+
+    columns = ("route", "calls", "429s", "other errors", "p50 ms", "p99 ms", "max ms")
+    rows = []
+    for key in sorted(set(by_route) | set(replay.client_latency), key=lambda k: -sum(by_route[k].values())):
+        statuses = by_route[key]
+        latency = replay.client_latency.get(key, [])
+        rows.append((
+            f"{key[0]} {key[1]}",
+            str(sum(statuses.values())),
+            str(statuses[429]),
+            str(sum(n for status, n in statuses.items() if status >= 400 and status != 429)),
+            f"{_percentile(latency, 50) * 1000:,.0f}",
+            f"{_percentile(latency, 99) * 1000:,.0f}",
+            f"{max(latency, default=0) * 1000:,.0f}",
+        ))
+    total = sum(sum(c.values()) for c in by_route.values())
+    limited = sum(c[429] for c in by_route.values())
+    rows.append(("total", str(total), str(limited), "", "", "", ""))
+    widths = [max(len(row[i]) for row in rows + [columns]) for i in range(len(columns))]
+    for row in [columns] + rows:
+        print("  ".join(cell.ljust(w) if i == 0 else cell.rjust(w) for i, (cell, w) in enumerate(zip(row, widths))))
+
+    acks = list(stub.acks.values())
+    print()
+    print(f"interactions: {len(acks) + len(stub._interaction_sent)} sent, {len(stub._interaction_sent)} never answered, "
+          f"{sum(1 for a in acks if a > ACK_DEADLINE)} answered after {ACK_DEADLINE:.0f}s")
+    print(f"ack latency: p50 {_percentile(acks, 50) * 1000:,.0f} ms, p99 {_percentile(acks, 99) * 1000:,.0f} ms, "
+          f"max {max(acks, default=0) * 1000:,.0f} ms")
+    print(f"events: {replay.fired} delivered" + "".join(f", {n} skipped ({reason})" for reason, n in replay.skipped.items()))
+    print(f"messages sent by the bot: {len(stub.messages)}; requests still queued at the end: {replay.in_flight}")
+    print(f"duration: {virtual:,.1f}s virtual, {wall:,.1f}s real (×{virtual / wall if wall else 0:,.1f})")
+
+
+async def _replay(args, trace: list[dict]) -> Replay:
+    # config reads the environment at import; no watchdog thread (its clock
+    # is the real one) and nothing written outside a scratch directory
+    os.environ["BOT_LOOP_WATCHDOG"] = "0"
+    os.environ.setdefault("BOT_DATA_DIR", tempfile.mkdtemp(prefix="replay-"))
+    from bot import bot, load_cogs
+    from utils.guild_config import get_guild_config
+
+    loop = asyncio.get_running_loop()
+    await bot._async_setup_hook()
+    stub = FakeDiscord(loop.time, seed=args.seed)
+    replay = Replay(bot, stub, trace)
+    stub.attach(bot, replay.user_count())
+    if args.spans_out:
+        from utils.tracing import Tracer
+
+        bot.tracer = Tracer(args.spans_out)
+        bot.tracer.install(bot)
+    settings = get_guild_config(bot).edit(GUILD_ID)
+    settings.mod_role_id = MOD_ROLE_ID
+    settings.channel_ids = {CHANNEL_ID}
+    await load_cogs()
+
+    restore = replay.instrument()
+    wall = time.perf_counter()
+    try:
+        virtual = await replay.run()
+    finally:
+        restore()
+    report(replay, virtual, time.perf_counter() - wall)
+    if args.spans_out:
+        bot.tracer.stop()
+        print(f"spans: {bot.tracer.written} traces written to {bot.tracer.path}")
+
+    if args.calls_out:
+        with open(args.calls_out, "w", encoding="utf-8") as f:
+            for call in stub.calls:
+                f.write(json.dumps(call.to_dict()) + "\n")
+
+    current = asyncio.current_task()
+    leftover = [task for task in asyncio.all_tasks() if task is not current]
+    for task in leftover:
+        task.cancel()
+    await asyncio.gather(*leftover, return_exceptions=True)
+    await bot.close()
+    return replay
+
+
+def main(argv: typing.Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m bench.replay", description="Replay an event trace against the bot and a stubbed Discord.")
+    parser.add_argument("trace", help=f"trace file (JSON lines), or one of: {', '.join(SYNTHETIC)}")
+    parser.add_argument("--speed", type=float, default=DEFAULT_SPEED, help="virtual seconds per real second")
+    parser.add_argument("--seed", type=int, default=SEED, help="seeds the bot's random choices and the stub's latency jitter")
+    parser.add_argument("--write-trace", help="write the trace to this file instead of replaying it")
+    parser.add_argument("--calls-out", help="write every REST call the stub served to this file (JSON lines)")
+    parser.add_argument("--spans-out", help="trace every command and listener to this file (Chrome trace JSON; span times are real, not virtual)")
+    args = parser.parse_args(argv)
+
+    trace = load_trace(args.trace)
+    if args.write_trace:
+        with open(args.write_trace, "w", encoding="utf-8") as f:
+            for event in trace:
+                f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        return
+
+    random.seed(args.seed)
+    loop = AcceleratedLoop(args.speed)
+    try:
+        loop.run_until_complete(_replay(args, trace))
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,506 @@
+# stub.py
+# In-process stand-in for Discord: a REST server behind a fake aiohttp
+# session, and a gateway that feeds events to the bot's own parsers. The bot
+# runs unmodified, through discord.py's real HTTP client, rate limiter and
+# view store; nothing leaves the process.
+#
+# REST answers with plausible payloads, applies per-route and global rate
+# limits with Discord's headers (so discord.py waits the way it would for
+# real), and records every outbound call.
+
+import asyncio
+import collections
+import itertools
+import json
+import random
+import re
+import typing
+import urllib.parse
+
+import discord
+from multidict import CIMultiDict
+
+APPLICATION_ID = 100
+BOT_USER_ID = 101
+GUILD_ID = 200
+CHANNEL_ID = 201
+MOD_ROLE_ID = 202
+USER_ID_BASE = 10_000  # trace user n is USER_ID_BASE + n
+
+REST_LATENCY = 0.08  # seconds per request before the response, plus jitter
+REST_JITTER = 0.04
+GLOBAL_LIMIT = 50  # requests per second across all routes, as for a bot token
+DEFAULT_LIMIT = (10, 10.0)
+# (method, route template) -> (requests, window seconds) per bucket
+ROUTE_LIMITS = {
+    ("POST", "/channels/{channel_id}/messages"): (5, 5.0),
+    ("PATCH", "/channels/{channel_id}/messages/{message_id}"): (5, 5.0),
+    ("DELETE", "/channels/{channel_id}/messages/{message_id}"): (5, 1.0),
+    ("PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me"): (1, 0.25),
+    ("POST", "/users/@me/channels"): (10, 10.0),
+    ("POST", "/webhooks/{webhook_id}/{webhook_token}"): (5, 2.0),
+    ("PATCH", "/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}"): (5, 2.0),
+}
+UNLIMITED = {("POST", "/interactions/{webhook_id}/{webhook_token}/callback")}  # not rate limited, not global
+EPHEMERAL = 1 << 6
+
+
+def _template(path: str) -> tuple[str, str]:
+    """(route template, major parameter) for a request path, e.g. /channels/1/messages."""
+    parts = path.split("/")
+    names = []
+    major = ""
+    for i, part in enumerate(parts):
+        before = parts[i - 1] if i else ""
+        if before == "reactions":
+            names.append("{emoji}")
+        elif part.isdigit() or (before == "messages" and part == "@original"):
+            # interaction callbacks are webhook routes to discord.py, and named the same here
+            name = {"channels": "channel_id", "guilds": "guild_id", "webhooks": "webhook_id", "interactions": "webhook_id"}.get(before, "message_id" if before == "messages" else "id")
+            names.append("{%s}" % name)
+            if not major and name in ("channel_id", "guild_id", "webhook_id"):
+                major = part
+        elif before.isdigit() and i >= 2 and parts[i - 2] in ("webhooks", "interactions"):
+            names.append("{webhook_token}")
+            major += "+" + part
+        else:
+            names.append(part)
+    return "/".join(names), major
+
+
+class RestCall:
+    """One request as the server saw it; a retried request shows up once per attempt."""
+
+    __slots__ = ("at", "method", "route", "status", "latency")
+
+    def __init__(self, at: float, method: str, route: str, status: int, latency: float):
+        self.at = at
+        self.method = method
+        self.route = route
+        self.status = status
+        self.latency = latency  # server side, before the response went out
+
+    def to_dict(self) -> dict:
+        return {"at": round(self.at, 4), "method": self.method, "route": self.route, "status": self.status}
+
+
+class _Bucket:
+    __slots__ = ("limit", "window", "remaining", "resets_at")
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.remaining = limit
+        self.resets_at = 0.0
+
+    def take(self, now: float) -> bool:
+        if now >= self.resets_at:
+            self.remaining = self.limit
+            self.resets_at = now + self.window
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class _Response:
+    """The parts of aiohttp.ClientResponse discord.py reads."""
+
+    def __init__(self, status: int, body: typing.Any = None, headers: typing.Optional[dict] = None):
+        self.status = status
+        self.reason = {200: "OK", 204: "No Content", 404: "Not Found", 429: "Too Many Requests"}.get(status, "")
+        self.headers = CIMultiDict(headers or {})
+        if body is None:
+            self._text = ""
+        else:
+            self._text = json.dumps(body)
+            self.headers["content-type"] = "application/json"
+
+    async def text(self, encoding: str = "utf-8") -> str:
+        return self._text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Request:
+    def __init__(self, server: "FakeDiscord", method: str, url: str, kwargs: dict):
+        self.server = server
+        self.method = method
+        self.url = url
+        self.kwargs = kwargs
+        self.response: typing.Optional[_Response] = None
+
+    async def __aenter__(self) -> _Response:
+        self.response = await self.server.handle(self.method, self.url, self.kwargs)
+        return self.response
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Stands in for the aiohttp.ClientSession discord.py's HTTP client and webhooks use."""
+
+    closed = False
+
+    def __init__(self, server: "FakeDiscord"):
+        self.server = server
+
+    def request(self, method: str, url: str, **kwargs) -> _Request:
+        return _Request(self.server, method, url, kwargs)
+
+    async def close(self):
+        pass
+
+
+def _body(kwargs: dict) -> tuple[dict, list[str]]:
+    """JSON payload and attached file names from a JSON or multipart request body."""
+    data = kwargs.get("data")
+    if data is None:
+        return {}, []
+    if isinstance(data, (str, bytes)):
+        return json.loads(data), []
+    payload, files = {}, []
+    for options, _, value in data._fields:  # aiohttp.FormData, built by discord.py for uploads
+        if options.get("name") == "payload_json":
+            payload = json.loads(value)
+        elif "filename" in options:
+            files.append(options["filename"])
+    return payload, files
+
+
+class FakeDiscord:
+    """
+    The REST API and gateway for one guild with one game channel. `attach`
+    points a bot at it; `message`, `reaction` and `click` then deliver
+    gateway events from trace users.
+    """
+
+    def __init__(self, loop_time: typing.Callable[[], float], latency: float = REST_LATENCY, seed: int = 0):
+        self.time = loop_time
+        self.origin = loop_time()  # call times are recorded from here
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.calls: list[RestCall] = []
+        self.messages: dict[int, dict] = {}  # every message the bot sent, by id
+        self.channel_messages: dict[int, list[int]] = collections.defaultdict(list)
+        self.modals: dict[int, dict] = {}  # interaction id -> modal the bot opened in response
+        self.acks: dict[int, float] = {}  # interaction id -> seconds from event to callback
+        self.originals: dict[str, dict] = {}  # interaction token -> its response message
+        self._interaction_sent: dict[int, float] = {}
+        self._buckets: dict[str, _Bucket] = {}
+        self._global = _Bucket(GLOBAL_LIMIT, 1.0)
+        self._watchers: list[tuple[re.Pattern, asyncio.Future]] = []
+        self._ids = itertools.count(discord.utils.time_snowflake(discord.utils.utcnow()))
+        self.bot: typing.Optional[discord.Client] = None
+
+    def snowflake(self) -> int:
+        return next(self._ids)
+
+    # ---------- Wiring ----------
+    def attach(self, bot: discord.Client, users: int, mods: typing.Iterable[int] = (0,)):
+        """Log `bot` in against the stub and populate its cache with the guild and `users` members."""
+        self.bot = bot
+        self.mods = set(mods)
+        state = bot._connection
+        bot.http.token = "stub"
+        bot.http._HTTPClient__session = FakeSession(self)
+        bot.http._global_over = asyncio.Event()  # what static_login sets up
+        bot.http._global_over.set()
+        state.application_id = APPLICATION_ID
+        state.user = discord.ClientUser(state=state, data=self.user_payload(BOT_USER_ID, bot=True))
+        state._add_guild_from_data(self.guild_payload(users))
+        bot._ready.set()
+
+    def user_payload(self, user_id: int, bot: bool = False) -> dict:
+        return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "global_name": None, "avatar": None, "bot": bot}
+
+    def member_payload(self, n: int) -> dict:
+        user_id = USER_ID_BASE + n
+        return {
+            "user": self.user_payload(user_id),
+            "roles": [str(MOD_ROLE_ID)] if n in self.mods else [],
+            "joined_at": "2024-01-01T00:00:00+00:00",
+            "deaf": False,
+            "mute": False,
+            "flags": 0,
+            "permissions": "0",
+        }
+
+    def guild_payload(self, users: int) -> dict:
+        everyone = {"id": str(GUILD_ID), "name": "@everyone", "permissions": str(discord.Permissions.general().value | discord.Permissions.text().value), "position": 0}
+        mod = {"id": str(MOD_ROLE_ID), "name": "CM", "permissions": "0", "position": 1}
+        bot_member = {"user": self.user_payload(BOT_USER_ID, bot=True), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False, "mute": False, "flags": 0}
+        return {
+            "id": str(GUILD_ID),
+            "name": "Stub Guild",
+            "owner_id": str(USER_ID_BASE),
+            "roles": [everyone, mod],
+            "channels": [{"id": str(CHANNEL_ID), "type": 0, "name": "discord-games", "position": 0, "permission_overwrites": []}],
+            "members": [bot_member] + [self.member_payload(n) for n in range(users)],
+            "member_count": users + 1,
+            "emojis": [],
+            "stickers": [],
+            "features": [],
+        }
+
+    # ---------- Gateway ----------
+    def _dispatch(self, event: str, data: dict):
+        self.bot._connection.parsers[event](data)
+
+    def message(self, n: int, content: str, channel_id: int = CHANNEL_ID):
+        self._dispatch("MESSAGE_CREATE", {
+            "id": str(self.snowflake()),
+            "channel_id": str(channel_id),
+            "guild_id": str(GUILD_ID),
+            "author": self.user_payload(USER_ID_BASE + n),
+            "member": {k: v for k, v in self.member_payload(n).items() if k != "user"},
+            "content": content,
+            "timestamp": discord.utils.utcnow().isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": [],
+            "pinned": False,
+            "type": 0,
+        })
+
+    def reaction(self, n: int, message_id: int, emoji: str, channel_id: int = CHANNEL_ID):
+        self._dispatch("MESSAGE_REACTION_ADD", {
+            "user_id": str(USER_ID_BASE + n),
+            "channel_id": str(channel_id),
+            "message_id": str(message_id),
+            "guild_id": str(GUILD_ID),
+            "member": self.member_payload(n),
+            "emoji": {"id": None, "name": emoji},
+            "burst": False,
+            "type": 0,
+        })
+
+    def _interaction(self, n: int, kind: int, data: dict, message: typing.Optional[dict] = None) -> int:
+        interaction_id = self.snowflake()
+        payload = {
+            "id": str(interaction_id),
+            "application_id": str(APPLICATION_ID),
+            "type": kind,
+            "token": f"token{interaction_id}",
+            "version": 1,
+            "guild_id": str(GUILD_ID),
+            "channel_id": str(CHANNEL_ID),
+            "channel": {"id": str(CHANNEL_ID), "type": 0, "name": "discord-games", "guild_id": str(GUILD_ID)},
+            "member": self.member_payload(n),
+            "data": data,
+            "locale": "en-US",
+            "guild_locale": "en-US",
+            "app_permissions": "0",
+            "entitlements": [],
+            "authorizing_integration_owners": {},
+            "context": 0,
+            "attachment_size_limit": 8 * 1024 * 1024,
+        }
+        if message is not None:
+            payload["message"] = message
+        self._interaction_sent[interaction_id] = self.time()
+        self._dispatch("INTERACTION_CREATE", payload)
+        return interaction_id
+
+    def click(self, n: int, message_id: int, custom_id: str) -> int:
+        return self._interaction(n, 3, {"custom_id": custom_id, "component_type": 2}, self.messages[message_id])
+
+    def submit_modal(self, n: int, modal: dict, value: str) -> int:
+        rows = [
+            {"type": 1, "components": [{"type": 4, "custom_id": field["custom_id"], "value": value} for field in row["components"]]}
+            for row in modal["components"]
+        ]
+        return self._interaction(n, 5, {"custom_id": modal["custom_id"], "components": rows})
+
+    def slash(self, n: int, name: str, options: typing.Optional[dict] = None) -> int:
+        data = {"id": str(self.snowflake()), "name": name, "type": 1}
+        if options:
+            data["options"] = [{"name": k, "type": 3 if isinstance(v, str) else 4, "value": v} for k, v in options.items()]
+        return self._interaction(n, 2, data)
+
+    # ---------- Lookups for trace replay ----------
+    def find_message(self, channel_id: int = CHANNEL_ID, title: typing.Optional[str] = None, button: typing.Optional[str] = None) -> typing.Optional[dict]:
+        """Latest bot message in the channel with an embed title matching `title` (a regex) and/or a live button labelled `button`."""
+        for message_id in reversed(self.channel_messages[channel_id]):
+            message = self.messages[message_id]
+            if title and not any(re.search(title, e.get("title") or "") for e in message.get("embeds", ())):
+                continue
+            if button and self.custom_id(message, button) is None:
+                continue
+            return message
+        return None
+
+    def wait_for_title(self, pattern: str) -> asyncio.Future:
+        """Resolves with the first bot message, from now on, with an embed title matching `pattern` (a regex)."""
+        future = asyncio.get_running_loop().create_future()
+        self._watchers.append((re.compile(pattern), future))
+        return future
+
+    def _notify(self, message: dict):
+        if not self._watchers:
+            return
+        titles = [e.get("title") or "" for e in message.get("embeds") or ()]
+        waiting = []
+        for pattern, future in self._watchers:
+            if future.done():
+                continue
+            if any(pattern.search(title) for title in titles):
+                future.set_result(message)
+            else:
+                waiting.append((pattern, future))
+        self._watchers = waiting
+
+    @staticmethod
+    def custom_id(message: dict, label: str) -> typing.Optional[str]:
+        for row in message.get("components") or ():
+            for item in row.get("components", ()):
+                if item.get("label") == label and not item.get("disabled"):
+                    return item.get("custom_id")
+        return None
+
+    # ---------- REST ----------
+    async def handle(self, method: str, url: str, kwargs: dict) -> _Response:
+        path = urllib.parse.urlsplit(url).path
+        if path.startswith("/api/v"):
+            path = "/" + path.split("/", 3)[3]
+        route, major = _template(path)
+        started = self.time()
+        await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-REST_JITTER, REST_JITTER)))
+        now = self.time()
+
+        headers = {}
+        if (method, route) not in UNLIMITED:
+            limit, window = ROUTE_LIMITS.get((method, route), DEFAULT_LIMIT)
+            key = f"{method} {route}:{major}"
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(limit, window)
+            if not self._global.take(now):
+                return self._record(started, method, route, _Response(
+                    429, {"message": "You are being rate limited.", "retry_after": round(self._global.resets_at - now, 3), "global": True},
+                    {"Via": "1.1 google", "X-RateLimit-Global": "true", "X-RateLimit-Scope": "global"},
+                ))
+            allowed = bucket.take(now)
+            headers = {
+                "X-RateLimit-Limit": str(bucket.limit),
+                "X-RateLimit-Remaining": str(max(0, bucket.remaining)),
+                "X-RateLimit-Reset-After": f"{max(0.0, bucket.resets_at - now):.3f}",
+                "X-RateLimit-Bucket": f"{abs(hash((method, route))):x}",
+            }
+            if not allowed:
+                headers.update({"Via": "1.1 google", "X-RateLimit-Scope": "user"})
+                return self._record(started, method, route, _Response(
+                    429, {"message": "You are being rate limited.", "retry_after": round(bucket.resets_at - now, 3), "global": False}, headers,
+                ))
+
+        payload, files = _body(kwargs)
+        status, body = self._serve(method, route, path, payload, files)
+        return self._record(started, method, route, _Response(status, body, headers))
+
+    def _record(self, started: float, method: str, route: str, response: _Response) -> _Response:
+        self.calls.append(RestCall(started - self.origin, method, route, response.status, self.time() - started))
+        return response
+
+    def _serve(self, method: str, route: str, path: str, payload: dict, files: list[str]) -> tuple[int, typing.Any]:
+        parts = path.strip("/").split("/")
+        if method == "POST" and route == "/channels/{channel_id}/messages":
+            return 200, self._create_message(int(parts[1]), payload, files)
+        if method == "PATCH" and route == "/channels/{channel_id}/messages/{message_id}":
+            return self._edit_message(int(parts[3]), payload, files)
+        if method == "PUT" and route.startswith("/channels/{channel_id}/messages/{message_id}/reactions"):
+            return 204, None
+        if method == "POST" and route == "/users/@me/channels":
+            return 200, {"id": str(self.snowflake()), "type": 1, "recipients": [self.user_payload(int(payload["recipient_id"]))]}
+        if method == "POST" and route == "/interactions/{webhook_id}/{webhook_token}/callback":
+            return self._interaction_callback(int(parts[1]), parts[2], payload, files)
+        if method == "POST" and route == "/webhooks/{webhook_id}/{webhook_token}":
+            return 200, self._create_message(CHANNEL_ID, payload, files)
+        if method == "PATCH" and route == "/webhooks/{webhook_id}/{webhook_token}/messages/{message_id}":
+            target = parts[-1]
+            if target == "@original":
+                original = self.originals.get(parts[2])
+                if original is None:
+                    message = self.originals[parts[2]] = self._create_message(CHANNEL_ID, payload, files)
+                    return 200, message
+                target = original["id"]
+            return self._edit_message(int(target), payload, files)
+        return 404, {"message": f"stub has no route {method} {route}", "code": 0}
+
+    def _attachments(self, channel_id: int, message: dict, files: list[str]):
+        if not files:
+            return
+        urls = {}
+        message["attachments"] = []
+        for filename in files:
+            attachment_id = self.snowflake()
+            url = f"https://cdn.discordapp.com/attachments/{channel_id}/{attachment_id}/{filename}"
+            urls[f"attachment://{filename}"] = url
+            message["attachments"].append({"id": str(attachment_id), "filename": filename, "size": 0, "url": url, "proxy_url": url})
+        for embed in message.get("embeds") or ():
+            for key in ("image", "thumbnail"):
+                if key in embed and embed[key].get("url") in urls:
+                    embed[key]["url"] = embed[key]["proxy_url"] = urls[embed[key]["url"]]
+
+    def _create_message(self, channel_id: int, payload: dict, files: list[str]) -> dict:
+        message = {
+            "id": str(self.snowflake()),
+            "channel_id": str(channel_id),
+            "author": self.user_payload(BOT_USER_ID, bot=True),
+            "content": payload.get("content") or "",
+            "timestamp": discord.utils.utcnow().isoformat(),
+            "edited_timestamp": None,
+            "tts": False,
+            "mention_everyone": False,
+            "mentions": [],
+            "mention_roles": [],
+            "attachments": [],
+            "embeds": payload.get("embeds") or [],
+            "components": payload.get("components") or [],
+            "pinned": False,
+            "type": 0,
+            "flags": payload.get("flags", 0),
+        }
+        self._attachments(channel_id, message, files)
+        self.messages[int(message["id"])] = message
+        if not message["flags"] & EPHEMERAL:
+            self.channel_messages[channel_id].append(int(message["id"]))
+            self._notify(message)
+        return message
+
+    def _edit_message(self, message_id: int, payload: dict, files: list[str]) -> tuple[int, typing.Any]:
+        message = self.messages.get(message_id)
+        if message is None:
+            return 404, {"message": "Unknown Message", "code": 10008}
+        for key in ("content", "embeds", "components", "flags"):
+            if key in payload:
+                message[key] = payload[key] if payload[key] is not None else ([] if key != "content" else "")
+        message["edited_timestamp"] = discord.utils.utcnow().isoformat()
+        self._attachments(int(message["channel_id"]), message, files)
+        self._notify(message)
+        return 200, message
+
+    def _interaction_callback(self, interaction_id: int, token: str, payload: dict, files: list[str]) -> tuple[int, typing.Any]:
+        sent = self._interaction_sent.pop(interaction_id, None)
+        if sent is not None:
+            self.acks[interaction_id] = self.time() - sent
+        kind = payload.get("type")
+        data = payload.get("data") or {}
+        interaction = {"id": str(interaction_id), "type": kind, "response_message_loading": kind == 5, "response_message_ephemeral": bool(data.get("flags", 0) & EPHEMERAL)}
+        if kind == 9:
+            self.modals[interaction_id] = data
+            return 200, {"interaction": interaction}
+        if kind in (4, 5):
+            # the response message, or the "thinking…" placeholder later edits through @original
+            message = self.originals[token] = self._create_message(CHANNEL_ID, data, files)
+            interaction["response_message_id"] = message["id"]
+            return 200, {"interaction": interaction, "resource": {"type": kind, "message": message}}
+        return 200, {"interaction": interaction}
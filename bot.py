@@ -1,24 +1,49 @@
 import asyncio
 import discord
 from discord.ext import commands
+import logging
 import os
-from config import TOKEN, PREFIX
+import signal
+from config import TOKEN, PREFIX, SLASH_ONLY, SYNC_COMMANDS, TRACE_FILE
+from utils.handover import get_handover
+from utils.log import setup_logging
+from utils import speedups
+from utils.tracing import get_tracer
 
-intents = discord.Intents.default()
-intents.message_content = True
-intents.reactions = True
-intents.members = True
-intents.guilds = True
-intents.dm_messages = True
-intents.dm_reactions = True
-intents.integrations = True
+log = logging.getLogger("bot")
+
+if SLASH_ONLY:
+    # Commands, joins and guesses all arrive as interactions, which need no
+    # intents; guilds keeps the channel and role cache the cogs rely on.
+    intents = discord.Intents.none()
+    intents.guilds = True
+else:
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.reactions = True
+    intents.members = True
+    intents.guilds = True
+    intents.dm_messages = True
+    intents.dm_reactions = True
+    intents.integrations = True
 
 bot = commands.Bot(command_prefix=PREFIX, intents=intents)
 
 
+@bot.event
+async def setup_hook():
+    if TRACE_FILE:
+        get_tracer(bot).install(bot)
+    # picks up live games and the gateway session from a process that handed over
+    await get_handover(bot).resume()
+    if SYNC_COMMANDS:
+        synced = await bot.tree.sync()
+        log.info("synced slash commands", extra={"count": len(synced)})
+
+
 @bot.event
 async def on_ready():
-    print(f"Bot is online as {bot.user}")
+    log.info("bot online", extra={"user": str(bot.user), "guilds": len(bot.guilds)})
 
 
 # Dynamically load all cogs
@@ -30,12 +55,28 @@ async def load_cogs():
 
 
 async def main():
+    setup_logging()
+    for setting, requested in speedups.fallbacks:
+        log.warning("backend unavailable, using the standard library", extra={"setting": setting, "requested": requested})
+    log.info("runtime backends", extra=speedups.describe())
     await load_cogs()
+    handover = get_handover(bot)
+    handover.load()
+    loop = asyncio.get_running_loop()
+    try:
+        # deploys send SIGUSR2 to the old process, then start the new one once it has exited
+        loop.add_signal_handler(signal.SIGUSR2, lambda: asyncio.ensure_future(handover.hand_over()))
+        # stop through bot.close(), which unloads the cogs, so the ledger writes
+        # its queued rows (and other cogs flush their files) before exiting
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(bot.close()))
+    except (AttributeError, NotImplementedError):
+        pass  # no signal handlers on Windows; !handover still works
     await bot.start(TOKEN)
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        speedups.run(main())
     except KeyboardInterrupt:
-        print("Bot stopped by user.")
+        log.info("bot stopped by user")
@@ -0,0 +1,210 @@
+import io
+import os
+import time
+
+import discord
+from discord.ext import commands
+
+from config import LOOP_WATCHDOG, MEMORY_WATCH, PROFILE_DIR, TRACEMALLOC
+from utils.guild_config import get_guild_config
+from utils.handover import HANDOVER_WAIT, get_handover, missing_internals
+from utils.memwatch import GROWTH_WINDOW, get_memwatch
+from utils.profiler import MAX_PROFILE_SECONDS, get_profiler
+from utils.timers import get_scheduler
+from utils.watchdog import get_watchdog
+
+TIMER_PREVIEW = 20  # timers listed by !timers
+OFFENDER_PREVIEW = 5  # blocking call sites listed by !looplag
+HOTSPOT_PREVIEW = 8  # functions listed in the !profile embed; the attached report has more
+MEMORY_PREVIEW = 8  # containers, views, tasks and allocation sites listed by !memory
+
+
+class Admin(commands.Cog):
+    """Hidden GM/CM diagnostics for the running bot."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = get_guild_config(bot)
+        self.timers = get_scheduler(bot)
+        self.watchdog = get_watchdog(bot)
+        self.handover = get_handover(bot)
+        self.profiler = get_profiler(bot)
+        self.memwatch = get_memwatch(bot)
+
+    async def cog_load(self):
+        if LOOP_WATCHDOG:
+            self.watchdog.start()
+        if MEMORY_WATCH:
+            self.memwatch.start(trace_allocations=TRACEMALLOC)
+
+    async def cog_unload(self):
+        self.watchdog.stop()
+        self.memwatch.stop()
+
+    async def cog_check(self, ctx):
+        return self.config.is_moderator(ctx.author)
+
+    @commands.hybrid_command(name="timers", help="List pending game timers. (Admin only)", hidden=True, extras={"mod_only": True})
+    async def timers_status(self, ctx):
+        pending = self.timers.pending()
+        if not pending:
+            await ctx.send("⏱️ No pending timers.", ephemeral=True)
+            return
+
+        lines = []
+        for timer in pending[:TIMER_PREVIEW]:
+            repeat = f" (every {timer.interval:g}s)" if timer.interval else ""
+            lines.append(f"`{timer.remaining():7.1f}s` {timer.name}{repeat}")
+        if len(pending) > TIMER_PREVIEW:
+            lines.append(f"... and {len(pending) - TIMER_PREVIEW} more")
+
+        await ctx.send(embed=discord.Embed(
+            title=f"⏱️ Pending Timers ({len(pending)})",
+            description="\n".join(lines),
+            color=discord.Color.blurple(),
+        ), ephemeral=True)
+
+
+    @commands.hybrid_command(name="looplag", help="Show event loop lag and the worst blocking call sites. Pass `reset` to clear. (Admin only)", hidden=True, extras={"mod_only": True})
+    async def loop_lag(self, ctx, action: str = None):
+        watchdog = self.watchdog
+        if not watchdog.running:
+            await ctx.send("🐕 The loop watchdog is off. Set `BOT_LOOP_WATCHDOG=1` to enable it.", ephemeral=True)
+            return
+        if action == "reset":
+            watchdog.reset()
+            await ctx.send("🐕 Loop lag stats cleared.", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="🐕 Event Loop Lag",
+            description=(
+                f"Now: **{watchdog.lag * 1000:.0f} ms** · Max: **{watchdog.max_lag * 1000:.0f} ms**\n"
+                f"Stalls over {watchdog.threshold * 1000:.0f} ms: **{watchdog.stalls}** in {watchdog.ticks:,} ticks"
+            ),
+            color=discord.Color.blurple() if not watchdog.stalls else discord.Color.orange(),
+        )
+        for offender in watchdog.worst(OFFENDER_PREVIEW):
+            value = f"{offender.count}x · total {offender.total:.2f}s · worst {offender.worst:.2f}s"
+            if offender.stack:
+                value += "\n```" + "\n".join(offender.stack[-4:]) + "```"
+            embed.add_field(name=offender.site[:256], value=value[:1024], inline=False)
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(name="memory", help="Show container sizes, live views and tasks, and anything growing between games. Pass `reset` to clear. (Admin only)", hidden=True, extras={"mod_only": True})
+    async def memory(self, ctx, action: str = None):
+        memwatch = self.memwatch
+        if not memwatch.running:
+            await ctx.send("🧠 The memory watch is off. Set `BOT_MEMORY_WATCH=1` to enable it.", ephemeral=True)
+            return
+        if action == "reset":
+            memwatch.reset()
+            await ctx.send("🧠 Memory samples cleared.", ephemeral=True)
+            return
+
+        sample = memwatch.sample()  # a fresh reading, kept in the history like any other
+        idle = sum(1 for s in memwatch.samples if s.idle)
+        growth = memwatch.growth()
+        lines = [f"{len(memwatch.samples)} samples, {idle} between games · **{sample.games}** games completed"]
+        if sample.traced is not None:
+            lines.append(f"Traced allocations: **{sample.traced / 1_048_576:.1f} MiB**")
+        if growth:
+            lines.append(f"⚠️ **Growing across the last {GROWTH_WINDOW} idle samples:**")
+            lines += [f"`{g.metric}` {' → '.join(f'{v:,}' for v in g.values)} ({g.games} games)" for g in growth[:MEMORY_PREVIEW]]
+        elif idle < GROWTH_WINDOW:
+            lines.append(f"Growth is checked once there are {GROWTH_WINDOW} samples taken between games.")
+        else:
+            lines.append("Nothing is growing between games.")
+        embed = discord.Embed(
+            title="🧠 Memory",
+            description="\n".join(lines)[:4096],
+            color=discord.Color.orange() if growth else discord.Color.blurple(),
+        )
+
+        largest = sorted(sample.sizes.items(), key=lambda kv: kv[1], reverse=True)[:MEMORY_PREVIEW]
+        if largest:
+            embed.add_field(name="Largest containers", value="\n".join(f"`{n:,}` {path}" for path, n in largest)[:1024], inline=False)
+        views = ", ".join(f"{name} ×{n}" for name, n in sample.views.most_common(MEMORY_PREVIEW)) or "none"
+        embed.add_field(name=f"Live views ({sum(sample.views.values())})", value=views[:1024], inline=False)
+        tasks = ", ".join(f"{name} ×{n}" for name, n in sample.tasks.most_common(MEMORY_PREVIEW))
+        embed.add_field(name=f"Tasks ({sum(sample.tasks.values())})", value=tasks[:1024] or "none", inline=False)
+        allocations = memwatch.top_allocations(MEMORY_PREVIEW)
+        if allocations:
+            value = "\n".join(
+                f"`+{d.size_diff / 1024:,.0f} KiB` {d.traceback[0].filename.rsplit(os.sep, 1)[-1]}:{d.traceback[0].lineno}"
+                for d in allocations
+            )
+            embed.add_field(name="Allocation growth since the first idle sample", value=value[:1024], inline=False)
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(name="profile", help=f"Profile the running bot for [seconds] (30 by default, at most {MAX_PROFILE_SECONDS}) and attach the hot functions. (Admin only)", hidden=True, extras={"mod_only": True})
+    async def profile(self, ctx, seconds: int = 30):
+        if self.profiler.running:
+            await ctx.send("🔬 A profile is already running.", ephemeral=True)
+            return
+        seconds = max(1, min(seconds, MAX_PROFILE_SECONDS))
+        await ctx.send(f"🔬 Profiling for **{seconds}s**...", ephemeral=True)
+
+        profile = await self.profiler.profile(seconds)
+        report = profile.render()
+        # kept on disk too: the collapsed stacks go straight into flamegraph.pl or speedscope
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(profile.started_at))
+        base = os.path.join(PROFILE_DIR, f"profile-{stamp}")
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            with open(f"{base}.txt", "w", encoding="utf-8") as f:
+                f.write(report)
+            with open(f"{base}.folded", "w", encoding="utf-8") as f:
+                f.write(profile.collapsed())
+            saved = f"Saved to `{base}.txt` and `.folded`."
+        except OSError as e:
+            saved = f"Could not save to `{PROFILE_DIR}`: {e}"
+
+        busy = profile.share(profile.busy)
+        hot = [f"`{profile.share(t):5.1f}%` {label}" for label, t in profile.hottest(HOTSPOT_PREVIEW)]
+        embed = discord.Embed(
+            title="🔬 Profile",
+            description=(
+                f"{profile.duration:.1f}s · {profile.samples:,} samples · loop busy **{busy:.1f}%**\n"
+                + ("\n".join(hot) if hot else "The loop was idle the whole time.")
+            )[:4096],
+            color=discord.Color.blurple() if busy < 50 else discord.Color.orange(),
+        )
+        embed.set_footer(text=saved[:2048])
+        await ctx.send(
+            embed=embed,
+            file=discord.File(io.BytesIO(report.encode("utf-8")), filename=f"profile-{stamp}.txt"),
+            ephemeral=True,
+        )
+
+    @commands.hybrid_command(name="handover", help="Hand live games over to a new bot process and shut this one down. (Admin only)", hidden=True, extras={"mod_only": True})
+    async def hand_over(self, ctx):
+        if self.handover.draining:
+            await ctx.send("♻️ A handover is already in progress.", ephemeral=True)
+            return
+        missing = missing_internals(self.bot)
+        if missing:
+            await ctx.send(embed=discord.Embed(
+                title="🚫 Handover Unavailable",
+                description=(
+                    f"This discord.py ({discord.__version__}) lacks internals the handover relies on: "
+                    f"`{'`, `'.join(missing)}`. Games keep running; restart normally once they end."
+                ),
+                color=discord.Color.red(),
+            ), ephemeral=True)
+            return
+        live = sum(len(game.sessions) for game in self.handover.games.values())
+        await ctx.send(embed=discord.Embed(
+            title="♻️ Handing Over",
+            description=(
+                f"No new games will start. **{live}** live game{'s' if live != 1 else ''} will be saved "
+                f"as soon as they can be (at most {HANDOVER_WAIT}s), then this process exits.\n"
+                "Start the new process once it has exited; it picks the games up where they were."
+            ),
+            color=discord.Color.blurple(),
+        ), ephemeral=True)
+        self.bot.loop.create_task(self.handover.hand_over())
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
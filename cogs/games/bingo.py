@@ -2,158 +2,320 @@ import random
 import discord
 from discord.ext import commands, tasks
 import asyncio
-from config import MOD_ID, GROUP_ID, CHANNEL_ID  # Assuming MOD_ROLE_ID is defined in config.py
+from utils.dm import get_fanout
+from utils.guild_config import get_guild_config
+from utils.handover import deadline_in, get_handover, seconds_until
+from utils.interactions import refuse_quietly
+from utils.ledger import get_ledger
+from utils.roster import JoinRoster
+from utils.sessions import GameSession, SessionManager
+from utils.timers import get_scheduler
+
+BINGO_LETTERS = ["B", "I", "N", "G", "O"]
+ANNOUNCE_ONE_AWAY = True  # announce players who are one number away from winning
+ONE_AWAY_PREVIEW = 15  # max mentions listed per call
+JOIN_DURATION = 30  # seconds the join window stays open
+WINNER_EVENT_BOXES = 3
+CALL_INTERVAL = 10  # seconds between called numbers
+
+
+def _build_pattern_lines():
+    """Each pattern is a tuple of cell groups (col, row); completing any one group wins."""
+    rows = [frozenset((c, r) for c in range(5)) for r in range(5)]
+    cols = [frozenset((c, r) for r in range(5)) for c in range(5)]
+    diagonals = [
+        frozenset((i, i) for i in range(5)),
+        frozenset((4 - i, i) for i in range(5)),
+    ]
+    return {
+        "row_col_diag": tuple(rows + cols + diagonals),
+        "blackout": (frozenset((c, r) for c in range(5) for r in range(5)),),
+        "four_corners": (frozenset([(0, 0), (4, 0), (0, 4), (4, 4)]),),
+        "f_pattern": (cols[0] | rows[0] | rows[2],),
+        "l_pattern": (cols[0] | rows[4],),
+    }
+
+
+PATTERN_LINES = _build_pattern_lines()
+
+
+def format_number(col, number):
+    return f"{BINGO_LETTERS[col]}-{number}"
+
+
+class BingoSession(GameSession):
+    def __init__(self, guild_id, channel_id, started_by, pattern):
+        super().__init__(guild_id, channel_id, started_by)
+        self.pattern = pattern
+        self.cards = {}  # player_id -> 5x5 list
+        self.called_numbers = set()
+        self.number_index = {}  # "B-12" -> [(player_id, (col, row)), ...]
+        self.line_remaining = {}  # player_id -> unmarked cell count per pattern line
+        self.cell_lines = {}  # (col, row) -> indexes of pattern lines containing the cell
+        for i, line in enumerate(PATTERN_LINES[pattern]):
+            for cell in line:
+                self.cell_lines.setdefault(cell, []).append(i)
+        self.active = True
+        self.call_timer = None
+        self.calling = False  # a call is still being sent
+        self.numbers = []  # numbers left to call, popped from the end
+        self.join_roster = None
+
+    @property
+    def pattern_title(self):
+        return self.pattern.replace('_', ' ').title()
+
+    def register_card(self, player_id, card):
+        """Store a dealt card and index its numbers for auto-daubing."""
+        self.cards[player_id] = card
+        remaining = [len(line) for line in PATTERN_LINES[self.pattern]]
+        for c in range(5):
+            for r in range(5):
+                value = card[c][r]
+                if value == "FREE":
+                    for i in self.cell_lines.get((c, r), ()):
+                        remaining[i] -= 1
+                    continue
+                self.number_index.setdefault(format_number(c, value), []).append((player_id, (c, r)))
+        self.line_remaining[player_id] = remaining
+
+    def mark_number(self, number):
+        """
+        Daub a called number on every card holding it.
+        Returns (winners, one_away) as lists of player ids. Cost depends only on
+        how many cards hold the number, not on the total number of cards.
+        """
+        self.called_numbers.add(number)
+        winners = []
+        one_away = []
+        for player_id, cell in self.number_index.pop(number, ()):
+            remaining = self.line_remaining[player_id]
+            for i in self.cell_lines.get(cell, ()):
+                remaining[i] -= 1
+                if remaining[i] == 0 and player_id not in winners:
+                    winners.append(player_id)
+                elif remaining[i] == 1 and ANNOUNCE_ONE_AWAY and player_id not in one_away:
+                    one_away.append(player_id)
+        return winners, [pid for pid in one_away if pid not in winners]
+
+    def check_bingo(self, player_id):
+        """O(lines) check against the card's incremental line counters."""
+        remaining = self.line_remaining.get(player_id)
+        return bool(remaining) and min(remaining) == 0
 
-ALLOWED_ROLE_ID = MOD_ID  # change this to your desired role ID
-GROUP_ROLE_ID = GROUP_ID # change this to your desired user group role ID
-ALLOWED_CHANNEL_ID = CHANNEL_ID  # change this to your desired channel ID
 
 class Bingo(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.cards = {}  # player_id -> 5x5 list
-        self.called_numbers = set()
-        self.game_active = False
-        self.call_task = None
-        self.current_pattern = "row_col_diag"  # default pattern
+        self.config = get_guild_config(bot)
+        self.sessions = SessionManager(BingoSession, "bingo")
+        self.timers = get_scheduler(bot)
+        self.handover = get_handover(bot)
+        self.handover.register("bingo", self.sessions, self.export_session, self.resume_session, starts=("flbingo",))
+
+    # ---------- Handover ----------
+    def export_session(self, game):
+        if not game.active or game.call_timer is None or game.calling:
+            return None  # still joining or dealing, or a call is going out
+        return {
+            "channel_id": game.channel_id,
+            "started_by": game.started_by,
+            "pattern": game.pattern,
+            "cards": {str(pid): card for pid, card in game.cards.items()},
+            "called": sorted(game.called_numbers),
+            "numbers": game.numbers,
+            "next_call_at": deadline_in(game.call_timer.remaining()),
+        }
+
+    async def resume_session(self, state):
+        channel = await self.handover.channel(state["channel_id"])
+        game = self.sessions.start(channel, state["started_by"], pattern=state["pattern"])
+        if game is None:
+            return
+        for pid, card in state["cards"].items():
+            game.register_card(int(pid), card)
+        for number in state["called"]:
+            game.mark_number(number)  # replays the daubs, so line counters match
+        game.numbers = state["numbers"]
+        game.call_timer = self.timers.call_every(
+            CALL_INTERVAL, self.call_next_number, channel, game,
+            name=f"bingo calls #{channel.id}", first=seconds_until(state["next_call_at"]),
+        )
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        game = self.sessions.lookup(payload.guild_id, payload.channel_id)
+        if game and game.join_roster and game.join_roster.matches(payload):
+            game.join_roster.add(payload.member)
 
-    @commands.command(name="flbingo", help="Start a Bingo game and deal cards to players. Optionally specify pattern: row_col_diag, blackout, four_corners, f_pattern, l_pattern")
+    def _end_game(self, game):
+        game.active = False
+        if game.call_timer:
+            game.call_timer.cancel()
+        self.sessions.end(game)
+
+    @commands.hybrid_command(name="flbingo", help="Start a Bingo game and deal cards to players. Optionally specify pattern: row_col_diag, blackout, four_corners, f_pattern, l_pattern", extras={"mod_only": True})
     async def start_bingo(self, ctx, pattern: str = "row_col_diag"):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return
-        if ALLOWED_ROLE_ID not in [role.id for role in ctx.author.roles]:
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)
+        if not self.config.is_moderator(ctx.author):
             await ctx.send(embed=discord.Embed(
                 title="🚫 Access Denied",
                 description="Only GMs/CMs can start Bingo.",
                 color=discord.Color.red()
-            ))
+            ), ephemeral=True)
             return
 
-        if pattern not in ["row_col_diag", "blackout", "four_corners", "f_pattern", "l_pattern"]:
-            await ctx.send("❌ Invalid pattern. Use row_col_diag, blackout, four_corners, f_pattern, or l_pattern.")
+        if pattern not in PATTERN_LINES:
+            await ctx.send("❌ Invalid pattern. Use row_col_diag, blackout, four_corners, f_pattern, or l_pattern.", ephemeral=True)
             return
 
-        if self.game_active:
-            await ctx.send("⚠️ A Bingo game is already running!")
+        game = self.sessions.start(ctx.channel, ctx.author.id, pattern=pattern)
+        if game is None:
+            await ctx.send("⚠️ A Bingo game is already running!", ephemeral=True)
             return
 
-        self.cards.clear()
-        self.called_numbers.clear()
-        self.game_active = True
-        self.current_pattern = pattern
-
-        await ctx.send(embed=discord.Embed(
+        join_msg = await ctx.send(embed=discord.Embed(
             title="🎲 Bingo Game Starting!",
-            description=f"Pattern: **{pattern.replace('_', ' ').title()}**\nReact with ✅ within 30 seconds to join!",
+            description=f"Pattern: **{game.pattern_title}**\nPress **Join** on the roster below within {JOIN_DURATION} seconds to join!",
             color=discord.Color.green()
-        ).set_footer(text="Winner will get 3 Event Boxes."))
+        ).set_footer(text=f"Winner will get {WINNER_EVENT_BOXES} Event Boxes."))
+
+        # Joins arrive through the roster's Join button or on_raw_reaction_add,
+        # filtered by the join message id
+        game.join_roster = JoinRoster(
+            ctx.channel,
+            "Bingo Players",
+            ends_at=asyncio.get_running_loop().time() + JOIN_DURATION,
+            color=discord.Color.green(),
+        )
+        await game.join_roster.start(join_msg)
+        await self.timers.sleep(JOIN_DURATION, name=f"bingo join #{ctx.channel.id}")
+        players = await game.join_roster.close()
+        game.join_roster = None
+
+        if not game.active:
+            return  # stopped during the join phase
+        if not players:
+            await ctx.send("No players joined. Game cancelled.")
+            self._end_game(game)
+            return
 
-        def check(reaction, user):
-            return (
-                str(reaction.emoji) == "✅"
-                and reaction.message.channel == ctx.channel
-                and not user.bot
-            )
+        # Generate cards and DM players concurrently; only delivered cards enter the game
+        dealt = {player.id: self.generate_card() for player in players}
+        report = await get_fanout(self.bot).send_many(
+            ((player, {"embed": self.format_card_embed(dealt[player.id], pattern)}) for player in players),
+            status_channel=ctx.channel,
+            label="🎴 Dealing Bingo cards",
+        )
+        if not game.active:
+            return
+        for player in report.sent:
+            game.register_card(player.id, dealt[player.id])
 
-        players = []
-        try:
-            while True:
-                reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
-                if user.id not in [p.id for p in players]:
-                    players.append(user)
-                    await ctx.send(f"✅ {user.mention} joined the Bingo game!")
-        except asyncio.TimeoutError:
-            if not players:
-                await ctx.send("No players joined. Game cancelled.")
-                self.game_active = False
-                return
-
-        # Generate cards and DM players
-        for player in players:
-            card = self.generate_card()
-            self.cards[player.id] = card
-            try:
-                await player.send(embed=self.format_card_embed(card))
-            except discord.Forbidden:
-                await ctx.send(f"⚠️ Couldn't DM {player.mention}. They will not have a card.")
+        if not game.cards:
+            await ctx.send("No cards could be delivered. Game cancelled.")
+            self._end_game(game)
+            return
 
         await ctx.send(embed=discord.Embed(
             title="✅ All cards have been dealt!",
-            description=f"Game will now begin! Pattern: **{pattern.replace('_', ' ').title()}**",
+            description=f"Game will now begin! Pattern: **{game.pattern_title}**",
             color=discord.Color.blurple()
         ))
 
-        self.call_task = self.bot.loop.create_task(self.call_numbers(ctx))
+        game.numbers = [f"B-{n}" for n in range(1, 16)] + \
+                       [f"I-{n}" for n in range(16, 31)] + \
+                       [f"N-{n}" for n in range(31, 46)] + \
+                       [f"G-{n}" for n in range(46, 61)] + \
+                       [f"O-{n}" for n in range(61, 76)]
+        random.shuffle(game.numbers)
 
-    async def call_numbers(self, ctx):
-        available_numbers = [f"B-{n}" for n in range(1, 16)] + \
-                            [f"I-{n}" for n in range(16, 31)] + \
-                            [f"N-{n}" for n in range(31, 46)] + \
-                            [f"G-{n}" for n in range(46, 61)] + \
-                            [f"O-{n}" for n in range(61, 76)]
+        # Calls run on a fixed grid from the shared scheduler, so send latency doesn't drift the cadence
+        game.call_timer = self.timers.call_every(
+            CALL_INTERVAL, self.call_next_number, ctx.channel, game, name=f"bingo calls #{ctx.channel.id}"
+        )
 
-        random.shuffle(available_numbers)
+    async def call_next_number(self, channel, game):
+        if not game.active or game.calling:
+            return
+        if not game.numbers:
+            self._end_game(game)
+            return
 
-        for number in available_numbers:
-            if not self.game_active:
-                return
+        game.calling = True
+        try:
+            number = game.numbers.pop()
+            winners, one_away = game.mark_number(number)
 
-            self.called_numbers.add(number)
             embed = discord.Embed(
                 title="🔔 Bingo Number Called!",
                 description=f"**{number}**",
                 color=discord.Color.gold()
-            ).set_footer(text="Type !bingonumbers to see all called numbers so far. Type !bingo if you have a winning card!")
-            await ctx.send(embed=embed)
-            await asyncio.sleep(10)  # Wait 10 seconds between calls
+            ).set_footer(text="Type !bingonumbers to see all called numbers so far. Cards are marked automatically!")
+            if one_away and not winners:
+                preview = ", ".join(f"<@{pid}>" for pid in one_away[:ONE_AWAY_PREVIEW])
+                if len(one_away) > ONE_AWAY_PREVIEW:
+                    preview += f" and {len(one_away) - ONE_AWAY_PREVIEW} more"
+                embed.add_field(name="👀 One number away", value=preview, inline=False)
+            await channel.send(embed=embed)
+
+            if winners and game.active:
+                self._end_game(game)
+                await self.announce_winners(channel, game, winners)
+        finally:
+            game.calling = False
+
+    async def announce_winners(self, destination, game, winners):
+        ledger = get_ledger(self.bot)
+        for pid in winners:
+            ledger.record_win(game, "bingo", pid, {"Event Box": WINNER_EVENT_BOXES})
+        mentions = ", ".join(f"<@{pid}>" for pid in winners)
+        await destination.send(embed=discord.Embed(
+            title="🎉 BINGO!",
+            description=f"{mentions} {'has' if len(winners) == 1 else 'have'} won the game with pattern **{game.pattern_title}**!",
+            color=discord.Color.green()
+        ).set_footer(text="Please reply with your IGN. Your Event Boxes will be sent by [CM] Gold Ship after the event."))
 
-    @commands.command(name="bingo", help="Call Bingo if you think you have a winning card!")
+    @commands.hybrid_command(name="bingo", help="Call Bingo if you think you have a winning card!")
     async def call_bingo(self, ctx):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            await ctx.send("⚠️ This command can only be used in the #discord-games channel.")
+        if not self.config.is_game_channel(ctx.channel):
+            await ctx.send("⚠️ This command can only be used in the #discord-games channel.", ephemeral=True)
             return
 
-        if not self.game_active:
-            await ctx.send("⚠️ There is no active Bingo game.")
+        game = self.sessions.get(ctx.channel)
+        if not game or not game.active:
+            await ctx.send("⚠️ There is no active Bingo game.", ephemeral=True)
             return
 
-        card = self.cards.get(ctx.author.id)
-        if not card:
-            await ctx.send("❌ You are not part of the current Bingo game.")
+        if ctx.author.id not in game.cards:
+            await ctx.send("❌ You are not part of the current Bingo game.", ephemeral=True)
             return
 
-        if self.check_bingo(card):
-            self.game_active = False
-            if self.call_task:
-                self.call_task.cancel()
-
-            await ctx.send(embed=discord.Embed(
-                title="🎉 BINGO!",
-                description=f"{ctx.author.mention} has won the game with pattern **{self.current_pattern.replace('_', ' ').title()}**!",
-                color=discord.Color.green()
-            ).set_footer(text="Please reply with your IGN. Your Event Boxes will be sent by [CM] Gold Ship after the event."))
+        if game.check_bingo(ctx.author.id):
+            self._end_game(game)
+            await self.announce_winners(ctx, game, [ctx.author.id])
         else:
-            await ctx.send(f"❌ Sorry {ctx.author.mention}, you don't have a Bingo yet!")
+            await ctx.send(f"❌ Sorry {ctx.author.mention}, you don't have a Bingo yet!", ephemeral=True)
 
-    @commands.command(name="stopbingo", help="End the current Bingo game early (GM/CM only).")
+    @commands.hybrid_command(name="stopbingo", help="End the current Bingo game early (GM/CM only).", extras={"mod_only": True})
     async def end_bingo(self, ctx):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return
-        if ALLOWED_ROLE_ID not in [role.id for role in ctx.author.roles]:
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)
+        if not self.config.is_moderator(ctx.author):
             await ctx.send(embed=discord.Embed(
                 title="🚫 Access Denied",
                 description="Only GMs/CMs can end Bingo early.",
                 color=discord.Color.red()
-            ))
+            ), ephemeral=True)
             return
 
-        if not self.game_active:
-            await ctx.send("⚠️ There is no active Bingo game to end.")
+        game = self.sessions.get(ctx.channel)
+        if not game:
+            await ctx.send("⚠️ There is no active Bingo game to end.", ephemeral=True)
             return
 
-        self.game_active = False
-        if self.call_task:
-            self.call_task.cancel()
+        self._end_game(game)
 
         await ctx.send(embed=discord.Embed(
             title="🛑 Bingo Game Ended",
@@ -161,22 +323,23 @@ class Bingo(commands.Cog):
             color=discord.Color.orange()
         ))
 
-    @commands.command(name="bingonumbers", help="Show all numbers that have been called so far.")
+    @commands.hybrid_command(name="bingonumbers", help="Show all numbers that have been called so far.")
     async def show_called_numbers(self, ctx):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            await ctx.send("⚠️ This command can only be used in the discord-games channel.")
+        if not self.config.is_game_channel(ctx.channel):
+            await ctx.send("⚠️ This command can only be used in the discord-games channel.", ephemeral=True)
             return
 
-        if not self.game_active:
-            await ctx.send("⚠️ There is no active Bingo game.")
+        game = self.sessions.get(ctx.channel)
+        if not game or not game.active:
+            await ctx.send("⚠️ There is no active Bingo game.", ephemeral=True)
             return
 
-        if not self.called_numbers:
-            await ctx.send("ℹ️ No numbers have been called yet.")
+        if not game.called_numbers:
+            await ctx.send("ℹ️ No numbers have been called yet.", ephemeral=True)
             return
 
         groups = {"B": [], "I": [], "N": [], "G": [], "O": []}
-        for num in sorted(self.called_numbers, key=lambda x: (x[0], int(x.split('-')[1]))):
+        for num in sorted(game.called_numbers, key=lambda x: (x[0], int(x.split('-')[1]))):
             letter, value = num.split('-')
             groups[letter].append(value)
 
@@ -190,7 +353,7 @@ class Bingo(commands.Cog):
             description="\n".join(lines),
             color=discord.Color.blurple()
         )
-        await ctx.send(embed=embed)
+        await ctx.send(embed=embed, ephemeral=True)
 
     def generate_card(self):
         card = []
@@ -200,7 +363,7 @@ class Bingo(commands.Cog):
         card[2][2] = "FREE"  # Free space in the middle
         return card
 
-    def format_card_embed(self, card):
+    def format_card_embed(self, card, pattern):
         embed = discord.Embed(title="🎲 Your Bingo Card", color=discord.Color.blue())
 
         header = "".join(letter.center(4) for letter in ["B", "I", "N", "G", "O"])
@@ -213,44 +376,8 @@ class Bingo(commands.Cog):
             rows.append("".join(row_values))
 
         embed.description = f"```{header}\n" + "\n".join(rows) + "```"
-        embed.set_footer(text=f"Pattern: {self.current_pattern.replace('_', ' ').title()}\nMark numbers manually and call !bingo in #discord-games when you win!")
+        embed.set_footer(text=f"Pattern: {pattern.replace('_', ' ').title()}\nNumbers are marked automatically. Winners are announced in #discord-games!")
         return embed
 
-    def check_bingo(self, card):
-        marked = [[(str(card[c][r]) == "FREE") or (self.format_number(c, card[c][r]) in self.called_numbers) for c in range(5)] for r in range(5)]
-
-        if self.current_pattern == "row_col_diag":
-            for r in range(5):
-                if all(marked[r]):
-                    return True
-            for c in range(5):
-                if all(marked[r][c] for r in range(5)):
-                    return True
-            if all(marked[i][i] for i in range(5)):
-                return True
-            if all(marked[i][4 - i] for i in range(5)):
-                return True
-        elif self.current_pattern == "blackout":
-            return all(all(row) for row in marked)
-        elif self.current_pattern == "four_corners":
-            return marked[0][0] and marked[0][4] and marked[4][0] and marked[4][4]
-        elif self.current_pattern == "f_pattern":
-            col_full = all(marked[r][0] for r in range(5))
-            top_row = all(marked[0][c] for c in range(5))
-            mid_row = all(marked[2][c] for c in range(5))
-            if col_full and top_row and mid_row:
-                return True
-        elif self.current_pattern == "l_pattern":
-            col_full = all(marked[r][0] for r in range(5))
-            bottom_row = all(marked[4][c] for c in range(5))
-            if col_full and bottom_row:
-                return True
-
-        return False
-
-    def format_number(self, col, number):
-        prefix = ["B", "I", "N", "G", "O"][col]
-        return f"{prefix}-{number}"
-
 async def setup(bot):
     await bot.add_cog(Bingo(bot))
@@ -1,158 +1,283 @@
-import random
 import discord
 import asyncio
-import json
-import os
+from discord import app_commands
 from discord.ext import commands
-from config import MOD_ID, GROUP_ID, CHANNEL_ID  # Assuming MOD_ROLE_ID is defined in config.py
+from utils.gamedata import Question, load_questions, normalize_answer
+from utils.guild_config import get_guild_config
+from utils.handover import deadline_in, get_handover, restore_view, saved_view, seconds_until
+from utils.interactions import Answer, AnswerView, refuse_quietly
+from utils.ledger import get_ledger
+from utils.question_bank import QuestionBank
+from utils.sessions import GameSession, SessionManager
+from utils.timers import get_scheduler
 
-ALLOWED_ROLE_ID = MOD_ID  # change this to your desired role ID
-GROUP_ROLE_ID = GROUP_ID # change this to your desired user group role ID
-ALLOWED_CHANNEL_ID = CHANNEL_ID  # change this to your desired channel ID
+QUESTION_TIMEOUT = 20.0  # seconds without a new answer before a question times out
 
-QUESTION_FILE = "cogs/data/flquiz_questions.json"  # Adjust path if needed
+
+class QuizSession(GameSession):
+    def __init__(self, guild_id, channel_id, started_by):
+        super().__init__(guild_id, channel_id, started_by)
+        self.winners = set()
+        self.ended = False
+        self.questions = []
+        self.index = 0  # question being asked
+        self.answer_view = None
+        self.deadline = None
+        self.waiting = False  # waiting for an answer, with nothing half-handled
 
 
 class FLQuiz(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.active_games = set()
-        self.lock = asyncio.Lock()
-        self.quiz_starter = {}  # To track who started the quiz
-            
-    @commands.command(name="flquiz")
-    async def start_flquiz(self, ctx, num_questions: int = 3):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return  # Ignore command if not in allowed channel
+        self.config = get_guild_config(bot)
+        self.sessions = SessionManager(QuizSession, "flquiz")
+        self.timers = get_scheduler(bot)
+        self.bank = QuestionBank(load_questions())  # validated and indexed once; reload the cog to pick up edits
+        self.handover = get_handover(bot)
+        self.handover.register("flquiz", self.sessions, self.export_session, self.resume_session, starts=("flquiz",))
+
+    async def cog_unload(self):
+        await self.bank.file.flush()
+
+    # ---------- Handover ----------
+    def export_session(self, session):
+        if not session.waiting or session.lock.locked() or session.deadline is None:
+            return None  # between questions, or an answer is being handled
+        view, message = session.answer_view, session.answer_view.message
+        return {
+            "channel_id": session.channel_id,
+            "started_by": session.started_by,
+            "questions": [
+                {"question": q.question, "answer": q.answer, "category": q.category, "difficulty": q.difficulty}
+                for q in session.questions
+            ],
+            "index": session.index,
+            "winners": sorted(session.winners),
+            "expires_at": deadline_in(session.deadline.remaining()),
+            "view": saved_view(view, message.id) if message else None,
+        }
+
+    async def resume_session(self, state):
+        channel = await self.handover.channel(state["channel_id"])
+        session = self.sessions.start(channel, state["started_by"])
+        if session is None:
+            return
+        session.questions = [Question.from_dict(q) for q in state["questions"]]
+        session.index = state["index"]
+        session.winners = set(state["winners"])
+        view = AnswerView("flquiz", f"Question {session.index + 1}", timeout=None)
+        if state["view"]:
+            view.message = restore_view(self.bot, channel, view, state["view"])
+        self.bot.loop.create_task(self._resume_quiz(channel, session, view, seconds_until(state["expires_at"])))
+
+    async def _resume_quiz(self, channel, session, view, timeout):
+        try:
+            await self._run_quiz(channel, session, resumed_view=view, resumed_timeout=timeout)
+        finally:
+            self.sessions.end(session)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if not message.author.bot and self.sessions.get(message.channel):
+            self.bot.dispatch("game_answer", Answer.from_message(message, "flquiz"))
+
+    @commands.hybrid_command(name="flquiz", help="Start a Forsaken Legacy Quiz Game with [num_questions] rounds (3 by default), optionally from one [category] and/or [difficulty].", extras={"mod_only": True})
+    async def start_flquiz(self, ctx, num_questions: int = 3, category: str = None, difficulty: str = None):
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)  # Ignore command if not in allowed channel
         
         # Check if user has the allowed role
-        if ALLOWED_ROLE_ID not in [role.id for role in ctx.author.roles]:
+        if not self.config.is_moderator(ctx.author):
             await ctx.send(embed=discord.Embed(
                 title="🚫 Access Denied",
                 description=f"Only CMs or Admins can start the Forsaken Legacy Quiz Game.",
                 color=discord.Color.red()
-            ))
+            ), ephemeral=True)
             return
 
-        if ctx.channel.id in self.active_games:
-            await ctx.send("⚠️ A quiz is already running in this channel.")
+        if self.sessions.get(ctx.channel):
+            await ctx.send("⚠️ A quiz is already running in this channel.", ephemeral=True)
             return
 
-        questions = self.load_questions()
-        if not questions:
+        if not len(self.bank):
             await ctx.send(
-                "❗ No quiz questions available. Please check the question file."
+                "❗ No quiz questions available. Please check the question file.", ephemeral=True
             )
             return
 
-        self.active_games.add(ctx.channel.id)
-        self.quiz_starter[ctx.channel.id] = ctx.author.id # Track who started the quiz
-        winners = set()
-        selected_questions = random.sample(questions, min(num_questions, len(questions)))
+        # tags may come in either order, e.g. "!flquiz 5 hard geography"
+        category, difficulty, unknown = self.bank.match_tags((category, difficulty))
+        if unknown or not self.bank.available(category, difficulty):
+            if unknown:
+                description = f"Unknown category or difficulty: **{', '.join(unknown)}**."
+            else:
+                description = f"No questions are tagged **{category}** and **{difficulty}**."
+            description += (
+                f"\n**Categories:** {', '.join(self.bank.categories) or '(none)'}"
+                f"\n**Difficulties:** {', '.join(self.bank.difficulties) or '(none)'}"
+            )
+            await ctx.send(
+                embed=discord.Embed(title="❓ No Matching Questions", description=description, color=discord.Color.orange()),
+                ephemeral=True,
+            )
+            return
+
+        session = self.sessions.start(ctx.channel, ctx.author.id)  # Tracks who started the quiz
+        if session is None:
+            await ctx.send("⚠️ A quiz is already running in this channel.", ephemeral=True)
+            return
+        # Everything after the opening message goes straight to the channel: a
+        # slash command's followups expire long before a long quiz ends.
+        channel = ctx.channel
+        # next questions in this guild's rotation: no repeats until the pool is used up
+        session.questions = self.bank.deal(ctx.guild.id, num_questions, category, difficulty)
+        topic = " · ".join(tag.title() for tag in (category, difficulty) if tag)
 
         try:
             flquiz_embed = discord.Embed(
                 title="🧠 Forsaken Legacy Quiz Game",
-                description=f"Hello! We are starting a new quiz with {num_questions} rounds of questions!\nFirst to answer wins **1x Event Box**.\n*Each player can only win once!*",
+                description=f"Hello! We are starting a new quiz with {len(session.questions)} rounds of questions!\nFirst to answer wins **1x Event Box**.\n*Each player can only win once!*",
                 color=discord.Color.purple(),
             )
+            if topic:
+                flquiz_embed.add_field(name="Topic", value=topic)
             await ctx.send(embed=flquiz_embed)
+            await self._run_quiz(channel, session)
+        finally:
+            self.sessions.end(session)
 
-            for i, q in enumerate(selected_questions, 1):
-                if ctx.channel.id not in self.active_games:
-                    break  # Quiz was ended early
+    async def _run_quiz(self, channel, session, resumed_view=None, resumed_timeout=QUESTION_TIMEOUT):
+        """Ask the session's questions from `session.index` on, then wrap up. A handed-over quiz re-enters with its open question's view."""
+        winners = session.winners
+        while session.index < len(session.questions):
+            if session.ended:
+                break  # Quiz was ended early
+            i = session.index + 1
+            q = session.questions[session.index]
+            if resumed_view is not None:
+                answer_view, resumed_view = resumed_view, None
+                timeout = resumed_timeout
+            else:
                 question_embed = discord.Embed(
                     title=f"❓ Question {i}",
-                    description=q["question"],
+                    description=q.question,
                     color=discord.Color.blurple(),
-                ).set_footer(text="Reply in chat to answer!")
-                await ctx.send(embed=question_embed)
+                ).set_footer(text="Reply in chat or press Answer!")
+                answer_view = AnswerView("flquiz", f"Question {i}")
+                answer_view.message = await channel.send(embed=question_embed, view=answer_view)
+                timeout = QUESTION_TIMEOUT
+            session.answer_view = answer_view
+
+            answered = False
+            lock = session.lock
 
-                answered = False
-                lock = asyncio.Lock()
+            def check(a):
+                return a.game == "flquiz" and a.channel.id == channel.id and not a.author.bot
 
-                def check(m):
-                    return m.channel == ctx.channel and not m.author.bot
-                
-                try:
+            try:
+                # idle timeout restarts on every answer, same as a fresh wait_for per guess
+                async with self.timers.timeout(timeout, name=f"flquiz question #{channel.id}") as deadline:
+                    session.deadline = deadline
                     while not answered:
-                        if ctx.channel.id not in self.active_games:
+                        if session.ended:
                             break # Quiz was ended early
-                        msg = await self.bot.wait_for("message", timeout=20.0, check=check)
+                        session.waiting = True  # resumable from here (see export_session)
+                        try:
+                            answer = await self.bot.wait_for("game_answer", check=check)
+                        finally:
+                            session.waiting = False
+                        deadline.reschedule(QUESTION_TIMEOUT)
 
                         async with lock:
                             if answered:
                                 continue
-                            
-                            if msg.author.id in winners:
+                        
+                            if answer.author.id in winners:
                                 already_won_embed = discord.Embed(
-                                    description=f"🛑 {msg.author.mention}, you've already won. Let others try!",
+                                    description=f"🛑 {answer.author.mention}, you've already won. Let others try!",
                                     color=discord.Color.red(),
                                 )
-                                await ctx.send(embed=already_won_embed)
+                                await answer.reply(embed=already_won_embed)
                                 continue
 
-                            if msg.content.lower().strip() == q["answer"].lower().strip():
+                            if normalize_answer(answer.content) == q.answer_key:
                                 answered = True
-                                winners.add(msg.author.id)
-                                await ctx.send(
+                                winners.add(answer.author.id)
+                                await channel.send(
                                     embed=discord.Embed(
-                                        description=f"✅ Correct! {msg.author.mention} got it. The answer was **{q['answer']}**.",
+                                        description=f"✅ Correct! {answer.author.mention} got it. The answer was **{q.answer}**.",
                                         color=discord.Color.green(),
                                     )
                                 )
                             else:
-                                await ctx.send(
+                                await answer.reply(
                                     embed=discord.Embed(
-                                        description=f"❌ Wrong answer, {msg.author.mention}!",
+                                        description=f"❌ Wrong answer, {answer.author.mention}!",
                                         color=discord.Color.red(),
                                     )
                                 )
-                except asyncio.TimeoutError:
-                    await ctx.send(
+            except asyncio.TimeoutError:
+                if not answered:
+                    await channel.send(
                         embed=discord.Embed(
-                            description=f"⏰ Time's up! The correct answer was **{q['answer']}**.",
+                            description=f"⏰ Time's up! The correct answer was **{q.answer}**.",
                             color=discord.Color.red(),
                         ).set_footer(text="⏭ Moving to next question...")
                     )
+            finally:
+                session.deadline = None
+                await answer_view.close()
+            session.index += 1
 
         # Wrap-up summary
-            if winners:
-                mentions = [f"<@{uid}>" for uid in winners]
-                summary_embed = (
-                    discord.Embed(
-                        title="🎉 Forsaken Legacy Quiz Finished",
-                        description="Congratulations to the winners! Reply your IGN below.",
-                        color=discord.Color.gold(),
-                    ).add_field(
-                        name="Each winner will get 1x Event Box.", value="\n".join(mentions)
-                    ).set_footer(text="Event Boxes will be sent by [CM] Gold Ship after the event.")
-                )
-                await ctx.send(embed=summary_embed)
-            else:
-                await ctx.send(
-                    embed=discord.Embed(
-                        title="🎉 Forsaken Legacy Quiz - Game Over",
-                        description="No one answered any questions correctly. Better luck next time!",
-                        color=discord.Color.red(),
-                    )
+        if winners:
+            ledger = get_ledger(self.bot)
+            for uid in winners:
+                ledger.record_win(session, "flquiz", uid, {"Event Box": 1})
+            mentions = [f"<@{uid}>" for uid in winners]
+            summary_embed = (
+                discord.Embed(
+                    title="🎉 Forsaken Legacy Quiz Finished",
+                    description="Congratulations to the winners! Reply your IGN below.",
+                    color=discord.Color.gold(),
+                ).add_field(
+                    name="Each winner will get 1x Event Box.", value="\n".join(mentions)
+                ).set_footer(text="Event Boxes will be sent by [CM] Gold Ship after the event.")
+            )
+            await channel.send(embed=summary_embed)
+        else:
+            await channel.send(
+                embed=discord.Embed(
+                    title="🎉 Forsaken Legacy Quiz - Game Over",
+                    description="No one answered any questions correctly. Better luck next time!",
+                    color=discord.Color.red(),
                 )
-        finally:
-            self.active_games.discard(ctx.channel.id)
+            )
+
+    @start_flquiz.autocomplete("category")
+    async def category_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        current = current.strip().casefold()
+        return [app_commands.Choice(name=c.title(), value=c) for c in self.bank.categories if c.startswith(current)][:25]
+
+    @start_flquiz.autocomplete("difficulty")
+    async def difficulty_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        current = current.strip().casefold()
+        return [app_commands.Choice(name=d.title(), value=d) for d in self.bank.difficulties if d.startswith(current)][:25]
 
-    @commands.command(name="stopquiz", help="End the current Forsaken Legacy Quiz early (event starter only).")
+    @commands.hybrid_command(name="stopquiz", help="End the current Forsaken Legacy Quiz early (event starter only).", extras={"mod_only": True})
     async def end_flquiz(self, ctx):
-        if ctx.channel.id not in self.active_games:
-            await ctx.send("❗ There is no active Forsaken Legacy Quiz running in this channel.")
+        session = self.sessions.get(ctx.channel)
+        if not session:
+            await ctx.send("❗ There is no active Forsaken Legacy Quiz running in this channel.", ephemeral=True)
             return
 
         # Only the event starter can end the quiz
-        if ctx.author.id != self.quiz_starter.get(ctx.channel.id):
-            await ctx.send("🚫 Only the event starter can end this quiz early.")
+        if ctx.author.id != session.started_by:
+            await ctx.send("🚫 Only the event starter can end this quiz early.", ephemeral=True)
             return
 
-        self.active_games.discard(ctx.channel.id)
-        self.quiz_starter.pop(ctx.channel.id, None)  # Clean up starter info
+        session.ended = True
+        self.sessions.end(session)
         await ctx.send(
             embed=discord.Embed(
                 title="🛑 Quiz Ended Early",
@@ -161,18 +286,6 @@ class FLQuiz(commands.Cog):
             )
         )
 
-    def load_questions(self):
-        try:
-            with open(QUESTION_FILE, "r", encoding="utf-8") as f:
-                questions = json.load(f)
-                if isinstance(questions, list) and all("question" in q and "answer" in q for q in questions):
-                    return questions
-                else:
-                    print("Invalid question format in JSON.")
-                    return []
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Failed to load questions: {e}")
-            return []
-        
+
 async def setup(bot):
     await bot.add_cog(FLQuiz(bot))
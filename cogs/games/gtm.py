@@ -1,128 +1,191 @@
 import discord
 import random
-import json
 import asyncio
 import os
 from discord.ext import commands
-from config import MOD_ID, GROUP_ID, CHANNEL_ID, MONSTER_IMAGE_FOLDER
+from utils.gamedata import Monster, is_url, load_monsters, normalize_answer
+from utils.guild_config import get_guild_config
+from utils.handover import deadline_in, get_handover, restore_view, saved_view, seconds_until
+from utils.interactions import Answer, AnswerView, refuse_quietly
+from utils.ledger import get_ledger
+from utils.sessions import GameSession, SessionManager
+from utils.timers import get_scheduler
 
-ALLOWED_ROLE_ID = MOD_ID
-GROUP_ROLE_ID = GROUP_ID
-ALLOWED_CHANNEL_ID = CHANNEL_ID
+ROUND_TIMEOUT = 20  # seconds per round
 
-MONSTER_DATA_FILE = "cogs/data/monsters.json"
-MONSTER_FOLDER = MONSTER_IMAGE_FOLDER
+
+class MonsterSession(GameSession):
+    def __init__(self, guild_id, channel_id, started_by):
+        super().__init__(guild_id, channel_id, started_by)
+        self.round = None  # {"monster": Monster, "guessed": bool} for the current round
+        self.winners = set()
+        self.ended = False
+        self.monsters = []
+        self.index = 0  # next round to play
+        self.answer_view = None
+        self.deadline = None
+        self.waiting = False  # waiting for a guess, with nothing half-handled
 
 
 class MonsterQuiz(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.active_round = {}
-        self.winners = set()
-        self.lock = asyncio.Lock()
-        self.event_starter = None
-
+        self.config = get_guild_config(bot)
+        self.sessions = SessionManager(MonsterSession, "gtm")
+        self.timers = get_scheduler(bot)
+        self.monsters = load_monsters()  # validated and normalized once
+        self.handover = get_handover(bot)
+        self.handover.register("gtm", self.sessions, self.export_session, self.resume_session, starts=("gtm",))
+
+    # ---------- Handover ----------
+    def export_session(self, session):
+        if not session.waiting or session.lock.locked() or session.deadline is None:
+            return None  # between rounds, or a guess is being handled
+        view, message = session.answer_view, session.answer_view.message
+        return {
+            "channel_id": session.channel_id,
+            "started_by": session.started_by,
+            "monsters": [
+                {"name": list(m.names), "image": m.image, "silhouette": m.silhouette} for m in session.monsters
+            ],
+            "index": session.index - 1,  # the open round is played again, without a new post
+            "winners": sorted(session.winners),
+            "expires_at": deadline_in(session.deadline.remaining()),
+            "view": saved_view(view, message.id) if message else None,
+        }
+
+    async def resume_session(self, state):
+        channel = await self.handover.channel(state["channel_id"])
+        session = self.sessions.start(channel, state["started_by"])
+        if session is None:
+            return
+        session.monsters = [Monster.from_dict(m) for m in state["monsters"]]
+        session.index = state["index"]
+        session.winners = set(state["winners"])
+        view = AnswerView("gtm", f"Round {session.index + 1}", timeout=None)
+        if state["view"]:
+            view.message = restore_view(self.bot, channel, view, state["view"])
+        self.bot.loop.create_task(self._resume_rounds(channel, session, view, seconds_until(state["expires_at"])))
+
+    async def _resume_rounds(self, channel, session, view, timeout):
         try:
-            with open(MONSTER_DATA_FILE, "r", encoding="utf-8") as f:
-                self.monsters = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Failed to load monster data: {e}")
-            self.monsters = []
+            await self._run_rounds(channel, session, resumed_view=view, resumed_timeout=timeout)
+        finally:
+            self.sessions.end(session)
 
-    @commands.command(name="gtm")
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        if not message.author.bot and self.sessions.get(message.channel):
+            self.bot.dispatch("game_answer", Answer.from_message(message, "gtm"))
+
+    @commands.hybrid_command(name="gtm", help="Start a Guess the Monster Game with [rounds] rounds (3 by default).", extras={"mod_only": True})
     async def start_monster_quiz(self, ctx, rounds: int = 3):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)
 
-        if ALLOWED_ROLE_ID not in [role.id for role in ctx.author.roles]:
+        if not self.config.is_moderator(ctx.author):
             await ctx.send(embed=discord.Embed(
                 title="🚫 Access Denied",
                 description="Only CMs or Admins can start the Guess the Monster game.",
                 color=discord.Color.red()
-            ))
+            ), ephemeral=True)
             return
 
         if not self.monsters:
-            await ctx.send("❗ No monster data available. Cannot start quiz.")
+            await ctx.send("❗ No monster data available. Cannot start quiz.", ephemeral=True)
             return
 
-        async with self.lock:
-            if ctx.channel.id in self.active_round:
-                await ctx.send("⚠️ A monster quiz is already running in this channel.")
-                return
-
-            self.active_round[ctx.channel.id] = None
-            self.winners.clear()
-            self.event_starter = ctx.author.id
-
-        await ctx.send(embed=discord.Embed(
-            title="👹 Forsaken Legacy - Guess the Monster Game",
-            description=f"Starting a new quiz with **{rounds} round{'s' if rounds != 1 else ''}**! Type your guesses in chat.",
-            color=discord.Color.green()
-        ))
-
-        # Work with a copy so original list stays intact
-        available_monsters = self.monsters.copy()
+        session = self.sessions.start(ctx.channel, ctx.author.id)
+        if session is None:
+            await ctx.send("⚠️ A monster quiz is already running in this channel.", ephemeral=True)
+            return
 
-        for round_num in range(min(rounds, len(available_monsters))):
-            if ctx.channel.id not in self.active_round:
+        try:
+            await ctx.send(embed=discord.Embed(
+                title="👹 Forsaken Legacy - Guess the Monster Game",
+                description=f"Starting a new quiz with **{rounds} round{'s' if rounds != 1 else ''}**! Type your guesses in chat or press **Answer**.",
+                color=discord.Color.green()
+            ))
+            # Rounds post straight to the channel: a slash command's followups
+            # expire long before a long game ends.
+            channel = ctx.channel
+
+            # No repeats within a game
+            session.monsters = random.sample(self.monsters, min(rounds, len(self.monsters)))
+            await self._run_rounds(channel, session)
+        finally:
+            self.sessions.end(session)  # a failed send must not leave the channel locked
+
+    async def _run_rounds(self, channel, session, resumed_view=None, resumed_timeout=ROUND_TIMEOUT):
+        """Play the session's rounds from `session.index` on, then wrap up. A handed-over game re-enters with its open round's view."""
+        while session.index < len(session.monsters):
+            if session.ended:
                 break
+            round_num = session.index
+            monster = session.monsters[round_num]
+            session.index += 1
 
-            monster = random.choice(available_monsters)
-            available_monsters.remove(monster)  # No repeats
-
-            names = monster["name"] if isinstance(monster["name"], list) else [monster["name"]]
-            valid_answers = [n.lower().strip() for n in names]
-
-            async with self.lock:
-                self.active_round[ctx.channel.id] = {"answer": valid_answers, "guessed": False}
-
-            embed = discord.Embed(
-                title=f"🎩 Guess the Monster! Round {round_num + 1}!",
-                description="Here's a silhouette... Type your answer in chat!",
-                color=discord.Color.dark_gray()
-            )
-
-            silhouette_path = monster.get("silhouette", "").strip()
-            if not silhouette_path:
-                await ctx.send("❗ No silhouette image provided for this monster.")
-                continue
+            async with session.lock:
+                session.round = {"monster": monster, "guessed": False}
 
-            if silhouette_path.startswith(("http://", "https://")):
-                embed.set_image(url=silhouette_path)
-                await ctx.send(embed=embed)
+            if resumed_view is not None:
+                answer_view, resumed_view = resumed_view, None
+                timeout = resumed_timeout
             else:
-                full_path = silhouette_path
-                if not os.path.isabs(full_path):
-                    full_path = os.path.join(MONSTER_FOLDER, silhouette_path)
-
-                if not os.path.isfile(full_path):
-                    await ctx.send(f"❗ Silhouette image not found: `{silhouette_path}`")
+                embed = discord.Embed(
+                    title=f"🎩 Guess the Monster! Round {round_num + 1}!",
+                    description="Here's a silhouette... Type your answer in chat or press **Answer**!",
+                    color=discord.Color.dark_gray()
+                )
+                answer_view = AnswerView("gtm", f"Round {round_num + 1}")
+                timeout = ROUND_TIMEOUT
+
+                full_path = monster.silhouette
+                if not full_path:
+                    await channel.send("❗ No silhouette image provided for this monster.")
                     continue
 
-                file = discord.File(full_path, filename="silhouette.gif" if full_path.endswith(".gif") else "silhouette.jpg")
-                embed.set_image(url=f"attachment://{file.filename}")
-                await ctx.send(embed=embed, file=file)
+                if is_url(full_path):
+                    embed.set_image(url=full_path)
+                    answer_view.message = await channel.send(embed=embed, view=answer_view)
+                else:
+                    if not os.path.isfile(full_path):
+                        await channel.send(f"❗ Silhouette image not found: `{os.path.basename(full_path)}`")
+                        continue
+
+                    file = discord.File(full_path, filename="silhouette.gif" if full_path.endswith(".gif") else "silhouette.jpg")
+                    embed.set_image(url=f"attachment://{file.filename}")
+                    answer_view.message = await channel.send(embed=embed, file=file, view=answer_view)
+            session.answer_view = answer_view
 
             try:
-                await asyncio.wait_for(self._wait_for_guess(ctx, monster), timeout=20)
+                async with self.timers.timeout(timeout, name=f"gtm round #{channel.id}") as deadline:
+                    session.deadline = deadline
+                    await self._wait_for_guess(channel, session, monster)
             except asyncio.TimeoutError:
-                async with self.lock:
-                    round_info = self.active_round.get(ctx.channel.id)
-                    if round_info and not round_info["guessed"]:
-                        await ctx.send(embed=discord.Embed(
+                async with session.lock:
+                    round_info = session.round
+                    if round_info and not round_info["guessed"] and not session.ended:
+                        await channel.send(embed=discord.Embed(
                             title="⏳ Time's Up!",
                             description="No one guessed correctly in this round.",
                             color=discord.Color.orange()
                         ))
-                        await self._reveal_monster(ctx, monster, winner=None)
-                        self.active_round[ctx.channel.id]["guessed"] = True
-
-        async with self.lock:
-            self.active_round.pop(ctx.channel.id, None)
-
-        if self.winners:
-            mentions = [f"<@{uid}>" for uid in self.winners]
+                        await self._reveal_monster(channel, monster, winner=None)
+                        round_info["guessed"] = True
+            finally:
+                session.deadline = None
+                await answer_view.close()
+
+        self.sessions.end(session)
+        if session.ended:
+            return  # stopped early; !stopgtm already announced it
+
+        if session.winners:
+            ledger = get_ledger(self.bot)
+            for uid in session.winners:
+                ledger.record_win(session, "gtm", uid, {"Event Box": 1})
+            mentions = [f"<@{uid}>" for uid in session.winners]
             summary_embed = discord.Embed(
                 title="🏁 Guess the Monster Game Summary",
                 description="Congratulations to the winners! Reply your IGN below.",
@@ -130,94 +193,87 @@ class MonsterQuiz(commands.Cog):
             )
             summary_embed.add_field(name="Winners 🎉", value="\n".join(mentions), inline=False)
             summary_embed.set_footer(text="Event Boxes will be sent by [CM] Gold Ship after the event.")
-            await ctx.send(embed=summary_embed)
+            await channel.send(embed=summary_embed)
         else:
-            await ctx.send(embed=discord.Embed(
+            await channel.send(embed=discord.Embed(
                 title="📭 Guess the Monster Game Finished",
                 description="No one answered correctly this time. Better luck next game!",
                 color=discord.Color.red()
             ))
 
-    async def _wait_for_guess(self, ctx, monster):
-        names = monster["name"] if isinstance(monster["name"], list) else [monster["name"]]
-        valid_answers = [n.lower().strip() for n in names]
-
-        def check(m):
-            return m.channel == ctx.channel and not m.author.bot
+    async def _wait_for_guess(self, channel, session, monster):
+        def check(a):
+            return a.game == "gtm" and a.channel.id == channel.id and not a.author.bot
 
         while True:
-            if ctx.channel.id not in self.active_round:
+            if session.ended:
                 return
 
-            msg = await self.bot.wait_for("message", check=check)
+            session.waiting = True  # resumable from here (see export_session)
+            try:
+                answer = await self.bot.wait_for("game_answer", check=check)
+            finally:
+                session.waiting = False
 
-            async with self.lock:
-                round_info = self.active_round.get(ctx.channel.id)
-                if not round_info or round_info["guessed"]:
+            async with session.lock:
+                round_info = session.round
+                if session.ended or not round_info or round_info["guessed"]:
                     continue
 
-                if msg.author.id in self.winners:
-                    await ctx.send(f"🛑 {msg.author.mention}, you've already answered correctly in this game! Let others try.")
+                if answer.author.id in session.winners:
+                    await answer.reply(f"🛑 {answer.author.mention}, you've already answered correctly in this game! Let others try.")
                     continue
 
-                if msg.content.lower().strip() in valid_answers:
+                if normalize_answer(answer.content) in monster.answers:
                     round_info["guessed"] = True
-                    self.winners.add(msg.author.id)
-                    await self._reveal_monster(ctx, monster, winner=msg.author)
+                    session.winners.add(answer.author.id)
+                    await self._reveal_monster(channel, monster, winner=answer.author)
                     return
                 else:
-                    await ctx.send(f"❌ Wrong answer, {msg.author.mention}!")
-
-    async def _reveal_monster(self, ctx, monster, winner=None):
-        names = monster["name"] if isinstance(monster["name"], list) else [monster["name"]]
-        display_names = " or ".join(names)
+                    await answer.reply(f"❌ Wrong answer, {answer.author.mention}!")
 
+    async def _reveal_monster(self, channel, monster, winner=None):
         reveal_embed = discord.Embed(
             title="👁 Monster Revealed!",
-            description=f"The correct answer was **{display_names}**.",
+            description=f"The correct answer was **{monster.display_name}**.",
             color=discord.Color.purple()
         )
 
         if winner:
             reveal_embed.add_field(name="Winner 🎉", value=f"{winner.mention}", inline=False)
 
-        image_path = monster.get("image")
-        if not image_path:
+        full_path = monster.image
+        if not full_path:
             reveal_embed.description += "\n⚠️ No image available."
-            await ctx.send(embed=reveal_embed)
+            await channel.send(embed=reveal_embed)
             return
 
-        if image_path.startswith(("http://", "https://")):
-            reveal_embed.set_image(url=image_path)
-            await ctx.send(embed=reveal_embed)
+        if is_url(full_path):
+            reveal_embed.set_image(url=full_path)
+            await channel.send(embed=reveal_embed)
         else:
-            # Fix: ensure we look in the monster image folder if not absolute path
-            full_path = image_path
-            if not os.path.isabs(full_path):
-                full_path = os.path.join(MONSTER_FOLDER, image_path)
-
             if os.path.isfile(full_path):
                 file = discord.File(full_path, filename="monster.gif" if full_path.endswith(".gif") else "monster.jpg")
                 reveal_embed.set_image(url=f"attachment://{file.filename}")
-                await ctx.send(embed=reveal_embed, file=file)
+                await channel.send(embed=reveal_embed, file=file)
             else:
                 reveal_embed.description += "\n⚠️ Image not found."
-                await ctx.send(embed=reveal_embed)
+                await channel.send(embed=reveal_embed)
 
-    @commands.command(name="stopgtm", help="End the current Guess the Monster game early (event starter only).")
+    @commands.hybrid_command(name="stopgtm", help="End the current Guess the Monster game early (event starter only).", extras={"mod_only": True})
     async def end_monster_quiz(self, ctx):
-        if ctx.channel.id not in self.active_round:
-            await ctx.send("❗ There is no active Guess the Monster game running in this channel.")
+        session = self.sessions.get(ctx.channel)
+        if not session:
+            await ctx.send("❗ There is no active Guess the Monster game running in this channel.", ephemeral=True)
             return
 
-        if getattr(self, "event_starter", None) != ctx.author.id:
-            await ctx.send("🚫 Only the event starter can end this game early.")
+        if session.started_by != ctx.author.id:
+            await ctx.send("🚫 Only the event starter can end this game early.", ephemeral=True)
             return
 
-        async with self.lock:
-            self.active_round.pop(ctx.channel.id, None)
-            self.winners.clear()
-            self.event_starter = None
+        async with session.lock:
+            session.ended = True
+            self.sessions.end(session)
 
         await ctx.send(embed=discord.Embed(
             title="🛑 Game Ended Early",
@@ -1,117 +1,202 @@
+import asyncio
 import random
 import discord
 from discord.ext import commands, tasks
-import asyncio
-from config import MOD_ID, GROUP_ID, CHANNEL_ID  # Assuming MOD_ROLE_ID is defined in config.py
+from utils.guild_config import get_guild_config
+from utils.handover import deadline_in, get_handover, restore_view, saved_view, seconds_until
+from utils.interactions import Answer, AnswerView, refuse_quietly
+from utils.ledger import get_ledger
+from utils.sessions import GameSession, SessionManager
+from utils.timers import get_scheduler
+
+SETTLE_WINDOW = 1.5  # seconds to collect late-delivered correct guesses before picking the winner
+GAME_TIMEOUT = 600  # 10 minutes
+
+
+class GuessSession(GameSession):
+    def __init__(self, guild_id, channel_id, started_by, target):
+        super().__init__(guild_id, channel_id, started_by)
+        self.target = target
+        self.timeout = None
+        self.winning_answer = None  # earliest correct guess seen so far (by snowflake)
+        self.settle_timer = None
+        self.answer_view = None
+        self.hints: set[asyncio.Task] = set()  # handlers still sending a too high/low reply
 
-ALLOWED_ROLE_ID = MOD_ID  # change this to your desired role ID
-GROUP_ROLE_ID = GROUP_ID # change this to your desired user group role ID
-ALLOWED_CHANNEL_ID = CHANNEL_ID  # change this to your desired channel ID
 
 class NumberGuess(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.active_game = {}
-        self.lock = asyncio.Lock()
+        self.config = get_guild_config(bot)
+        self.sessions = SessionManager(GuessSession, "gtn")
+        self.timers = get_scheduler(bot)
+        self.handover = get_handover(bot)
+        self.handover.register("gtn", self.sessions, self.export_session, self.resume_session, starts=("gtn",))
+
+    # ---------- Handover ----------
+    def export_session(self, game):
+        if game.settle_timer is not None:
+            return None  # a winner is being settled; hand over after
+        message = game.answer_view.message if game.answer_view else None
+        return {
+            "channel_id": game.channel_id,
+            "started_by": game.started_by,
+            "target": game.target,
+            "expires_at": deadline_in(game.timeout.remaining()),
+            "view": saved_view(game.answer_view, message.id) if message else None,
+        }
+
+    async def resume_session(self, state):
+        channel = await self.handover.channel(state["channel_id"])
+        game = self.sessions.start(channel, state["started_by"], target=state["target"])
+        if game is None:
+            return
+        game.timeout = self.timers.call_later(
+            seconds_until(state["expires_at"]), self.expire_game, channel, game, name=f"gtn expiry #{channel.id}"
+        )
+        game.answer_view = AnswerView("gtn", "Guess the Number", timeout=None)
+        if state["view"]:
+            game.answer_view.message = restore_view(self.bot, channel, game.answer_view, state["view"])
 
-    @commands.command(name="gtn", help="Start a new Guess the Number game. The bot picks a number between 1 and 2026.")
+    @commands.hybrid_command(name="gtn", help="Start a new Guess the Number game. The bot picks a number between 1 and 2026.", extras={"mod_only": True})
     async def guess_number(self, ctx):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return  # Ignore command if not in allowed channel
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)  # Ignore command if not in allowed channel
         
         # Check if user has the allowed role
-        if ALLOWED_ROLE_ID not in [role.id for role in ctx.author.roles]:
+        if not self.config.is_moderator(ctx.author):
             await ctx.send(embed=discord.Embed(
                 title="🚫 Access Denied",
                 description=f"Only CMs or Admins can start the Guess the Number game.",
                 color=discord.Color.red()
-            ))
-            return
-        
-        if self.active_game:
-            user_id = self.active_game["user_id"]
-            await ctx.send(f"⚠️ A game is already in progress by <@{user_id}>. Please wait for it to finish or expire.")
+            ), ephemeral=True)
             return
         
         # Start a new game
-
         number = random.randint(1, 2026)
-        timeout_task = self.bot.loop.create_task(self.expire_game(ctx))
+        game = self.sessions.start(ctx.channel, ctx.author.id, target=number)
+        if game is None:
+            user_id = self.sessions.get(ctx.channel).started_by
+            await ctx.send(f"⚠️ A game is already in progress by <@{user_id}>. Please wait for it to finish or expire.", ephemeral=True)
+            return
 
-        self.active_game = {"user_id": ctx.author.id, "target": number, "timeout": timeout_task}
+        game.timeout = self.timers.call_later(
+            GAME_TIMEOUT, self.expire_game, ctx.channel, game, name=f"gtn expiry #{ctx.channel.id}"
+        )
 
         embed = discord.Embed(
             title="🎲 Forsaken Legacy - Guess the Number Game",
             description=(
                 f"Hello! I've picked a number between **1 and 2026**.\n"
-                "Type your guess in chat!"
+                "Type your guess in chat or press **Answer**!"
             ),
             color=discord.Color.orange(),
         ).set_footer(text="Winner will get 1 Event Box.")
-        await ctx.send(embed=embed)
+        game.answer_view = AnswerView("gtn", "Guess the Number", timeout=GAME_TIMEOUT)
+        game.answer_view.message = await ctx.send(embed=embed, view=game.answer_view)
 
-    async def expire_game(self, ctx):
-        await asyncio.sleep(600)  # 10 minutes timeout
-        if self.active_game:
-            user_id = self.active_game["user_id"]
-            await ctx.send(f"⌛ <@{user_id}>, your Guess the Number game has expired due to inactivity.")
-            self.active_game = None
+    async def expire_game(self, channel, game):
+        if self.sessions.end(game):
+            await game.answer_view.close()
+            await channel.send(f"⌛ <@{game.started_by}>, your Guess the Number game has expired due to inactivity.")
 
     @commands.Cog.listener()
     async def on_message(self, message):
         if message.author.bot:
             return
 
-        async with self.lock:
-            if not self.active_game:
-                return
-
-            content = message.content.strip()
-            if not content.isdigit():
-                return
-
-            guess = int(content)
-            target = self.active_game["target"]
-
-            if not (1 <= guess <= 2026):
-                await message.channel.send(f"❗ {message.author.mention}, your guess must be between 1 and 2026.")
-                return
-
-            if guess == target:
-                embed = discord.Embed(
-                    title="🎉 Correct!",
-                    description=f"Well done {message.author.mention}, the number was **{target}**! Reply your IGN below.",
-                    color=discord.Color.green(),
-                ).set_footer(text="Your Event Box will be sent by [CM] Gold Ship after the event.")
-                await message.channel.send(embed=embed)
-                self.active_game["timeout"].cancel()
-                self.active_game = None
-            elif guess < target:
-                await message.channel.send(f"🔻 {message.author.mention}, too low! Try a higher number.")
-            else:
-                await message.channel.send(f"🔺 {message.author.mention}, too high! Try a lower number.")
-
-    @commands.command(name="stopgtn", help="End the current Guess the Number game early (event starter only).")
+        game = self.sessions.get(message.channel)
+        if game:
+            await self.judge(game, Answer.from_message(message, "gtn"))
+
+    @commands.Cog.listener()
+    async def on_game_answer(self, answer):
+        if answer.game != "gtn":
+            return
+        game = self.sessions.get(answer.channel)
+        if game:
+            await self.judge(game, answer)
+
+    async def judge(self, game, answer):
+        # No lock: judging is pure CPU and replies are sent concurrently, so a
+        # slow hint reply never delays the next guess.
+        content = answer.content.strip()
+        if not content.isdigit():
+            return
+
+        guess = int(content)
+        target = game.target
+
+        if guess == target:
+            # Snowflakes encode the send time, so the lowest id among correct
+            # guesses is the first one sent, whatever order they arrive in.
+            if game.winning_answer is None or answer.id < game.winning_answer.id:
+                game.winning_answer = answer
+            if game.settle_timer is None:
+                game.settle_timer = self.timers.call_later(
+                    SETTLE_WINDOW, self.settle_winner, answer.channel, game,
+                    name=f"gtn settle #{answer.channel.id}",
+                )
+                # hints still waiting on the rate limiter would land after the game is won
+                for task in game.hints:
+                    task.cancel()
+                game.hints.clear()
+            return
+
+        if game.settle_timer is not None:
+            return  # already decided; skip hints while the winner settles
+
+        if not (1 <= guess <= 2026):
+            hint = f"❗ {answer.author.mention}, your guess must be between 1 and 2026."
+        elif guess < target:
+            hint = f"🔻 {answer.author.mention}, too low! Try a higher number."
+        else:
+            hint = f"🔺 {answer.author.mention}, too high! Try a lower number."
+        task = asyncio.current_task()
+        game.hints.add(task)
+        try:
+            await answer.reply(hint)
+        finally:
+            game.hints.discard(task)
+
+    async def settle_winner(self, channel, game):
+        if not self.sessions.end(game):
+            return  # stopped or expired meanwhile
+        game.timeout.cancel()
+        await game.answer_view.close()
+        winner = game.winning_answer.author
+        embed = discord.Embed(
+            title="🎉 Correct!",
+            description=f"Well done {winner.mention}, the number was **{game.target}**! Reply your IGN below.",
+            color=discord.Color.green(),
+        ).set_footer(text="Your Event Box will be sent by [CM] Gold Ship after the event.")
+        await channel.send(embed=embed)
+        get_ledger(self.bot).record_win(game, "gtn", winner.id, {"Event Box": 1})
+
+    @commands.hybrid_command(name="stopgtn", help="End the current Guess the Number game early (event starter only).", extras={"mod_only": True})
     async def end_guess_number(self, ctx):
-        if not self.active_game:
-            await ctx.send("❗ There is no active Guess the Number game to end.")
+        game = self.sessions.get(ctx.channel)
+        if not game:
+            await ctx.send("❗ There is no active Guess the Number game to end.", ephemeral=True)
             return
 
         # Only the event starter can end the game
-        if ctx.author.id != self.active_game["user_id"]:
-            await ctx.send("🚫 Only the event starter can end this game early.")
+        if ctx.author.id != game.started_by:
+            await ctx.send("🚫 Only the event starter can end this game early.", ephemeral=True)
             return
 
-        self.active_game["timeout"].cancel()
-        target = self.active_game["target"]
+        game.timeout.cancel()
+        if game.settle_timer:
+            game.settle_timer.cancel()
+        self.sessions.end(game)
+        await game.answer_view.close()
         await ctx.send(
             embed=discord.Embed(
                 title="🛑 Game Ended Early",
-                description=f"The Guess the Number game has been ended by {ctx.author.mention}. The number was **{target}**.",
+                description=f"The Guess the Number game has been ended by {ctx.author.mention}. The number was **{game.target}**.",
                 color=discord.Color.red(),
             )
         )
-        self.active_game = None                 
 
 async def setup(bot):
     await bot.add_cog(NumberGuess(bot))
\ No newline at end of file
@@ -5,20 +5,29 @@
 
 import random
 import asyncio
-import json
+import logging
 import os
 import typing
 import discord
+from discord import app_commands
 from discord.ext import commands
 
-from config import MOD_ID, GROUP_ID, CHANNEL_ID, MONSTER_IMAGE_FOLDER
+from utils.dm import get_fanout
+from utils.gamedata import Boss, column, is_url, load_bosses
+from utils.guild_config import get_guild_config
+from utils.handover import NotResumable, deadline_in, get_handover, restore_view, saved_view, seconds_until
+from utils.interactions import refuse_quietly
+from utils.ledger import get_ledger
+from utils.log import fields
+from utils.name_index import NameIndex
+from utils.raid_report import DESCRIPTION_BUDGET, RaidSnapshot, RosterPages, TurnReport, boss_line, clip_lines, hp_bar, usage
+from utils.roster import JoinRoster
+from utils.sessions import GameSession, SessionManager
+from utils.speedups import json_load
+from utils.timers import Timer, get_scheduler
+
+log = logging.getLogger(__name__)
 
-ALLOWED_ROLE_ID = MOD_ID
-GROUP_ROLE_ID = GROUP_ID
-ALLOWED_CHANNEL_ID = CHANNEL_ID
-
-BOSS_FOLDER = MONSTER_IMAGE_FOLDER
-BOSS_FILE = "cogs/data/raid_bosses.json"
 REWARD_FILE = "cogs/data/raid_rewards.json"
 
 EMOJI_ATTACK = "⚔️"
@@ -32,6 +41,7 @@ ACTION_KEYS = {
 }
 
 BUTTON_TIMEOUT = 10  # seconds per turn to collect actions
+CLICK_LOG_SAMPLE = 20  # log 1 in N button clicks; raids can see hundreds per turn
 
 
 class RaidButtons(discord.ui.View):
@@ -40,9 +50,10 @@ class RaidButtons(discord.ui.View):
     user_choices maps user_id -> action_key ("attack"/"heal"/"defend")
     """
 
-    def __init__(self, timeout: float = BUTTON_TIMEOUT):
+    def __init__(self, timeout: float = BUTTON_TIMEOUT, raid: typing.Optional["RaidSession"] = None):
         super().__init__(timeout=None)
         self.user_choices: dict[int, str] = {}
+        self.raid = raid
 
     async def _safe_ack(self, interaction: discord.Interaction):
         """Prevent 'interaction failed'."""
@@ -52,14 +63,20 @@ class RaidButtons(discord.ui.View):
             except:
                 pass
 
+    def _choose(self, interaction: discord.Interaction, action: str):
+        self.user_choices[interaction.user.id] = action
+        log.info(
+            "raid button",
+            extra=fields(self.raid, "raid", user_id=interaction.user.id, action=action, sample=CLICK_LOG_SAMPLE),
+        )
+
     # ATTACK
     @discord.ui.button(label="Attack", style=discord.ButtonStyle.primary)
     async def attack_button(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        print("BUTTON FIRED:", interaction.user.id)
         await self._safe_ack(interaction)
-        self.user_choices[interaction.user.id] = "attack"
+        self._choose(interaction, "attack")
         await interaction.followup.send(
             f"You chose {EMOJI_ATTACK} Attack.", ephemeral=True
         )
@@ -69,9 +86,8 @@ class RaidButtons(discord.ui.View):
     async def heal_button(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        print("BUTTON FIRED:", interaction.user.id)
         await self._safe_ack(interaction)
-        self.user_choices[interaction.user.id] = "heal"
+        self._choose(interaction, "heal")
         await interaction.followup.send(f"You chose {EMOJI_HEAL} Heal.", ephemeral=True)
 
     # DEFEND
@@ -79,42 +95,55 @@ class RaidButtons(discord.ui.View):
     async def defend_button(
         self, interaction: discord.Interaction, button: discord.ui.Button
     ):
-        print("BUTTON FIRED:", interaction.user.id)
         await self._safe_ack(interaction)
-        self.user_choices[interaction.user.id] = "defend"
+        self._choose(interaction, "defend")
         await interaction.followup.send(
             f"You chose {EMOJI_DEFEND} Defend.", ephemeral=True
         )
 
 
-class RaidBoss(commands.Cog):
-    def __init__(self, bot: commands.Bot):
-        self.bot = bot
+class RaidSession(GameSession):
+    """State of one raid in one channel; `lock` is held while turns resolve."""
+
+    def __init__(self, guild_id, channel_id, started_by):
+        super().__init__(guild_id, channel_id, started_by)
         self.active = False
         self.join_phase = False
+        self.join_timer: typing.Optional[Timer] = None
         self.join_task: typing.Optional[asyncio.Task] = None
         self.players: dict[int, dict] = {}
         self.player_order: list[int] = []
         self.boss: typing.Optional[dict] = None
         self.called_turn = 0
-        self.turn_lock = asyncio.Lock()
+        self.snapshot: typing.Optional[RaidSnapshot] = None  # what read commands show; replaced between turns
+        self.roster_changed = False  # players joined since the last snapshot; published on the next read
         self.join_end_time: float | None = None
+        self.join_roster: typing.Optional[JoinRoster] = None
+        self.background: set[asyncio.Task] = set()  # REST calls no turn waits on
+        # the open action window of a real raid; set only while waiting for clicks
+        self.turn_view: typing.Optional[RaidButtons] = None
+        self.turn_message: typing.Optional[discord.Message] = None
+        self.turn_ends: float | None = None
 
         # Simulation controls
         self.simulate = False
         self.simulated_reactors: list[int] = []
 
-        # load files
-        try:
-            with open(BOSS_FILE, "r", encoding="utf-8") as f:
-                self.boss_list = json.load(f)
-        except Exception as e:
-            print(f"[RaidBoss] Error loading bosses: {e}")
-            self.boss_list = []
+
+class RaidBoss(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.config = get_guild_config(bot)
+        self.sessions = SessionManager(RaidSession, "raid")
+        self.timers = get_scheduler(bot)
+
+        # load files; bosses are validated once into read-only records
+        self.boss_list = load_bosses()
+        self.boss_index = NameIndex(self.boss_list, column(self.boss_list, "name"))
 
         try:
             with open(REWARD_FILE, "r", encoding="utf-8") as f:
-                cfg = json.load(f)
+                cfg = json_load(f)
             if (
                 isinstance(cfg, dict)
                 and "rewards" in cfg
@@ -123,7 +152,7 @@ class RaidBoss(commands.Cog):
                 cfg = cfg["rewards"]
             self.reward_config = cfg if isinstance(cfg, dict) else {}
         except Exception as e:
-            print(f"[RaidBoss] Error loading rewards: {e}")
+            log.error("raid rewards unreadable", extra=fields(game="raid", path=REWARD_FILE, error=str(e)))
             self.reward_config = {}
 
         # safe defaults
@@ -133,32 +162,80 @@ class RaidBoss(commands.Cog):
         )
         self.reward_config.setdefault("antonio_bags", {"enabled": False, "scaling": []})
 
+        self.handover = get_handover(bot)
+        self.handover.register("raid", self.sessions, self.export_session, self.resume_session, starts=("raidstart", "raidsim"))
+
+    # ---------- Handover ----------
+    def export_session(self, raid: RaidSession):
+        if raid.simulate:
+            raise NotResumable("simulated raid")
+        if raid.join_phase or raid.turn_view is None:
+            return None  # joining, or a turn is resolving
+        return {
+            "channel_id": raid.channel_id,
+            "started_by": raid.started_by,
+            "boss": raid.boss,
+            "players": {str(pid): p for pid, p in raid.players.items()},
+            "player_order": raid.player_order,
+            "turn": raid.called_turn,
+            "choices": {str(uid): choice for uid, choice in raid.turn_view.user_choices.items()},
+            "view": saved_view(raid.turn_view, raid.turn_message.id),
+            "turn_ends_at": deadline_in(raid.turn_ends - asyncio.get_running_loop().time()),
+        }
+
+    async def resume_session(self, state):
+        channel = await self.handover.channel(state["channel_id"])
+        raid = self.sessions.start(channel, state["started_by"])
+        if raid is None:
+            return
+        raid.boss = state["boss"]
+        raid.players = {int(pid): p for pid, p in state["players"].items()}
+        raid.player_order = state["player_order"]
+        raid.called_turn = state["turn"]
+        raid.active = True
+        self._publish(raid, raid.called_turn - 1)
+        view = RaidButtons(raid=raid)
+        message = restore_view(self.bot, channel, view, state["view"])
+        view.user_choices.update((int(uid), choice) for uid, choice in state["choices"].items())
+        raid.join_task = self.bot.loop.create_task(
+            self._resume_raid(channel, raid, (view, message, seconds_until(state["turn_ends_at"])))
+        )
+
+    async def _resume_raid(self, channel, raid: RaidSession, window):
+        try:
+            async with raid.lock:
+                await self._turn_loop(channel, raid, resume=window)
+        except asyncio.CancelledError:
+            return
+
     # ---------- Commands ----------
-    @commands.command(
-        name="raidsim", help="Run a full simulation raid (Admin only)", hidden=True
+    @commands.hybrid_command(
+        name="raidsim", help="Run a full simulation raid (Admin only)", hidden=True,
+        extras={"mod_only": True},
     )
     async def raidsim(self, ctx, players: int = 30):
-        if ALLOWED_ROLE_ID not in [r.id for r in ctx.author.roles]:
-            return await ctx.send("You are not allowed to run simulations.")
+        if not self.config.is_moderator(ctx.author):
+            return await ctx.send("You are not allowed to run simulations.", ephemeral=True)
 
-        if self.active:
-            return await ctx.send("A raid is already running.")
+        raid = self.sessions.start(ctx.channel, ctx.author.id)
+        if raid is None:
+            return await ctx.send("A raid is already running.", ephemeral=True)
 
-        self.simulate = True
+        raid.simulate = True
         await ctx.send(
             f"🧪 **Raid Simulation Mode ON** — generating {players} fake players..."
         )
 
         # pick boss and start raid via internal setup (to reuse scaling/pick logic)
         boss = random.choice(self.boss_list)
-        await self._setup_boss_from_data(boss)
+        await self._setup_boss_from_data(raid, boss)
 
         # create fake players
-        self.players.clear()
-        self.player_order.clear()
+        raid.players.clear()
+        raid.player_order.clear()
         for i in range(players):
             fake_id = 990000000000 + i
-            self.players[fake_id] = {
+            raid.players[fake_id] = {
                 "id": fake_id,
                 "name": f"SimPlayer{i+1}",
                 "hp": 1750,
@@ -169,80 +246,92 @@ class RaidBoss(commands.Cog):
                 "defending": False,
                 "action": None,
                 "afk_streak": 0,
+                "damage": 0,
             }
-            self.player_order.append(fake_id)
+            raid.player_order.append(fake_id)
 
         # apply same scaling
-        self._apply_boss_scaling(len(self.players))
+        self._apply_boss_scaling(raid, len(raid.players))
+        self._publish(raid)
 
         await ctx.send(
             f"🧪 Added **{players} simulated players**. Starting raid now..."
         )
-        self.simulated_reactors = list(self.players.keys())
-        await self._turn_loop(ctx)
-        self.simulate = False
+        raid.simulated_reactors = list(raid.players.keys())
+        await self._turn_loop(ctx.channel, raid)
+        raid.simulate = False
 
-    @commands.command(name="raidstart", help="Start a raid boss event. (Admin only)")
+    @commands.hybrid_command(name="raidstart", help="Start a raid boss event, optionally against a specific boss (suggests names on a typo). (Admin only)", extras={"mod_only": True})
     async def raidstart(self, ctx, *, boss_name: str = None):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)
 
-        if ALLOWED_ROLE_ID not in [r.id for r in ctx.author.roles]:
+        if not self.config.is_moderator(ctx.author):
             await ctx.send(
                 embed=discord.Embed(
                     title="🚫 Access Denied",
                     description="You don't have permission to start raids.",
                     color=discord.Color.red(),
-                )
+                ),
+                ephemeral=True,
             )
             return
 
-        if self.active:
-            await ctx.send("⚠️ A raid is already in progress.")
+        if self.sessions.get(ctx.channel):
+            await ctx.send("⚠️ A raid is already in progress.", ephemeral=True)
             return
 
         if not self.boss_list:
             await ctx.send(
-                "⚠️ No bosses available. Please check your `raid_bosses.json` file."
+                "⚠️ No bosses available. Please check your `raid_bosses.json` file.",
+                ephemeral=True,
             )
             return
 
-        # pick boss
+        # pick boss; a misspelled name gets suggestions rather than a random raid
         if boss_name:
-            boss_data = next(
-                (b for b in self.boss_list if b["name"].lower() == boss_name.lower()),
-                None,
-            )
+            boss_data = self.boss_index.get(boss_name)
             if not boss_data:
+                suggestions = self.boss_index.suggest(boss_name)
+                description = f"No boss named **{boss_name}** found."
+                if suggestions:
+                    description += "\nDid you mean: " + ", ".join(f"**{name}**" for name in suggestions) + "?"
                 await ctx.send(
                     embed=discord.Embed(
                         title="❓ Boss Not Found",
-                        description=f"No boss named **{boss_name}** found. Random boss selected instead.",
+                        description=description,
                         color=discord.Color.orange(),
-                    )
+                    ),
+                    ephemeral=True,
                 )
-                boss_data = random.choice(self.boss_list)
+                return
         else:
             boss_data = random.choice(self.boss_list)
 
-        await self._setup_boss_from_data(boss_data)
+        raid = self.sessions.start(ctx.channel, ctx.author.id)
+        if raid is None:
+            await ctx.send("⚠️ A raid is already in progress.", ephemeral=True)
+            return
+
+        await self._setup_boss_from_data(raid, boss_data)
 
         # open join phase
-        self.join_phase = True
-        self.players.clear()
-        self.player_order.clear()
-        self.called_turn = 0
-        self.active = True
+        raid.join_phase = True
+        raid.players.clear()
+        raid.player_order.clear()
+        raid.called_turn = 0
+        raid.active = True
+        self._publish(raid)
 
         join_duration = 60
-        self.join_end_time = asyncio.get_event_loop().time() + join_duration
+        raid.join_end_time = asyncio.get_event_loop().time() + join_duration
 
         embed = discord.Embed(
-            title=f"⚔️ Raid Starting: {self.boss['name']} Appears!",
+            title=f"⚔️ Raid Starting: {raid.boss['name']} Appears!",
             description=(
-                f"Prepare yourselves to battle **{self.boss['name']}** with "
-                f"**{self.boss['hp']:,} HP**, **{self.boss['atk']} ATK**, and **{self.boss['defense']} DEF**!\n\n"
-                f"Type `!joinraid` to join. You have **{join_duration} seconds** to join."
+                f"Prepare yourselves to battle **{raid.boss['name']}** with "
+                f"**{raid.boss['hp']:,} HP**, **{raid.boss['atk']} ATK**, and **{raid.boss['defense']} DEF**!\n\n"
+                f"Press **Join** on the roster below or use `joinraid` to join. You have **{join_duration} seconds** to join."
             ),
             color=discord.Color.red(),
         )
@@ -260,86 +349,87 @@ class RaidBoss(commands.Cog):
             inline=False,
         )
 
-        # attach image if present
-        if self.boss.get("image"):
-            img = self.boss["image"]
-            if isinstance(img, str) and (
-                img.startswith("http://") or img.startswith("https://")
-            ):
+        # attach image if present (local paths are resolved at load)
+        if raid.boss.get("image"):
+            img = raid.boss["image"]
+            if is_url(img):
                 embed.set_image(url=img)
-                await ctx.send(embed=embed)
+                announce_msg = await ctx.send(embed=embed)
             else:
-                img_path = img or ""
-                if not os.path.isabs(img_path) and BOSS_FOLDER:
-                    img_path = os.path.join(BOSS_FOLDER, img_path)
-                img_path = os.path.abspath(img_path)
+                img_path = img
                 if os.path.exists(img_path):
                     file = discord.File(img_path, filename=os.path.basename(img_path))
                     embed.set_image(url=f"attachment://{os.path.basename(img_path)}")
-                    await ctx.send(embed=embed, file=file)
+                    announce_msg = await ctx.send(embed=embed, file=file)
                 else:
-                    await ctx.send(embed=embed)
+                    announce_msg = await ctx.send(embed=embed)
         else:
-            await ctx.send(embed=embed)
+            announce_msg = await ctx.send(embed=embed)
+
+        # one roster message, edited as players join (via !joinraid, Join or ✅)
+        raid.join_roster = JoinRoster(
+            ctx.channel,
+            f"{raid.boss['name']} Raid Party",
+            ends_at=raid.join_end_time,
+            color=discord.Color.red(),
+            on_join=lambda user: self._add_player(raid, user),
+        )
+        await raid.join_roster.start(announce_msg)
 
         # schedule join end
-        self.join_task = self.bot.loop.create_task(
-            self._end_join_phase_after(ctx, join_duration)
+        raid.join_timer = self.timers.call_later(
+            join_duration, self._start_raid, ctx.channel, raid, name=f"raid join #{ctx.channel.id}"
         )
 
-    @commands.command(name="joinraid", help="Join the currently forming raid.")
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
+        raid = self.sessions.lookup(payload.guild_id, payload.channel_id)
+        if raid and raid.join_phase and raid.join_roster and raid.join_roster.matches(payload):
+            self._add_player(raid, payload.member)
+
+    @raidstart.autocomplete("boss_name")
+    async def boss_name_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        return [app_commands.Choice(name=name, value=name) for name in self.boss_index.complete(current)]
+
+    @commands.hybrid_command(name="joinraid", help="Join the currently forming raid.")
     async def joinraid(self, ctx):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)
 
-        if not self.join_phase:
-            await ctx.send("⚠️ There is no open join window right now.")
+        raid = self.sessions.get(ctx.channel)
+        if not raid or not raid.join_phase:
+            await ctx.send("⚠️ There is no open join window right now.", ephemeral=True)
             return
 
-        if ctx.author.id in self.players:
-            return await ctx.send(f"✅ {ctx.author.mention}, you're already signed up.")
+        if ctx.author.id in raid.players:
+            return await ctx.send(f"✅ {ctx.author.mention}, you're already signed up.", ephemeral=True)
 
-        player = {
-            "id": ctx.author.id,
-            "name": getattr(ctx.author, "display_name", ctx.author.name),
-            "hp": 1750,
-            "max_hp": 1750,
-            "atk": random.randint(90, 180),
-            "defense": random.randint(70, 140),
-            "alive": True,
-            "defending": False,
-            "action": None,
-            "afk_streak": 0,
-        }
-        self.players[ctx.author.id] = player
-        self.player_order.append(ctx.author.id)
-        remaining = (
-            max(0, int(self.join_end_time - asyncio.get_event_loop().time()))
-            if self.join_end_time
-            else 0
-        )
-        await ctx.send(
-            f"✅ {ctx.author.mention} joined the raid! ({len(self.players)} players) — {remaining}s left to join."
-        )
+        # no per-join message: the roster message picks the new player up
+        self._add_player(raid, ctx.author)
+        if ctx.interaction is not None:
+            await ctx.send("✅ You're in!", ephemeral=True)
 
-    @commands.command(name="mystats", help="Check your current raid stats (ephemeral).")
+    @commands.hybrid_command(name="mystats", help="Check your current raid stats (ephemeral).")
     async def mystats(self, ctx):
         """Shows player stats privately only to the user."""
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)
 
         # Not in raid
-        if not self.active:
-            return await ctx.reply("⚠️ There is no active raid.", mention_author=False)
+        raid = self.sessions.get(ctx.channel)
+        if not raid or not raid.active:
+            return await ctx.reply("⚠️ There is no active raid.", mention_author=False, ephemeral=True)
+
+        # Served from the last published snapshot: never half a turn, and no waiting on one
+        snapshot = self._latest(raid)
+        p = snapshot.players.get(ctx.author.id) if snapshot else None
 
         # Player not joined
-        if ctx.author.id not in self.players:
+        if p is None:
             return await ctx.reply(
-                "⚠️ You are not part of this raid.", mention_author=False
+                "⚠️ You are not part of this raid.", mention_author=False, ephemeral=True
             )
 
-        p = self.players[ctx.author.id]
-
         alive_status = "❤️ Alive" if p["alive"] else "💀 Defeated"
 
         embed = discord.Embed(
@@ -349,86 +439,80 @@ class RaidBoss(commands.Cog):
         embed.add_field(name="Status", value=alive_status, inline=False)
         embed.add_field(
             name="HP",
-            value=f"{self._hp_bar(p['hp'], p['max_hp'])} {p['hp']}/{p['max_hp']}",
+            value=f"{hp_bar(p['hp'], p['max_hp'])} {p['hp']}/{p['max_hp']}",
             inline=False
         )
         embed.add_field(name="ATK", value=str(p["atk"]))
         embed.add_field(name="DEF", value=str(p["defense"]))
         embed.add_field(name="AFK Streak", value=str(p["afk_streak"]))
+        embed.add_field(name="Damage Dealt", value=f"{p['damage']:,}")
 
         # Boss image appears on mystats too
-        if self.boss and isinstance(self.boss.get("image"), str):
-            img = self.boss["image"]
-            if img.startswith("http://") or img.startswith("https://"):
-                embed.set_thumbnail(url=img)
-
-        # Send ephemeral
-        try:
-            await ctx.author.send(embed=embed)
+        if snapshot.boss and is_url(snapshot.boss.get("image")):
+            embed.set_thumbnail(url=snapshot.boss["image"])
+        if snapshot.turn:
+            embed.set_footer(text=f"As of turn {snapshot.turn}")
+
+        # Slash commands answer ephemerally; prefix commands fall back to a DM
+        # (shared fan-out paces DMs and caches the DM channel)
+        if ctx.interaction is not None:
+            return await ctx.send(embed=embed, ephemeral=True)
+        failure = await get_fanout(self.bot).send(ctx.author, embed=embed)
+        if failure is None:
             await ctx.reply("📩 Check your DMs!", mention_author=False)
-        except discord.Forbidden:
+        else:
             await ctx.reply(
                 "❌ I couldn't DM you. Please enable DMs from server members.",
                 mention_author=False
             )
 
-    @commands.command(
+    @commands.hybrid_command(
         name="raidstatus", help="Show current raid status (players & boss)."
     )
     async def raidstatus(self, ctx):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return
-        if not self.active:
-            return await ctx.send("⚠️ There is no active raid.")
-        embed = discord.Embed(title="🛡️ Raid Status", color=discord.Color.blue())
-        if self.boss:
-            embed.add_field(
-                name=f"Boss: {self.boss['name']}",
-                value=f"HP: {self._hp_bar(self.boss['hp'], self.boss['max_hp'])} {self.boss['hp']:,}/{self.boss['max_hp']:,}",
-                inline=False,
-            )
-        lines = []
-        for p in self.players.values():
-            status = "💀" if not p["alive"] else "❤️"
-            lines.append(
-                f"{status} {p['name']} — {self._hp_bar(p['hp'], p['max_hp'])} {p['hp']}/{p['max_hp']}"
-            )
-        embed.add_field(
-            name="Players", value="\n".join(lines) if lines else "(none)", inline=False
-        )
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)
+        raid = self.sessions.get(ctx.channel)
+        if not raid or not raid.active or self._latest(raid) is None:
+            return await ctx.send("⚠️ There is no active raid.", ephemeral=True)
+        # aggregates plus one page of the roster; the rest is behind ◀/▶
+        view = RosterPages(lambda: self._latest(raid))
+        embed = view.page(0)
         # attach image if present
-        if (
-            self.boss
-            and self.boss.get("image")
-            and isinstance(self.boss["image"], str)
-            and (
-                self.boss["image"].startswith("http://")
-                or self.boss["image"].startswith("https://")
-            )
-        ):
-            embed.set_image(url=self.boss["image"])
-            await ctx.send(embed=embed)
-        else:
-            await ctx.send(embed=embed)
+        boss = view.snapshot.boss
+        if boss and is_url(boss.get("image")):
+            embed.set_image(url=boss["image"])
+        if view.page_count == 1:
+            await ctx.send(embed=embed, ephemeral=True)
+            return
+        view.message = await ctx.send(embed=embed, view=view, ephemeral=True)
 
-    @commands.command(name="raidend", help="Force end the current raid (Admin only).")
+    @commands.hybrid_command(name="raidend", help="Force end the current raid (Admin only).", extras={"mod_only": True})
     async def raidend(self, ctx):
-        if ctx.channel.id != ALLOWED_CHANNEL_ID:
-            return
-        if ALLOWED_ROLE_ID not in [r.id for r in ctx.author.roles]:
+        if not self.config.is_game_channel(ctx.channel):
+            return await refuse_quietly(ctx)
+        if not self.config.is_moderator(ctx.author):
             return await ctx.send(
                 embed=discord.Embed(
                     title="🚫 Access Denied",
                     description="Only authorized users can end raids.",
                     color=discord.Color.red(),
-                )
+                ),
+                ephemeral=True,
             )
-        if not self.active:
-            return await ctx.send("⚠️ There is no active raid to end.")
-        if self.join_task and not self.join_task.done():
-            self.join_task.cancel()
-        self.active = False
-        self.join_phase = False
+        raid = self.sessions.get(ctx.channel)
+        if not raid or not raid.active:
+            return await ctx.send("⚠️ There is no active raid to end.", ephemeral=True)
+        if raid.join_timer:
+            raid.join_timer.cancel()
+        if raid.join_task and not raid.join_task.done():
+            raid.join_task.cancel()
+        if raid.join_roster:
+            await raid.join_roster.close()
+            raid.join_roster = None
+        raid.active = False
+        raid.join_phase = False
+        self.sessions.end(raid)
         await ctx.send(
             embed=discord.Embed(
                 title="🛑 Raid Ended",
@@ -438,156 +522,205 @@ class RaidBoss(commands.Cog):
         )
 
     # ---------- Internal helpers ----------
-    async def _setup_boss_from_data(self, boss_data: dict):
-        """Initialize boss dict from JSON entry"""
-        self.boss = {
-            "name": boss_data.get("name", "Unknown"),
-            "hp": int(boss_data.get("hp", 1000)),
-            "max_hp": int(boss_data.get("hp", 1000)),
-            "atk": int(boss_data.get("atk", 200)),
-            "defense": int(boss_data.get("def", 50)),
-            "image": boss_data.get("image"),
+    def _add_player(self, raid: RaidSession, user) -> bool:
+        """Register a joiner once; shared by !joinraid, the Join button and the ✅ reaction."""
+        if user.bot or user.id in raid.players:
+            return False
+        raid.players[user.id] = {
+            "id": user.id,
+            "name": getattr(user, "display_name", user.name),
+            "hp": 1750,
+            "max_hp": 1750,
+            "atk": random.randint(90, 180),
+            "defense": random.randint(70, 140),
+            "alive": True,
+            "defending": False,
+            "action": None,
+            "afk_streak": 0,
+            "damage": 0,
+        }
+        raid.player_order.append(user.id)
+        # a snapshot per join would compare the whole roster each time; the next read publishes instead
+        raid.roster_changed = True
+        if raid.join_roster:
+            raid.join_roster.add(user)
+        return True
+
+    def _publish(self, raid: RaidSession, turn: int = 0):
+        """Replace the snapshot read commands serve; `turn` is the last one resolved."""
+        raid.snapshot = RaidSnapshot.publish(turn, raid.boss, raid.players, raid.player_order, raid.snapshot)
+        raid.roster_changed = False
+
+    def _latest(self, raid: RaidSession) -> typing.Optional[RaidSnapshot]:
+        """The snapshot read commands serve, with any joins since it was published."""
+        if raid.roster_changed and raid.snapshot is not None:
+            # joins only happen before the first turn, so nothing is half applied
+            self._publish(raid, raid.snapshot.turn)
+        return raid.snapshot
+
+    async def _setup_boss_from_data(self, raid: RaidSession, boss_data: Boss):
+        """Initialize this raid's mutable boss state from a catalog record"""
+        raid.boss = {
+            "name": boss_data.name,
+            "hp": boss_data.hp,
+            "max_hp": boss_data.hp,
+            "atk": boss_data.atk,
+            "defense": boss_data.defense,
+            "image": boss_data.image,
             "berserk": False,
         }
         # mark active
-        self.active = True
+        raid.active = True
 
-    def _apply_boss_scaling(self, num_players: int):
+    def _apply_boss_scaling(self, raid: RaidSession, num_players: int):
         num_players = max(1, num_players)
-        base_hp = self.boss["hp"]
-        base_atk = self.boss["atk"]
-        base_def = self.boss["defense"]
+        base_hp = raid.boss["hp"]
+        base_atk = raid.boss["atk"]
+        base_def = raid.boss["defense"]
         scaled_hp = int(base_hp * (1 + 0.25 * (num_players - 1)))
         scaled_atk = int(base_atk * (1 + 0.07 * (num_players - 1)))
         scaled_def = int(base_def * (1 + 0.05 * (num_players - 1)))
-        self.boss["hp"] = scaled_hp
-        self.boss["max_hp"] = scaled_hp
-        self.boss["atk"] = scaled_atk
-        self.boss["defense"] = scaled_def
+        raid.boss["hp"] = scaled_hp
+        raid.boss["max_hp"] = scaled_hp
+        raid.boss["atk"] = scaled_atk
+        raid.boss["defense"] = scaled_def
+
+    def _start_raid(self, channel, raid: RaidSession):
+        """Join timer callback: run the raid as a task that !raidend can cancel."""
+        raid.join_task = self.bot.loop.create_task(self._end_join_phase(channel, raid))
 
-    async def _end_join_phase_after(self, ctx, delay: float):
+    async def _end_join_phase(self, channel, raid: RaidSession):
         try:
-            await asyncio.sleep(delay)
-            async with self.turn_lock:
-                self.join_phase = False
-                if not self.players:
-                    await ctx.send("No players joined the raid — event cancelled.")
-                    self.active = False
+            async with raid.lock:
+                raid.join_phase = False
+                if raid.join_roster:
+                    await raid.join_roster.close()
+                    raid.join_roster = None
+                if not raid.players:
+                    await channel.send("No players joined the raid — event cancelled.")
+                    raid.active = False
+                    self.sessions.end(raid)
                     return
                 # scale boss
-                self._apply_boss_scaling(len(self.players))
+                self._apply_boss_scaling(raid, len(raid.players))
+                self._publish(raid)
                 embed = discord.Embed(
                     title="🔥 Raid Begins!",
                     description=(
-                        f"Boss **{self.boss['name']}** emerges stronger based on your party size!\n\n"
-                        f"**Players Joined:** {len(self.players)}\n"
-                        f"**HP:** {self.boss['hp']:,}\n"
-                        f"**ATK:** {self.boss['atk']}\n"
-                        f"**DEF:** {self.boss['defense']}"
+                        f"Boss **{raid.boss['name']}** emerges stronger based on your party size!\n\n"
+                        f"**Players Joined:** {len(raid.players)}\n"
+                        f"**HP:** {raid.boss['hp']:,}\n"
+                        f"**ATK:** {raid.boss['atk']}\n"
+                        f"**DEF:** {raid.boss['defense']}"
                     ),
                     color=discord.Color.red(),
                 )
-                # send image if available
-                if (
-                    self.boss.get("image")
-                    and isinstance(self.boss["image"], str)
-                    and (
-                        self.boss["image"].startswith("http://")
-                        or self.boss["image"].startswith("https://")
-                    )
-                ):
-                    embed.set_image(url=self.boss["image"])
-                    await ctx.send(embed=embed)
-                else:
-                    await ctx.send(embed=embed)
-                await self._turn_loop(ctx)
+                # goes out with turn 1's prompt, which carries the boss image
+                await self._turn_loop(channel, raid, lead=embed)
         except asyncio.CancelledError:
             return
 
-    async def _turn_loop(self, ctx):
-        """Main loop using buttons for input"""
-        turn = 1
-        if not self.boss:
+    def _in_background(self, raid: RaidSession, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        raid.background.add(task)
+        task.add_done_callback(raid.background.discard)
+
+    async def _retire_buttons(self, message: discord.Message):
+        try:
+            await message.edit(view=None)
+        except Exception:
+            # ignore edit errors
+            pass
+
+    async def _send_turn(self, channel, raid: RaidSession, embeds: list[discord.Embed], view: RaidButtons) -> discord.Message:
+        """One message per turn: the previous turn's results (if any), then this turn's prompt with the buttons."""
+        prompt = embeds[-1]
+        boss_img = raid.boss.get("image")
+        if boss_img and not is_url(boss_img) and os.path.exists(boss_img):
+            # Local file path, resolved when the catalog was loaded
+            filename = os.path.basename(boss_img)
+            prompt.set_image(url=f"attachment://{filename}")
+            message = await channel.send(embeds=embeds, file=discord.File(boss_img, filename=filename), view=view)
+            # later turns (and raidstatus/mystats) reuse the uploaded copy instead of uploading again
+            uploaded = message.embeds[-1].image.url if message.embeds else None
+            if is_url(uploaded):
+                raid.boss["image"] = uploaded
+            return message
+        if is_url(boss_img):
+            prompt.set_image(url=boss_img)
+        return await channel.send(embeds=embeds, view=view)
+
+    async def _turn_loop(self, channel, raid: RaidSession, lead: typing.Optional[discord.Embed] = None, resume=None):
+        """
+        Main loop using buttons for input. Turns are pipelined: each turn's
+        results are rendered as soon as it resolves and go out in the same
+        message as the next turn's prompt, and the old buttons are removed in
+        the background, so a turn costs one REST call. A handed-over raid
+        passes `resume` = (view, message, seconds left) for its open turn.
+        """
+        turn = raid.called_turn if resume else 1
+        if not raid.boss:
             return
-        self.boss["berserk"] = False
+        if not resume:
+            raid.boss["berserk"] = False
+        pending = [lead] if lead else []  # embeds riding along with the next prompt
 
         while (
-            self.active
-            and any(p["alive"] for p in self.players.values())
-            and self.boss
-            and self.boss["hp"] > 0
+            raid.active
+            and any(p["alive"] for p in raid.players.values())
+            and raid.boss
+            and raid.boss["hp"] > 0
         ):
-            self.called_turn = turn
+            raid.called_turn = turn
+            report = TurnReport(turn, raid.players)
             # reset flags
-            for p in self.players.values():
+            for p in raid.players.values():
                 p["defending"] = False
                 p["action"] = None
 
-            # build embed
-            embed = discord.Embed(
-                title=f"🔁 Raid Turn {turn}",
-                description=(
-                    f"Boss **{self.boss['name']}** — HP: {self._hp_bar(self.boss['hp'], self.boss['max_hp'])} "
-                    f"{self.boss['hp']:,}/{self.boss['max_hp']:,}\n\n"
-                    f"Choose your action. You have **{BUTTON_TIMEOUT} seconds**.\n\n"
-                    f"{EMOJI_ATTACK} — Attack\n"
-                    f"{EMOJI_HEAL} — Heal (self-heal)\n"
-                    f"{EMOJI_DEFEND} — Defend (reduce damage this turn)\n"
-                ),
-                color=discord.Color.dark_gold(),
-            )
-
-            # send message with view
-            # send message with view, restoring boss image support
-            view = RaidButtons()
-            boss_img = self.boss.get("image")
-
-            if boss_img:
-                if isinstance(boss_img, str) and (
-                    boss_img.startswith("http://") or boss_img.startswith("https://")
-                ):
-                    embed.set_image(url=boss_img)
-                    action_msg = await ctx.send(embed=embed, view=view)
-
-                else:
-                    # Local file path
-                    img_path = boss_img
-                    if not os.path.isabs(img_path) and BOSS_FOLDER:
-                        img_path = os.path.join(BOSS_FOLDER, img_path)
-                    img_path = os.path.abspath(img_path)
-
-                    if os.path.exists(img_path):
-                        file = discord.File(
-                            img_path, filename=os.path.basename(img_path)
-                        )
-                        embed.set_image(
-                            url=f"attachment://{os.path.basename(img_path)}"
-                        )
-                        action_msg = await ctx.send(embed=embed, file=file, view=view)
-                    else:
-                        # file not found fallback
-                        action_msg = await ctx.send(embed=embed, view=view)
+            if resume is not None:
+                # the prompt and its buttons are already up
+                view, action_msg, window = resume
+                resume = None
             else:
-                action_msg = await ctx.send(embed=embed, view=view)
+                # build embed
+                embed = discord.Embed(
+                    title=f"🔁 Raid Turn {turn}",
+                    description=(
+                        f"Boss **{raid.boss['name']}** — HP: {boss_line(raid.boss)}\n\n"
+                        f"Choose your action. You have **{BUTTON_TIMEOUT} seconds**.\n\n"
+                        f"{EMOJI_ATTACK} — Attack\n"
+                        f"{EMOJI_HEAL} — Heal (self-heal)\n"
+                        f"{EMOJI_DEFEND} — Defend (reduce damage this turn)\n"
+                    ),
+                    color=discord.Color.dark_gold(),
+                )
+
+                # send the prompt with view, behind the previous turn's results
+                view = RaidButtons(raid=raid)
+                action_msg = await self._send_turn(channel, raid, pending + [embed], view)
+                pending = []
+                window = BUTTON_TIMEOUT
 
             # Collect choices for BUTTON_TIMEOUT seconds
-            if self.simulate:
+            if raid.simulate:
                 # Simulate presses across the window; this uses the same view.user_choices mapping
                 # but because we can't simulate real interactions, we'll populate directly to mimic load.
                 async def simulate_press(pid):
-                    if pid not in self.players or not self.players[pid]["alive"]:
+                    if pid not in raid.players or not raid.players[pid]["alive"]:
                         return
                     await asyncio.sleep(random.uniform(0.02, BUTTON_TIMEOUT - 0.02))
-                    # choose action biased to attack for meaningful simulation
+                    # choose action biased to attack for meaningful simulation; None sits the turn out
                     choice = random.choices(
-                        ["attack", "heal", "defend"],
+                        ["attack", "heal", "defend", None],
                         weights=[0.6, 0.15, 0.2, 0.05],
                     )[0]
-                    view.user_choices[pid] = choice
+                    if choice is not None:
+                        view.user_choices[pid] = choice
 
                 # staggered concurrent simulated presses
                 await asyncio.gather(
-                    *(simulate_press(pid) for pid in self.simulated_reactors)
+                    *(simulate_press(pid) for pid in raid.simulated_reactors)
                 )
                 # wait out remaining to exactly BUTTON_TIMEOUT
                 await asyncio.sleep(0.05)
@@ -595,34 +728,38 @@ class RaidBoss(commands.Cog):
                 action_map = dict(view.user_choices)
             else:
                 # Real players: wait BUTTON_TIMEOUT seconds, letting the view callbacks populate user_choices
-                await asyncio.sleep(BUTTON_TIMEOUT)
+                raid.turn_view, raid.turn_message = view, action_msg
+                raid.turn_ends = asyncio.get_running_loop().time() + window
+                try:
+                    await self.timers.sleep_until(
+                        raid.turn_ends, name=f"raid turn {turn} actions #{raid.channel_id}"
+                    )
+                finally:
+                    raid.turn_view = raid.turn_message = raid.turn_ends = None
                 action_map = dict(view.user_choices)
 
-            # Always remove view (disable buttons) to avoid late clicks interfering the next turn
-            try:
-                await action_msg.edit(view=None)
-            except Exception:
-                # ignore edit errors
-                pass
+            # Stop taking clicks now; removing the buttons from the message
+            # happens in the background while the turn resolves
+            view.stop()
+            self._in_background(raid, self._retire_buttons(action_msg))
 
             # assign actions
-            inactive_players = []
             for user_id, choice in action_map.items():
-                if user_id in self.players and self.players[user_id]["alive"]:
+                if user_id in raid.players and raid.players[user_id]["alive"]:
                     if choice == "attack":
-                        self.players[user_id]["action"] = "attack"
+                        raid.players[user_id]["action"] = "attack"
                     elif choice == "heal":
-                        self.players[user_id]["action"] = "heal"
+                        raid.players[user_id]["action"] = "heal"
                     elif choice == "defend":
-                        self.players[user_id]["action"] = "defend"
+                        raid.players[user_id]["action"] = "defend"
 
             # AFK penalties
-            for pid, p in self.players.items():
+            for pid, p in raid.players.items():
                 if not p["alive"]:
                     continue
                 if p["action"] is None:
                     p["afk_streak"] += 1
-                    inactive_players.append(p["name"])
+                    report.afk.append(p["name"])
                     penalty = min(50 * p["afk_streak"], 150)
                     p["hp"] = max(0, p["hp"] - penalty)
                     if p["hp"] <= 0:
@@ -630,21 +767,11 @@ class RaidBoss(commands.Cog):
                 else:
                     p["afk_streak"] = 0
 
-            if inactive_players:
-                # limit list length so embed isn't huge
-                inactive_preview = ", ".join(inactive_players[:25]) + (
-                    ", ..." if len(inactive_players) > 25 else ""
-                )
-            else:
-                inactive_preview = None
-
-            # Resolve player actions
-            resolution_lines = []
-            total_player_damage = 0
+            # Resolve player actions; per-player lines only go to the report's aggregates
             attack_events = []
             heal_events = []
 
-            for pid, p in self.players.items():
+            for pid, p in raid.players.items():
                 if not p["alive"]:
                     continue
                 if p["action"] == "attack":
@@ -655,32 +782,30 @@ class RaidBoss(commands.Cog):
                     heal_events.append((pid, heal_amt))
                 elif p["action"] == "defend":
                     p["defending"] = True
+                    report.defenders += 1
 
             for pid, dmg in attack_events:
-                net_dmg = max(0, dmg - int(self.boss["defense"] * 0.1))
-                self.boss["hp"] = max(0, self.boss["hp"] - net_dmg)
-                total_player_damage += net_dmg
-                resolution_lines.append(
-                    f"⚔️ **{self.players[pid]['name']}** attacked for **{net_dmg}** damage."
-                )
+                net_dmg = max(0, dmg - int(raid.boss["defense"] * 0.1))
+                raid.boss["hp"] = max(0, raid.boss["hp"] - net_dmg)
+                raid.players[pid]["damage"] += net_dmg
+                report.attack(pid, net_dmg)
 
             for pid, heal_amt in heal_events:
-                p = self.players[pid]
+                p = raid.players[pid]
                 if not p["alive"]:
                     continue
                 old = p["hp"]
                 p["hp"] = min(p["max_hp"], p["hp"] + heal_amt)
-                resolution_lines.append(
-                    f"💉 **{p['name']}** healed themselves for **{p['hp'] - old}** HP."
-                )
+                report.heal(p["hp"] - old)
 
             # boss death check before counterattack
-            if self.boss["hp"] <= 0:
-                await ctx.send(
+            if raid.boss["hp"] <= 0:
+                self._publish(raid, turn)
+                await channel.send(
                     embed=discord.Embed(
                         title="🏆 Raid Victory!",
                         description=(
-                            f"The players dealt **{total_player_damage}** total damage and defeated **{self.boss['name']}**!"
+                            f"The players dealt **{report.total_damage:,}** total damage and defeated **{raid.boss['name']}**!"
                         ),
                         color=discord.Color.green(),
                     )
@@ -688,14 +813,14 @@ class RaidBoss(commands.Cog):
                 break
 
             # boss phase scaling
-            hp_ratio = self.boss["hp"] / self.boss["max_hp"]
+            hp_ratio = raid.boss["hp"] / raid.boss["max_hp"]
             phase_text, dmg_multiplier = None, 1.0
             if hp_ratio <= 0.1:
                 dmg_multiplier = 1.45
                 phase_text = "🩸 **BERSERK MODE!** ATK increased massively!"
-                if not self.boss.get("berserk", False):
-                    self.boss["berserk"] = True
-                    self.boss["atk"] = int(self.boss["atk"] * 1.5)
+                if not raid.boss.get("berserk", False):
+                    raid.boss["berserk"] = True
+                    raid.boss["atk"] = int(raid.boss["atk"] * 1.5)
             elif hp_ratio <= 0.25:
                 dmg_multiplier = 1.35
                 phase_text = "😤 Enraged!"
@@ -705,11 +830,10 @@ class RaidBoss(commands.Cog):
             elif hp_ratio <= 0.75:
                 dmg_multiplier = 1.15
                 phase_text = "😠 Angry!"
-            if phase_text:
-                resolution_lines.append(f"🔥 **{self.boss['name']}** is {phase_text}")
+            report.phase = phase_text
 
             # boss targets
-            alive_players = [p for p in self.players.values() if p["alive"]]
+            alive_players = [p for p in raid.players.values() if p["alive"]]
             total_alive = len(alive_players)
             if total_alive <= 3:
                 num_targets = 1
@@ -727,17 +851,16 @@ class RaidBoss(commands.Cog):
             else:
                 targets = []
 
-            if self.boss.get("berserk", False) and alive_players:
+            if raid.boss.get("berserk", False) and alive_players:
                 extra_hits = random.choice([1, 2])
                 extra_targets = random.sample(
                     alive_players, min(extra_hits, len(alive_players))
                 )
                 targets.extend(extra_targets)
 
-            boss_events = []
             for tgt in targets:
                 incoming = random.randint(
-                    max(1, self.boss["atk"] - 50), self.boss["atk"] + 50
+                    max(1, raid.boss["atk"] - 50), raid.boss["atk"] + 50
                 )
                 is_crit = random.random() < 0.1
                 if is_crit:
@@ -746,115 +869,47 @@ class RaidBoss(commands.Cog):
                 damage_after_def = max(0, incoming - tgt["defense"])
                 if tgt["defending"]:
                     damage_after_def = damage_after_def // 2
-                oldhp = tgt["hp"]
                 tgt["hp"] = max(0, tgt["hp"] - damage_after_def)
                 if tgt["hp"] <= 0:
                     tgt["alive"] = False
                 crit_text = " ⚡(CRITICAL!)" if is_crit else ""
-                boss_events.append(
-                    (tgt["name"], damage_after_def, oldhp, tgt["hp"], crit_text)
+                # at most 7 hits a turn, so these stay listed individually
+                report.boss_hits.append(
+                    f"💥 **{raid.boss['name']}** hit **{tgt['name']}** for **{damage_after_def}** damage{crit_text}. ({tgt['hp']}/{tgt['max_hp']})"
                 )
 
-            if total_player_damage > 0:
-                resolution_lines.insert(
-                    0,
-                    f"🔥 Players dealt **{total_player_damage}** total damage to **{self.boss['name']}**.",
-                )
-
-            for tname, dmg, oldhp, newhp, crit_text in boss_events:
-                # find player's max hp for display
-                try:
-                    pid = next(
-                        pid for pid, p in self.players.items() if p["name"] == tname
-                    )
-                    mhp = self.players[pid]["max_hp"]
-                except StopIteration:
-                    mhp = 1750
-                resolution_lines.append(
-                    f"💥 **{self.boss['name']}** hit **{tname}** for **{dmg}** damage{crit_text}. ({newhp}/{mhp})"
-                )
-
-            if inactive_preview:
-                resolution_lines.append(
-                    f"⏳ **Skipped Turn (AFK penalty):** {inactive_preview} — They took damage!"
-                )
-
-            # summary embed
-            summary = discord.Embed(
-                title=f"🔔 Turn {turn} Results", color=discord.Color.dark_teal()
-            )
-            summary.description = (
-                "\n".join(resolution_lines)
-                if resolution_lines
-                else "No actions this turn."
-            )
-            players_status = []
-            for p in self.players.values():
-                status_emoji = "💀" if not p["alive"] else "❤️"
-                players_status.append(
-                    f"{status_emoji} **{p['name']}** — {self._hp_bar(p['hp'], p['max_hp'])} {p['hp']}/{p['max_hp']}"
-                )
-            summary.add_field(
-                name=f"Boss: {self.boss['name']}",
-                value=f"{self._hp_bar(self.boss['hp'], self.boss['max_hp'])} {self.boss['hp']:,}/{self.boss['max_hp']:,}",
-                inline=False,
-            )
-            summary.add_field(
-                name="Players",
-                value="\n".join(players_status) or "(none)",
-                inline=False,
-            )
-            # add boss image to summary too
-            boss_img = self.boss.get("image")
-            if boss_img:
-                if isinstance(boss_img, str) and (
-                    boss_img.startswith("http://") or boss_img.startswith("https://")
-                ):
-                    summary.set_image(url=boss_img)
-                    await ctx.send(embed=summary)
-                else:
-                    img_path = boss_img
-                    if not os.path.isabs(img_path) and BOSS_FOLDER:
-                        img_path = os.path.join(BOSS_FOLDER, img_path)
-                    img_path = os.path.abspath(img_path)
-                    if os.path.exists(img_path):
-                        file = discord.File(
-                            img_path, filename=os.path.basename(img_path)
-                        )
-                        summary.set_image(
-                            url=f"attachment://{os.path.basename(img_path)}"
-                        )
-                        await ctx.send(embed=summary, file=file)
-                    else:
-                        await ctx.send(embed=summary)
-            else:
-                await ctx.send(embed=summary)
-
+            # summary embed: aggregates and changed players only, whatever the party size
+            summary = report.render(raid.boss, raid.players)
+            self._publish(raid, turn)
             # checks
-            if not any(p["alive"] for p in self.players.values()):
-                await ctx.send(
-                    embed=discord.Embed(
-                        title="💀 Raid Failed",
-                        description="All players were defeated. The boss remains victorious.",
-                        color=discord.Color.red(),
-                    )
+            if not any(p["alive"] for p in raid.players.values()):
+                await channel.send(
+                    embeds=[
+                        summary,
+                        discord.Embed(
+                            title="💀 Raid Failed",
+                            description="All players were defeated. The boss remains victorious.",
+                            color=discord.Color.red(),
+                        ),
+                    ]
                 )
                 break
-            if self.boss["hp"] <= 0:
+            if raid.boss["hp"] <= 0:
                 break
 
+            # the results go out with the next turn's prompt
+            pending = [summary]
             turn += 1
-            await asyncio.sleep(0.2 if self.simulate else 1)
 
         # end & rewards
-        await self._handle_end_and_rewards(ctx)
+        await self._handle_end_and_rewards(channel, raid)
 
-    async def _handle_end_and_rewards(self, ctx):
-        survivors = [p for p in self.players.values() if p["alive"]]
-        total_joined = len(self.players)
-        if self.boss and self.boss["hp"] <= 0:
+    async def _handle_end_and_rewards(self, channel, raid: RaidSession):
+        survivors = [p for p in raid.players.values() if p["alive"]]
+        total_joined = len(raid.players)
+        if raid.boss and raid.boss["hp"] <= 0:
             if not survivors:
-                await ctx.send("Raid finished: Boss defeated but no survivors.")
+                await channel.send("Raid finished: Boss defeated but no survivors.")
             else:
                 num_survivors = len(survivors)
 
@@ -961,6 +1016,7 @@ class RaidBoss(commands.Cog):
                         f"🎃 **Antonio Bags Available:** {tb}"
                     )
 
+                ledger = get_ledger(self.bot)
                 reward_lines = []
                 for p in survivors:
                     pid = p["id"]
@@ -983,36 +1039,46 @@ class RaidBoss(commands.Cog):
                     reward_lines.append(
                         f"🎁 <@{pid}> — {', '.join(items) if items else '*no rewards*'}"
                     )
+                    if not raid.simulate:
+                        ledger.record_win(
+                            raid,
+                            "raid",
+                            pid,
+                            {
+                                "Event Box": ebox,
+                                "Legacy Token": legacy if legacy_cfg.get("enabled") else 0,
+                                "Antonio Bag": treat if treat_cfg.get("enabled") else 0,
+                            },
+                        )
 
                 embed = discord.Embed(
                     title="🏁 Raid Complete — Players Win!",
                     description=(
-                        f"**{self.boss['name']}** has been defeated!\n**Survivors:** {num_survivors} / {total_joined}\n\n"
+                        f"**{raid.boss['name']}** has been defeated!\n**Survivors:** {num_survivors} / {total_joined}\n\n"
                         + "### 🎉 **Available Rewards**\n"
                         + "\n".join(available_rewards_text)
                         + "\n\n### 🎁 **Reward Distribution**\n"
-                        + "\n".join(reward_lines)
+                        # one line per survivor; large parties end in "…and N more"
+                        + clip_lines(reward_lines, DESCRIPTION_BUDGET)
                     ),
                     color=discord.Color.gold(),
                 )
-                await ctx.send(embed=embed)
+                if not raid.simulate:
+                    embed.set_footer(text=f"Every reward is in the ledger: {usage('rewardsowed')}")
+                await channel.send(embed=embed)
 
         # cleanup state
-        self.active = False
-        self.join_phase = False
-        self.join_task = None
-        self.boss = None
-        self.players.clear()
-        self.player_order.clear()
-        self.simulated_reactors = []
-
-    def _hp_bar(self, hp, max_hp, length: int = 12):
-        if max_hp <= 0:
-            return ""
-        ratio = hp / max_hp
-        filled = int(round(ratio * length))
-        filled = max(0, min(length, filled))
-        return "█" * filled + "░" * (length - filled)
+        raid.active = False
+        raid.join_phase = False
+        raid.join_timer = None
+        raid.join_task = None
+        raid.boss = None
+        raid.players.clear()
+        raid.player_order.clear()
+        raid.snapshot = None
+        raid.roster_changed = False
+        raid.simulated_reactors = []
+        self.sessions.end(raid)
 
 
 async def setup(bot: commands.Bot):
@@ -5,7 +5,7 @@ class General(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command(name="ping")
+    @commands.hybrid_command(name="ping", help="Check if the bot is responsive or online.")
     async def ping(self, ctx):
         await ctx.send("Pong!")
 
@@ -1,119 +1,142 @@
 import discord
 from discord.ext import commands
 
+from config import SLASH_ONLY
+from utils.guild_config import get_guild_config
+
+HELP_TITLE = "Aesira Discord Game Bot Commands"
+HELP_FOOTER = "Games are usually held once or twice a day. Winners get Event Boxes!"
+
+# Section order and titles; cogs not listed here are appended after these
+SECTIONS = {
+    "General": "🏓 General",
+    "Help": "📖 Help",
+    "NumberGuess": "🎲 Guess the Number",
+    "MonsterQuiz": "👹 Guess the Monster",
+    "FLQuiz": "🧠 Forsaken Legacy Quiz",
+    "Bingo": "🎟️ Bingo",
+    "RaidBoss": "⚔️ Raid Boss",
+    "Ledger": "🏆 Winners & Rewards",
+    "Settings": "⚙️ Server Settings",
+    "Admin": "🛠️ Admin",
+}
+
+FIELDS_PER_PAGE = 6
+FIELD_VALUE_LIMIT = 1024
+PAGE_CHAR_BUDGET = 3000  # keeps each page readable and well under Discord's 6000 per embed
+HELP_VIEW_TIMEOUT = 120
+
+
+class HelpPages(discord.ui.View):
+    def __init__(self, pages: list[discord.Embed], author_id: int, usage: str):
+        super().__init__(timeout=HELP_VIEW_TIMEOUT)
+        self.pages = pages
+        self.author_id = author_id
+        self.usage = usage  # how to run the help command here, for people paging someone else's copy
+        self.index = 0
+        self.message: discord.Message | None = None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message(f"Use `{self.usage}` to get your own copy.", ephemeral=True)
+            return False
+        return True
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        self.index = index % len(self.pages)
+        await interaction.response.edit_message(embed=self.pages[self.index], view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
 
 class Help(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.config = get_guild_config(bot)
+        self._cache_key = None
+        self._pages: dict[bool, list[discord.Embed]] = {}  # staff? -> pages
 
-    @commands.command(name="flhelp")
-    async def custom_help(self, ctx):
-        embed = discord.Embed(title="Aesira Discord Game Bot Commands", color=discord.Color.blue())
-        embed.add_field(
-            name="!ping", 
-            value="Check if the bot is responsive or online", 
-            inline=False
-        )
-        embed.add_field(
-            name="!gtn", 
-            value="Start a Guess the Number Game", 
-            inline=False
-        )
-        embed.add_field(
-            name="!stopgtn", 
-            value="Stop currently running Guess the Number Game", 
-            inline=False
-        )
-        embed.add_field(
-            name="!gtm", 
-            value="Start a Guess the Monster Game with 3 Rounds Default", 
-            inline=False
-        )
-        embed.add_field(
-            name="!gtm [number]", 
-            value="Start a Guess the Monster Game with [number] Rounds", 
-            inline=False
-        )
-        embed.add_field(
-            name="!stopgtm", 
-            value="Stop currently running Guess the Monster Game", 
-            inline=False
-        )
-        embed.add_field(
-            name="!flquiz", 
-            value="Start a Forsaken Legacy Quiz Game with 3 Rounds Default", 
-            inline=False
-        )
-        embed.add_field(
-            name="!flquiz [number]", 
-            value="Start a Forsaken Legacy Quiz Game with [number] Rounds", 
-            inline=False
-        )
-        embed.add_field(
-            name="!stopquiz", 
-            value="Stop currently running Forsaken Legacy Quiz Game", 
-            inline=False
-        )
-        embed.add_field(
-            name="!flbingo",
-            value="Start a Bingo Game with default row_col_diag pattern",
-            inline=False,
-        )
-        embed.add_field(
-            name="!flbingo [pattern]",
-            value="Start a Bingo Game with the following [pattern]: row_col_diag, blackout, four_corners, f_pattern, or l_pattern.",
-            inline=False,
-        )
-        embed.add_field(
-            name="!bingonumbers", 
-            value="Show all numbers that have been called so far", 
-            inline=False
-        )
-        embed.add_field(
-            name="!bingo", 
-            value="Declare Bingo if you have a winning card", 
-            inline=False
-        )
-        embed.add_field(
-            name="!stopbingo", 
-            value="Stop currently running Bingo Game", 
-            inline=False
-        )
-        embed.add_field(
-            name="!raidstart", 
-            value="Start a random Raid Boss Battle Event", 
-            inline=False
-        )
-        embed.add_field(
-            name="!raidstart [Boss Monster Name]", 
-            value="Start a specific Raid Boss Battle Event",
-            inline=False,
-        )
-        embed.add_field(
-            name="!joinraid",
-            value="Join the currently forming raid.",
-            inline=False,
-        )
-        embed.add_field(
-            name="!mystats",
-            value="Check your current raid stats (HP, ATK, DEF, etc.)",
-            inline=False,
-        )
-        embed.add_field(
-            name="!raidstatus", 
-            value="Show current raid status (players & boss).",
-            inline=False,
-        )
-        embed.add_field(
-            name="!raidend",
-            value="Force end the current raid.",
-            inline=False,
-        )
+    def _registry_key(self):
+        # A loaded or reloaded cog is a new object, so this changes exactly when the registry does
+        return tuple(id(cog) for cog in self.bot.cogs.values())
+
+    def _usage(self, command: commands.Command) -> str:
+        prefix = "/" if SLASH_ONLY else self.bot.command_prefix
+        usage = f"{prefix}{command.qualified_name}"
+        if command.signature:
+            usage += f" {command.signature}"
+        return usage[:256]
 
-        embed.set_footer(
-            text="Games are usually held once or twice a day. Winners get Event Boxes!"
+    def _build_pages(self, staff: bool) -> list[discord.Embed]:
+        cogs = sorted(
+            self.bot.cogs.values(),
+            key=lambda cog: list(SECTIONS).index(cog.qualified_name) if cog.qualified_name in SECTIONS else len(SECTIONS),
         )
-        await ctx.send(embed=embed)
+
+        # one field per section, split when a section outgrows a field
+        fields = []
+        for cog in cogs:
+            section = SECTIONS.get(cog.qualified_name, cog.qualified_name)
+            value = ""
+            for command in cog.walk_commands():
+                if not staff and (command.hidden or command.extras.get("mod_only", False)):
+                    continue
+                line = f"`{self._usage(command)}` — {command.help or 'No description.'}"[:FIELD_VALUE_LIMIT]
+                if len(value) + len(line) + 1 > FIELD_VALUE_LIMIT:
+                    fields.append((section, value))
+                    section, value = f"{section} (cont.)", ""
+                value = f"{value}\n{line}" if value else line
+            if value:
+                fields.append((section, value))
+
+        pages = []
+        embed, size = None, 0
+        for name, value in fields:
+            if embed is None or len(embed.fields) >= FIELDS_PER_PAGE or size + len(name) + len(value) > PAGE_CHAR_BUDGET:
+                embed = discord.Embed(title=HELP_TITLE, color=discord.Color.blue())
+                pages.append(embed)
+                size = len(HELP_TITLE)
+            embed.add_field(name=name, value=value, inline=False)
+            size += len(name) + len(value)
+
+        for i, page in enumerate(pages, 1):
+            page.set_footer(text=f"{HELP_FOOTER}\nPage {i}/{len(pages)}" if len(pages) > 1 else HELP_FOOTER)
+        return pages
+
+    def pages_for(self, staff: bool) -> list[discord.Embed]:
+        """Cached pages, rebuilt only after a cog has been loaded, reloaded or removed."""
+        key = self._registry_key()
+        if key != self._cache_key:
+            self._pages = {}
+            self._cache_key = key
+        if staff not in self._pages:
+            self._pages[staff] = self._build_pages(staff)
+        return self._pages[staff]
+
+    @commands.hybrid_command(name="flhelp", help="Show this list of commands.")
+    async def custom_help(self, ctx):
+        permissions = getattr(ctx.author, "guild_permissions", None)
+        staff = self.config.is_moderator(ctx.author) or bool(permissions and permissions.manage_guild)
+        pages = self.pages_for(staff)
+        if len(pages) == 1:
+            await ctx.send(embed=pages[0], ephemeral=True)
+            return
+
+        view = HelpPages(pages, ctx.author.id, self._usage(ctx.command))
+        view.message = await ctx.send(embed=pages[0], view=view, ephemeral=True)
 
 
 async def setup(bot):
@@ -0,0 +1,92 @@
+import discord
+from discord.ext import commands
+
+from utils.guild_config import get_guild_config
+from utils.ledger import get_ledger
+
+GAME_NAMES = {
+    "gtn": "Guess the Number",
+    "gtm": "Guess the Monster",
+    "flquiz": "Forsaken Legacy Quiz",
+    "bingo": "Bingo",
+    "raid": "Raid Boss",
+}
+OWED_PREVIEW = 40  # users listed per !rewardsowed
+
+
+class Ledger(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = get_guild_config(bot)
+        self.ledger = get_ledger(bot)
+
+    async def cog_unload(self):
+        await self.ledger.close()
+        self.bot.ledger = None
+
+    @commands.hybrid_command(name="leaderboard", help="Show the top winners. Optionally filter by game: gtn, gtm, flquiz, bingo, raid")
+    @commands.guild_only()
+    async def leaderboard(self, ctx, game: str = None):
+        if game and game not in GAME_NAMES:
+            await ctx.send(f"❌ Unknown game. Use one of: {', '.join(GAME_NAMES)}.", ephemeral=True)
+            return
+
+        rows = await self.ledger.leaderboard(ctx.guild.id, game)
+        title = f"🏆 {GAME_NAMES[game]} Leaderboard" if game else "🏆 Event Leaderboard"
+        if not rows:
+            await ctx.send(embed=discord.Embed(title=title, description="No winners recorded yet.", color=discord.Color.gold()))
+            return
+
+        lines = [f"**{i}.** <@{uid}> — {wins} win{'s' if wins != 1 else ''}" for i, (uid, wins) in enumerate(rows, 1)]
+        await ctx.send(embed=discord.Embed(title=title, description="\n".join(lines), color=discord.Color.gold()))
+
+    @commands.hybrid_command(name="rewardsowed", help="List rewards that still need to be handed out. (GM/CM only)", extras={"mod_only": True})
+    @commands.guild_only()
+    async def rewards_owed(self, ctx):
+        if not self.config.is_moderator(ctx.author):
+            await ctx.send(embed=discord.Embed(
+                title="🚫 Access Denied",
+                description="Only GMs/CMs can view owed rewards.",
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return
+
+        rows = await self.ledger.rewards_owed(ctx.guild.id)
+        if not rows:
+            await ctx.send("✅ All rewards have been handed out.", ephemeral=True)
+            return
+
+        owed: dict[int, list[str]] = {}
+        for uid, item, amount in rows:
+            owed.setdefault(uid, []).append(f"{amount}x {item}")
+
+        lines = [f"🎁 <@{uid}> — {', '.join(items)}" for uid, items in list(owed.items())[:OWED_PREVIEW]]
+        if len(owed) > OWED_PREVIEW:
+            lines.append(f"... and {len(owed) - OWED_PREVIEW} more players")
+        embed = discord.Embed(
+            title=f"📦 Rewards Owed ({len(owed)} players)",
+            description="\n".join(lines)[:4096],
+            color=discord.Color.gold(),
+        ).set_footer(text="Use !fulfill @player once their rewards have been sent.")
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @commands.hybrid_command(name="fulfill", help="Mark all owed rewards of a player as sent. (GM/CM only)", extras={"mod_only": True})
+    @commands.guild_only()
+    async def fulfill(self, ctx, member: discord.Member):
+        if not self.config.is_moderator(ctx.author):
+            await ctx.send(embed=discord.Embed(
+                title="🚫 Access Denied",
+                description="Only GMs/CMs can fulfill rewards.",
+                color=discord.Color.red()
+            ), ephemeral=True)
+            return
+
+        updated = await self.ledger.mark_fulfilled(ctx.guild.id, member.id, ctx.author.id)
+        if updated:
+            await ctx.send(f"✅ Marked {updated} reward grant{'s' if updated != 1 else ''} for {member.mention} as sent.")
+        else:
+            await ctx.send(f"ℹ️ {member.mention} has no owed rewards.", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Ledger(bot))
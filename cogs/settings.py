@@ -0,0 +1,60 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from utils.guild_config import get_guild_config
+
+
+class Settings(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = get_guild_config(bot)
+
+    async def cog_unload(self):
+        await self.config.file.flush()
+
+    @commands.hybrid_group(name="gameconfig", invoke_without_command=True, fallback="show", help="Show this server's game settings. (Manage Server only)", extras={"mod_only": True})
+    @commands.guild_only()
+    @app_commands.default_permissions(manage_guild=True)
+    @commands.has_permissions(manage_guild=True)
+    async def gameconfig(self, ctx):
+        settings = self.config.get(ctx.guild.id)
+        channels = ", ".join(f"<#{cid}>" for cid in sorted(settings.channel_ids)) or "(none)"
+        embed = discord.Embed(title="⚙️ Game Settings", color=discord.Color.blurple())
+        embed.add_field(
+            name="GM/CM Role",
+            value=f"<@&{settings.mod_role_id}>" if settings.mod_role_id else "(none)",
+            inline=False,
+        )
+        embed.add_field(name="Game Channels", value=channels, inline=False)
+        embed.set_footer(text="!gameconfig modrole <role> | addchannel <channel> | removechannel <channel>")
+        await ctx.send(embed=embed, ephemeral=True)
+
+    @gameconfig.command(name="modrole", help="Set the role allowed to start and stop games.", extras={"mod_only": True})
+    @commands.guild_only()
+    # the group's checks only cover the prefix path; hybrid subcommands run their own for slash too
+    @commands.has_permissions(manage_guild=True)
+    async def set_mod_role(self, ctx, role: discord.Role):
+        self.config.edit(ctx.guild.id).mod_role_id = role.id
+        self.config.save()
+        await ctx.send(f"✅ {role.mention} can now start and stop games.", ephemeral=True)
+
+    @gameconfig.command(name="addchannel", help="Allow games in a channel.", extras={"mod_only": True})
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def add_channel(self, ctx, channel: discord.TextChannel):
+        self.config.edit(ctx.guild.id).channel_ids.add(channel.id)
+        self.config.save()
+        await ctx.send(f"✅ Games are now enabled in {channel.mention}.", ephemeral=True)
+
+    @gameconfig.command(name="removechannel", help="Stop allowing games in a channel.", extras={"mod_only": True})
+    @commands.guild_only()
+    @commands.has_permissions(manage_guild=True)
+    async def remove_channel(self, ctx, channel: discord.TextChannel):
+        self.config.edit(ctx.guild.id).channel_ids.discard(channel.id)
+        self.config.save()
+        await ctx.send(f"🛑 Games are now disabled in {channel.mention}.", ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Settings(bot))
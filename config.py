@@ -3,9 +3,40 @@ import os
 
 load_dotenv()
 
+
+def _optional_int(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _flag(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 TOKEN = os.getenv("DISCORD_TOKEN")
 PREFIX = os.getenv("BOT_PREFIX", "!")
-MOD_ID = int(os.getenv("MOD_ROLE_ID"))
-GROUP_ID = int(os.getenv("USER_GROUP_ROLE_ID"))
-CHANNEL_ID = int(os.getenv("DISCORD_CHANNEL_ID"))
-MONSTER_IMAGE_FOLDER = os.getenv("MONSTER_IMAGE_PATH")
\ No newline at end of file
+# Defaults for guilds without stored settings (see utils/guild_config.py)
+MOD_ID = _optional_int("MOD_ROLE_ID")
+GROUP_ID = _optional_int("USER_GROUP_ROLE_ID")
+CHANNEL_ID = _optional_int("DISCORD_CHANNEL_ID")
+MONSTER_IMAGE_FOLDER = os.getenv("MONSTER_IMAGE_PATH")
+DATA_DIR = os.getenv("BOT_DATA_DIR", "data")  # runtime state written by the bot
+GUILD_CONFIG_FILE = os.path.join(DATA_DIR, "guild_config.json")
+QUIZ_ROTATION_FILE = os.path.join(DATA_DIR, "flquiz_rotation.json")  # questions already dealt, per guild
+HANDOVER_FILE = os.path.join(DATA_DIR, "handover.json")  # live games passed from a deploying process to its successor
+PROFILE_DIR = os.path.join(DATA_DIR, "profiles")  # reports and collapsed stacks written by !profile
+TRACE_FILE = os.getenv("BOT_TRACE_FILE")  # per-command latency spans, Chrome trace JSON; tracing is off when unset
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FILE = os.getenv("LOG_FILE")  # JSON lines; stdout when unset
+LOOP_WATCHDOG = _flag("BOT_LOOP_WATCHDOG", default=True)  # measure event loop lag and capture blocking stacks
+MEMORY_WATCH = _flag("BOT_MEMORY_WATCH", default=True)  # sample container, view and task counts for !memory
+TRACEMALLOC = _flag("BOT_TRACEMALLOC")  # also trace allocations (costs memory and some speed)
+EVENT_LOOP = os.getenv("BOT_EVENT_LOOP", "auto").strip().lower()  # auto (uvloop when installed), asyncio or uvloop
+JSON_CODEC = os.getenv("BOT_JSON", "auto").strip().lower()  # auto (orjson when installed), json or orjson
+# Slash-only mode: run on the minimal intent set and take commands, joins and
+# guesses through interactions only (no message content or reaction events)
+SLASH_ONLY = _flag("BOT_SLASH_ONLY")
+SYNC_COMMANDS = _flag("BOT_SYNC_COMMANDS")  # push the slash command tree to Discord on startup
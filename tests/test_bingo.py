@@ -0,0 +1,64 @@
+from cogs.games.bingo import PATTERN_LINES, BingoSession, format_number
+
+
+def make_card(offset=0):
+    """card[col][row]; column c holds c*15+1 .. c*15+5 (+ offset), free centre."""
+    card = [[c * 15 + r + 1 + offset for r in range(5)] for c in range(5)]
+    card[2][2] = "FREE"
+    return card
+
+
+def call(session, col, row, offset=0):
+    return session.mark_number(format_number(col, col * 15 + row + 1 + offset))
+
+
+def test_row_wins_on_last_number_and_is_one_away_before():
+    session = BingoSession(1, 2, 3, "row_col_diag")
+    session.register_card(10, make_card())
+    for col in range(3):
+        assert call(session, col, 0) == ([], [])
+    assert call(session, 3, 0) == ([], [10])
+    assert call(session, 4, 0) == ([10], [])
+    assert session.check_bingo(10)
+
+
+def test_free_centre_counts_as_daubed():
+    session = BingoSession(1, 2, 3, "row_col_diag")
+    session.register_card(10, make_card())
+    for col in (0, 1, 3):
+        call(session, col, 2)
+    assert not session.check_bingo(10)
+    assert call(session, 4, 2)[0] == [10]
+
+
+def test_only_cards_holding_the_number_are_touched():
+    session = BingoSession(1, 2, 3, "row_col_diag")
+    session.register_card(10, make_card())
+    session.register_card(11, make_card(offset=5))  # shares no numbers with card 10
+    before = list(session.line_remaining[11])
+    call(session, 0, 0)
+    assert session.line_remaining[11] == before
+    assert session.line_remaining[10] != [len(line) for line in PATTERN_LINES["row_col_diag"]]
+
+
+def test_every_card_holding_a_number_is_daubed():
+    session = BingoSession(1, 2, 3, "four_corners")
+    for player in (10, 11, 12):
+        session.register_card(player, make_card())
+    call(session, 0, 0)
+    call(session, 4, 0)
+    _, one_away = call(session, 0, 4)
+    assert one_away == [10, 11, 12]
+    winners, _ = call(session, 4, 4)
+    assert winners == [10, 11, 12]
+
+
+def test_uncalled_or_repeated_number_changes_nothing():
+    session = BingoSession(1, 2, 3, "row_col_diag")
+    session.register_card(10, make_card())
+    assert session.mark_number("B-60") == ([], [])
+    call(session, 0, 0)
+    remaining = list(session.line_remaining[10])
+    assert call(session, 0, 0) == ([], [])
+    assert session.line_remaining[10] == remaining
+    assert "B-1" in session.called_numbers
@@ -0,0 +1,157 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+from utils import ledger as ledger_module
+from utils.ledger import Ledger
+
+SESSION = SimpleNamespace(guild_id=1, channel_id=2)
+
+
+def rows(path, sql):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(sql).fetchall()
+
+
+def test_wins_are_queued_then_written_in_one_batch(tmp_path, monkeypatch):
+    path = str(tmp_path / "ledger.sqlite3")
+    batches = []
+
+    async def main():
+        ledger = Ledger(path)
+        write_batch = ledger._write_batch
+        monkeypatch.setattr(ledger, "_write_batch", lambda batch: (batches.append(len(batch)), write_batch(batch)))
+        ledger.record_win(SESSION, "gtn", 10, {"Poring Card": 1, "Nothing": 0})
+        ledger.record_win(SESSION, "gtn", 11)
+        assert len(ledger.pending) == 3  # zero-amount rewards aren't recorded
+        board = await ledger.leaderboard(1, "gtn")
+        owed = await ledger.rewards_owed(1)
+        await ledger.close()
+        return board, owed
+
+    board, owed = asyncio.run(main())
+    assert batches == [3]
+    assert sorted(board) == [(10, 1), (11, 1)]
+    assert owed == [(10, "Poring Card", 1)]
+
+
+def test_writer_waits_for_the_flush_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger_module, "FLUSH_INTERVAL", 0.05)
+    path = str(tmp_path / "ledger.sqlite3")
+
+    async def main():
+        ledger = Ledger(path)
+        for user in range(5):
+            ledger.record_win(SESSION, "bingo", user)
+        await asyncio.sleep(0.01)
+        early = len(ledger.pending)
+        await asyncio.sleep(0.1)
+        late = len(ledger.pending)
+        await ledger.close()
+        return early, late
+
+    assert asyncio.run(main()) == (5, 0)
+    assert rows(path, "SELECT COUNT(*) FROM results") == [(5,)]
+
+
+def test_full_batch_flushes_without_waiting(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger_module, "FLUSH_INTERVAL", 60)
+    monkeypatch.setattr(ledger_module, "MAX_BATCH", 4)
+    path = str(tmp_path / "ledger.sqlite3")
+
+    async def main():
+        ledger = Ledger(path)
+        for user in range(4):
+            ledger.record_win(SESSION, "raid", user)
+        await asyncio.sleep(0.05)
+        pending = len(ledger.pending)
+        await ledger.close()
+        return pending
+
+    assert asyncio.run(main()) == 0
+    assert rows(path, "SELECT COUNT(*) FROM results") == [(4,)]
+
+
+def test_close_writes_what_is_still_queued(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger_module, "FLUSH_INTERVAL", 60)
+    path = str(tmp_path / "ledger.sqlite3")
+
+    async def main():
+        ledger = Ledger(path)
+        ledger.record_win(SESSION, "gtm", 10, {"Old Blue Box": 2})
+        await ledger.close()
+
+    asyncio.run(main())
+    assert rows(path, "SELECT user_id, item, amount FROM rewards") == [(10, "Old Blue Box", 2)]
+
+
+def test_mark_fulfilled_clears_owed_rewards(tmp_path):
+    async def main():
+        ledger = Ledger(str(tmp_path / "ledger.sqlite3"))
+        ledger.record_win(SESSION, "raid", 10, {"Yggdrasil Berry": 3})
+        updated = await ledger.mark_fulfilled(1, 10, fulfilled_by=99)
+        owed = await ledger.rewards_owed(1)
+        await ledger.close()
+        return updated, owed
+
+    assert asyncio.run(main()) == (1, [])
+
+
+def test_batch_filling_during_the_interval_wakes_the_writer(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger_module, "FLUSH_INTERVAL", 60)
+    monkeypatch.setattr(ledger_module, "MAX_BATCH", 4)
+
+    async def main():
+        ledger = Ledger(str(tmp_path / "ledger.sqlite3"))
+        ledger.record_win(SESSION, "raid", 0)
+        await asyncio.sleep(0.01)  # the writer is now waiting out the interval
+        for user in range(1, 4):
+            ledger.record_win(SESSION, "raid", user)
+        await asyncio.sleep(0.05)
+        pending = len(ledger.pending)
+        await ledger.close()
+        return pending
+
+    assert asyncio.run(main()) == 0
+
+
+def test_failed_batch_is_kept_and_retried(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger_module, "FLUSH_INTERVAL", 0)
+    monkeypatch.setattr(ledger_module, "RETRY_DELAY", 0.02)
+    path = str(tmp_path / "ledger.sqlite3")
+    failures = []
+
+    async def main():
+        ledger = Ledger(path)
+        write_batch = ledger._write_batch
+
+        def flaky(batch):
+            if len(failures) < 2:
+                failures.append(len(batch))
+                raise sqlite3.OperationalError("database is locked")
+            write_batch(batch)
+
+        monkeypatch.setattr(ledger, "_write_batch", flaky)
+        ledger.record_win(SESSION, "gtn", 10, {"Event Box": 1})
+        await asyncio.sleep(0.01)
+        ledger.record_win(SESSION, "gtn", 11)  # queued behind the failed batch
+        await asyncio.sleep(0.2)
+        pending = len(ledger.pending)
+        await ledger.close()
+        return pending
+
+    assert asyncio.run(main()) == 0
+    assert failures == [2, 3]
+    assert rows(path, "SELECT user_id FROM results ORDER BY id") == [(10,), (11,)]
+    assert rows(path, "SELECT COUNT(*) FROM rewards") == [(1,)]
+
+
+def test_close_with_an_idle_writer_returns(tmp_path):
+    async def main():
+        ledger = Ledger(str(tmp_path / "ledger.sqlite3"))
+        ledger.record_win(SESSION, "gtn", 10)
+        await ledger.flush()
+        await asyncio.sleep(0.01)  # writer flushes nothing and goes back to waiting
+        await asyncio.wait_for(ledger.close(), 1)
+
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from utils.gamedata import column
+from utils.name_index import COMPLETION_LIMIT, NameIndex
+
+BOSSES = [SimpleNamespace(name=name) for name in ("Osiris", "Moonlight Flower", "Baphomet", "Orc Hero", "Orc Lord")]
+
+
+def make_index(records=BOSSES):
+    return NameIndex(records, column(records, "name"))
+
+
+def test_exact_lookup_ignores_case_and_spacing():
+    index = make_index()
+    assert index.get("  moonlight FLOWER ") is BOSSES[1]
+    assert index.get("moonlight") is None
+
+
+def test_complete_matches_prefixes_and_word_starts_in_name_order():
+    index = make_index()
+    assert index.complete("or") == ["Orc Hero", "Orc Lord"]
+    assert index.complete("flow") == ["Moonlight Flower"]
+    assert index.complete("") == ["Baphomet", "Moonlight Flower", "Orc Hero", "Orc Lord", "Osiris"]
+    assert index.complete("zzz") == []
+
+
+def test_complete_is_capped():
+    records = [SimpleNamespace(name=f"Poring {n:02}") for n in range(40)]
+    assert len(make_index(records).complete("poring")) == COMPLETION_LIMIT
+
+
+def test_suggest_falls_back_to_fuzzy_matches():
+    index = make_index()
+    assert index.suggest("baphomt") == ["Baphomet"]
+    assert index.suggest("orc") == ["Orc Hero", "Orc Lord"]
+
+
+def test_get_only_reads_the_record_it_returns():
+    class Catalog(list):
+        def __init__(self, items):
+            super().__init__(items)
+            self.read = []
+
+        def __getitem__(self, i):
+            self.read.append(i)
+            return super().__getitem__(i)
+
+    catalog = Catalog(BOSSES)
+    index = NameIndex(catalog, [b.name for b in BOSSES])
+    catalog.read.clear()
+    assert index.get("osiris") is BOSSES[0]
+    assert catalog.read == [0]
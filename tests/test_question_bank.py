@@ -0,0 +1,74 @@
+import collections
+
+from utils.gamedata import Question, normalize_answer
+from utils.question_bank import QuestionBank, Rotation
+
+
+def make_questions(count, category=None, difficulty=None):
+    return [
+        Question(question=f"Q{n}?", answer=f"A{n}", answer_key=normalize_answer(f"A{n}"), category=category, difficulty=difficulty)
+        for n in range(count)
+    ]
+
+
+def dealt(bank, *args, **kwargs):
+    return [q.question for q in bank.deal(*args, **kwargs)]
+
+
+def test_no_repeats_until_the_pool_is_used_up(tmp_path):
+    bank = QuestionBank(make_questions(10), str(tmp_path / "rotation.json"))
+    first_pass = dealt(bank, 1, 4) + dealt(bank, 1, 4) + dealt(bank, 1, 2)
+    assert sorted(first_pass) == sorted(f"Q{n}?" for n in range(10))
+
+
+def test_wraparound_defers_instead_of_dropping(tmp_path):
+    bank = QuestionBank(make_questions(5), str(tmp_path / "rotation.json"))
+    counts = collections.Counter()
+    for _ in range(200):
+        deal = dealt(bank, 1, 3)
+        assert len(set(deal)) == 3
+        counts.update(deal)
+        # questions skipped at a wraparound are dealt later, so nobody falls behind
+        assert max(counts.values()) - min(counts.values(), default=0) <= 2
+
+
+def test_deferred_questions_go_out_first_after_a_reload(tmp_path):
+    path = str(tmp_path / "rotation.json")
+    bank = QuestionBank(make_questions(5), path)
+    for _ in range(100):
+        dealt(bank, 1, 3)
+        deferred = list(bank.rotations[1]["*/*"].deferred)
+        if deferred:
+            break
+    assert deferred, "no wraparound ever passed over a question"
+
+    reloaded = QuestionBank(make_questions(5), path)
+    assert reloaded.rotations[1]["*/*"].deferred == deferred
+    expected = [f"Q{n}?" for n in deferred[:3]]
+    assert dealt(reloaded, 1, 3)[:len(expected)] == expected
+
+
+def test_filters_and_tags(tmp_path):
+    questions = make_questions(3, "lore", "hard") + make_questions(2, "maps", "easy")
+    bank = QuestionBank(questions, str(tmp_path / "rotation.json"))
+    assert bank.categories == ["lore", "maps"]
+    assert bank.available() == 5
+    assert bank.available("lore", "hard") == 3
+    assert bank.available("maps", "hard") == 0
+    assert bank.match_tags(["Hard", "LORE", "extra"]) == ("lore", "hard", ["extra"])
+    assert len(bank.deal(1, 10, "maps")) == 2
+    assert bank.deal(1, 1, "maps", "hard") == []
+
+
+def test_unreadable_file_starts_over(tmp_path):
+    path = tmp_path / "rotation.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert QuestionBank(make_questions(3), str(path)).rotations == {}
+
+
+def test_rotation_round_trips_and_omits_empty_deferred():
+    rotation = Rotation(seed=7, size=5, cursor=3, deferred=[4, 1])
+    restored = Rotation.from_dict(rotation.to_dict())
+    assert (restored.seed, restored.size, restored.cursor, restored.deferred) == (7, 5, 3, [4, 1])
+    assert "deferred" not in Rotation(seed=7, size=5).to_dict()
+    assert Rotation.from_dict({"seed": "7", "size": "5", "cursor": "0"}).deferred == []
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+
+import pytest
+
+from utils.timers import Scheduler
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_timers_fire_in_deadline_order():
+    async def main():
+        timers = Scheduler()
+        fired = []
+        timers.call_later(0.03, fired.append, "late")
+        timers.call_later(0.01, fired.append, "early")
+        timers.call_later(0.02, fired.append, "middle")
+        await asyncio.sleep(0.06)
+        return fired
+
+    assert run(main()) == ["early", "middle", "late"]
+
+
+def test_cancelled_timer_never_fires():
+    async def main():
+        timers = Scheduler()
+        fired = []
+        timer = timers.call_later(0.01, fired.append, "x")
+        timer.cancel()
+        timer.cancel()  # a second cancel is a no-op
+        await asyncio.sleep(0.03)
+        return fired, len(timers)
+
+    assert run(main()) == ([], 0)
+
+
+def test_call_every_repeats_until_cancelled():
+    async def main():
+        timers = Scheduler()
+        ticks = []
+        timer = timers.call_every(0.01, ticks.append, 1, first=0.01)
+        await asyncio.sleep(0.055)
+        timer.cancel()
+        seen = len(ticks)
+        await asyncio.sleep(0.03)
+        return seen, len(ticks)
+
+    seen, later = run(main())
+    assert 3 <= seen <= 6
+    assert later == seen
+
+
+def test_timeout_reschedule_moves_the_deadline():
+    async def main():
+        timers = Scheduler()
+        async with timers.timeout(0.02) as deadline:
+            deadline.reschedule(0.06)
+            await asyncio.sleep(0.04)  # past the original deadline
+        with pytest.raises(asyncio.TimeoutError):
+            async with timers.timeout(0.01):
+                await asyncio.sleep(1)
+
+    run(main())
+
+
+def test_close_cancels_pending_and_running_timers():
+    async def main():
+        timers = Scheduler()
+        fired, finished = [], []
+
+        async def slow():
+            await asyncio.sleep(1)
+            finished.append(True)
+
+        timers.call_later(0, slow)
+        timers.call_later(0.02, fired.append, "x")
+        await asyncio.sleep(0.005)
+        timers.close()
+        late = timers.call_later(0, fired.append, "after close")
+        await asyncio.sleep(0.04)
+        return fired, finished, late.cancelled, len(timers)
+
+    assert run(main()) == ([], [], True, 0)
+
+
+def test_coroutine_callback_errors_are_logged_with_timer_name(caplog):
+    async def fail():
+        raise RuntimeError("boom")
+
+    async def main():
+        timers = Scheduler()
+        timers.call_later(0, fail, name="exploding")
+        await asyncio.sleep(0.02)
+
+    with caplog.at_level(logging.ERROR, logger="utils.timers"):
+        run(main())
+    [record] = caplog.records
+    assert record.timer == "exploding"
+    assert record.exc_info[0] is RuntimeError
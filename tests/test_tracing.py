@@ -0,0 +1,87 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import discord
+from discord.ext import commands
+from discord.webhook.async_ import AsyncWebhookAdapter
+
+from utils import tracing
+from utils.tracing import Tracer, missing_internals, span
+
+
+def make_bot():
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    bot.http._HTTPClient__session = SimpleNamespace(request=lambda *args, **kwargs: None)  # set by login
+    return bot
+
+
+def owned(cls, attr):
+    return next(klass.__dict__[attr] for klass in cls.__mro__ if attr in klass.__dict__)
+
+
+def originals(bot):
+    return {
+        "prepare": commands.Command.__dict__["prepare"],
+        "view": owned(discord.ui.View, "_scheduled_task"),
+        "modal": owned(discord.ui.Modal, "_scheduled_task"),
+        "webhook": AsyncWebhookAdapter.__dict__["request"],
+        "tree": bot.tree._call,
+        "http": bot.http.request,
+        "session": bot.http._HTTPClient__session.request,
+        "run_event": bot._run_event,
+        "invoke": bot.invoke,
+    }
+
+
+def test_install_then_uninstall_restores_every_original(tmp_path):
+    bot = make_bot()
+    before = originals(bot)
+    tracer = Tracer(str(tmp_path / "spans.json"))
+    assert tracer.install(bot)
+    patched = originals(bot)
+    assert all(patched[key] != before[key] for key in before)
+
+    tracer.uninstall()
+    assert originals(bot) == before
+    assert "_run_event" not in vars(bot) and "invoke" not in vars(bot)
+    assert not tracer.installed
+
+
+def test_missing_internal_skips_install(tmp_path, monkeypatch, caplog):
+    bot = make_bot()
+    monkeypatch.delattr(AsyncWebhookAdapter, "request")
+    assert missing_internals(bot) == ["AsyncWebhookAdapter.request"]
+    prepare = commands.Command.__dict__["prepare"]
+    tracer = Tracer(str(tmp_path / "spans.json"))
+    assert tracer.install(bot) is False
+    assert not tracer.installed
+    assert commands.Command.__dict__["prepare"] is prepare
+    assert "_run_event" not in vars(bot)
+    assert "tracing unavailable" in caplog.text
+
+
+def test_writer_formats_spans_as_chrome_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_MIN_DURATION", 0)
+    path = tmp_path / "spans.json"
+    tracer = Tracer(str(path))
+
+    async def main():
+        with tracer.trace("on_message NumberGuess.on_message", "event"):
+            with span("deal", "data", count=3):
+                await asyncio.sleep(0)
+
+    asyncio.run(main())
+    tracer.stop()
+    events = json.loads(path.read_text(encoding="utf-8").rstrip().rstrip(",") + "]")
+    meta, child, root = events
+    assert meta == {"name": "process_name", "ph": "M", "pid": root["pid"], "args": {"name": "on_message NumberGuess.on_message"}}
+    assert child["name"] == "deal" and child["args"] == {"count": 3} and child["tid"] == root["tid"] == 1
+    assert root["ts"] <= child["ts"] and child["dur"] <= root["dur"]
+    assert root["args"]["rest_calls"] == 0 and "total_ms" in root["args"]
+    assert tracer.written == 1
+
+
+def test_span_outside_a_trace_records_nothing():
+    with span("idle", "data") as current:
+        assert current is None
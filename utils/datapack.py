@@ -0,0 +1,342 @@
+# datapack.py
+# Compiled, memory-mapped form of the game catalogs. `python -m utils.datapack`
+# compiles cogs/data/*.json into one binary pack; cogs then open it with mmap,
+# so startup doesn't parse JSON, every process on the host shares the same
+# pages, and records are only decoded when a game touches them. The indexes
+# cogs build at load (boss names, question tags) read just the fields they
+# need through PackedCatalog.column, without decoding whole records.
+#
+# Layout (little endian):
+#   header    magic "GDPK", version u16, section count u16, string table offset u32, size u32
+#   sections  name 12s, source mtime_ns i64, source size i64, record count u32,
+#             record size u32, records offset u32, index count u32, index offset u32
+#   records   fixed-width per section; strings are (offset u32, length u32) into the table
+#   indexes   (key string ref, record number u32), sorted by key bytes
+#   strings   UTF-8, deduplicated
+
+import bisect
+import collections.abc
+import logging
+import mmap
+import os
+import struct
+import typing
+
+from config import MONSTER_IMAGE_FOLDER
+from utils.gamedata import (
+    BOSS_FILE,
+    DATA_FOLDER,
+    MONSTER_DATA_FILE,
+    QUESTION_FILE,
+    Boss,
+    InvalidEntry,
+    Monster,
+    Question,
+    normalize_answer,
+    resolve_media,
+)
+from utils.speedups import json_load
+
+log = logging.getLogger(__name__)
+
+DATA_PACK_FILE = os.path.join(DATA_FOLDER, "gamedata.pack")
+MAGIC = b"GDPK"
+VERSION = 2
+NAME_SEPARATOR = "\x1f"  # joins a monster's alternative names in one string
+
+HEADER = struct.Struct("<4sHHII")
+SECTION = struct.Struct("<12sqqIIIII")
+INDEX_ENTRY = struct.Struct("<III")
+MONSTER_RECORD = struct.Struct("<IIIIII")  # names, image, silhouette
+BOSS_RECORD = struct.Struct("<IIiiiiidII")  # name, hp, atk, def, difficulty, base rewards, multiplier, image
+QUESTION_RECORD = struct.Struct("<IIIIIIII")  # question, answer, category, difficulty
+
+
+class StaleDataPack(Exception):
+    """The pack was built from a different version of a source file."""
+
+
+# ---------- Decoding ----------
+class PackedCatalog(collections.abc.Sequence):
+    """
+    Read-only sequence of records backed by one pack section. Each access
+    decodes a single fixed-width record into a gamedata record.
+    """
+
+    def __init__(self, pack: "DataPack", record: struct.Struct, decode, columns: dict[str, int], count: int, offset: int, index_count: int, index_offset: int):
+        self._pack = pack
+        self._record = record
+        self._decode = decode
+        self._columns = columns
+        self._count = count
+        self._offset = offset
+        self._index_count = index_count
+        self._index_offset = index_offset
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("catalog index out of range")
+        values = self._record.unpack_from(self._pack.buffer, self._offset + i * self._record.size)
+        return self._decode(self._pack, values)
+
+    def column(self, field: str) -> list[typing.Optional[str]]:
+        """One string field of every record, in record order; empty strings read as None."""
+        at = self._columns[field]
+        size = self._record.size
+        values = []
+        for i in range(self._count):
+            string_offset, length = self._record.unpack_from(self._pack.buffer, self._offset + i * size)[at:at + 2]
+            values.append(self._pack.string(string_offset, length) or None)
+        return values
+
+    # ---------- Name index ----------
+    def _index_key(self, n: int) -> bytes:
+        key_offset, key_length, _ = INDEX_ENTRY.unpack_from(self._pack.buffer, self._index_offset + n * INDEX_ENTRY.size)
+        return self._pack.raw_string(key_offset, key_length)
+
+    def _index_record(self, n: int) -> int:
+        return INDEX_ENTRY.unpack_from(self._pack.buffer, self._index_offset + n * INDEX_ENTRY.size)[2]
+
+    def find(self, key: str) -> list:
+        """Records whose indexed name equals `key` (already normalized), via binary search."""
+        target = key.encode("utf-8")
+        keys = _IndexKeys(self)
+        start = bisect.bisect_left(keys, target)
+        end = bisect.bisect_right(keys, target, lo=start)
+        return [self[self._index_record(n)] for n in range(start, end)]
+
+
+class _IndexKeys(collections.abc.Sequence):
+    """Index keys as a sequence, so bisect can search the mapped index in place."""
+
+    def __init__(self, catalog: PackedCatalog):
+        self._catalog = catalog
+
+    def __len__(self) -> int:
+        return self._catalog._index_count
+
+    def __getitem__(self, n: int) -> bytes:
+        return self._catalog._index_key(n)
+
+
+def _decode_monster(pack: "DataPack", values) -> Monster:
+    names = tuple(pack.string(values[0], values[1]).split(NAME_SEPARATOR))
+    return Monster(
+        names=names,
+        answers=frozenset(normalize_answer(n) for n in names),
+        image=resolve_media(pack.string(values[2], values[3]), pack.media_folder),
+        silhouette=resolve_media(pack.string(values[4], values[5]), pack.media_folder),
+    )
+
+
+def _decode_boss(pack: "DataPack", values) -> Boss:
+    name = pack.string(values[0], values[1])
+    return Boss(
+        name=name,
+        key=name.casefold(),
+        hp=values[2],
+        atk=values[3],
+        defense=values[4],
+        difficulty=values[5],
+        base_rewards=values[6],
+        reward_multiplier=values[7],
+        image=resolve_media(pack.string(values[8], values[9]), pack.media_folder),
+    )
+
+
+def _decode_question(pack: "DataPack", values) -> Question:
+    answer = pack.string(values[2], values[3])
+    return Question(
+        question=pack.string(values[0], values[1]),
+        answer=answer,
+        answer_key=normalize_answer(answer),
+        category=pack.string(values[4], values[5]) or None,
+        difficulty=pack.string(values[6], values[7]) or None,
+    )
+
+
+# record struct, decoder, and the string fields column() can read (position of the ref in the record)
+SECTIONS = {
+    "monsters": (MONSTER_RECORD, _decode_monster, {}),
+    "bosses": (BOSS_RECORD, _decode_boss, {"name": 0}),
+    "questions": (QUESTION_RECORD, _decode_question, {"category": 4, "difficulty": 6}),
+}
+
+
+class DataPack:
+    def __init__(self, path: str = DATA_PACK_FILE, media_folder: typing.Optional[str] = MONSTER_IMAGE_FOLDER):
+        self.path = path
+        self.media_folder = media_folder
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, self._strings_offset, self._strings_size = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} data pack")
+        self.sections: dict[str, tuple] = {}
+        for i in range(count):
+            name, *meta = SECTION.unpack_from(self.buffer, HEADER.size + i * SECTION.size)
+            self.sections[name.rstrip(b"\0").decode()] = tuple(meta)
+
+    def raw_string(self, offset: int, length: int) -> bytes:
+        start = self._strings_offset + offset
+        return self.buffer[start:start + length]
+
+    def string(self, offset: int, length: int) -> str:
+        return self.raw_string(offset, length).decode("utf-8")
+
+    def catalog(self, name: str, source: str) -> PackedCatalog:
+        """The section compiled from `source`; raises StaleDataPack if the source changed since."""
+        mtime_ns, size, count, record_size, offset, index_count, index_offset = self.sections[name]
+        stat = os.stat(source)
+        if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size):
+            raise StaleDataPack(f"{source} changed after {self.path} was built")
+        record, decode, columns = SECTIONS[name]
+        if record.size != record_size:
+            raise ValueError(f"{self.path} has an unexpected {name} record size")
+        return PackedCatalog(self, record, decode, columns, count, offset, index_count, index_offset)
+
+    def close(self):
+        self.buffer.close()
+
+
+_open_packs: dict[str, DataPack] = {}
+
+
+def open_catalog(name: str, source: str, path: str = DATA_PACK_FILE) -> typing.Optional[PackedCatalog]:
+    """
+    The packed catalog for `name`, or None when there is no pack or it is out
+    of date (callers then fall back to the JSON source). One mmap per pack is
+    shared by every cog in the process.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        pack = _open_packs.get(path)
+        if pack is None:
+            pack = _open_packs[path] = DataPack(path)
+        return pack.catalog(name, source)
+    except (OSError, ValueError, KeyError, StaleDataPack) as e:
+        log.warning("data pack unusable; loading JSON", extra={"catalog": name, "path": path, "error": str(e)})
+        return None
+
+
+# ---------- Building ----------
+class _StringTable:
+    def __init__(self):
+        self.data = bytearray()
+        self.refs: dict[str, tuple[int, int]] = {}
+
+    def add(self, text: typing.Optional[str]) -> tuple[int, int]:
+        text = text or ""
+        ref = self.refs.get(text)
+        if ref is None:
+            encoded = text.encode("utf-8")
+            ref = self.refs[text] = (len(self.data), len(encoded))
+            self.data += encoded
+        return ref
+
+
+def _media(entry: dict, key: str) -> str:
+    """Stored as written (with / separators); resolved against the media folder on decode."""
+    value = entry.get(key)
+    return value.strip().replace("\\", "/") if isinstance(value, str) else ""
+
+
+def _compile_monster(entry: dict, strings: _StringTable):
+    monster = Monster.from_dict(entry, folder=None)  # validation only
+    record = MONSTER_RECORD.pack(
+        *strings.add(NAME_SEPARATOR.join(monster.names)),
+        *strings.add(_media(entry, "image")),
+        *strings.add(_media(entry, "silhouette")),
+    )
+    return record, sorted(monster.answers)
+
+
+def _compile_boss(entry: dict, strings: _StringTable):
+    boss = Boss.from_dict(entry, folder=None)
+    record = BOSS_RECORD.pack(
+        *strings.add(boss.name),
+        boss.hp, boss.atk, boss.defense, boss.difficulty, boss.base_rewards, boss.reward_multiplier,
+        *strings.add(_media(entry, "image")),
+    )
+    return record, [boss.key]
+
+
+def _compile_question(entry: dict, strings: _StringTable):
+    question = Question.from_dict(entry)
+    record = QUESTION_RECORD.pack(
+        *strings.add(question.question),
+        *strings.add(question.answer),
+        *strings.add(question.category),
+        *strings.add(question.difficulty),
+    )
+    return record, []
+
+
+SOURCES = (
+    ("monsters", MONSTER_DATA_FILE, _compile_monster),
+    ("bosses", BOSS_FILE, _compile_boss),
+    ("questions", QUESTION_FILE, _compile_question),
+)
+
+
+def build(path: str = DATA_PACK_FILE) -> dict[str, tuple[int, int]]:
+    """Compile every catalog into `path`. Returns {section: (records, skipped)}."""
+    strings = _StringTable()
+    compiled = []
+    summary = {}
+    for name, source, compile_entry in SOURCES:
+        with open(source, "r", encoding="utf-8") as f:
+            raw = json_load(f)
+        stat = os.stat(source)
+        records, index = [], []
+        for entry in raw if isinstance(raw, list) else []:
+            try:
+                if not isinstance(entry, dict):
+                    raise InvalidEntry("entry is not an object")
+                record, keys = compile_entry(entry, strings)
+            except InvalidEntry:
+                continue
+            index.extend((key.encode("utf-8"), strings.add(key), len(records)) for key in keys)
+            records.append(record)
+        index.sort()
+        compiled.append((name, stat, records, index))
+        summary[name] = (len(records), len(raw) - len(records))
+
+    # Offsets: header, section table, then each section's records and index, then strings
+    offset = HEADER.size + SECTION.size * len(compiled)
+    sections, body = [], bytearray()
+    for name, stat, records, index in compiled:
+        record_size = SECTIONS[name][0].size
+        records_offset = offset + len(body)
+        body += b"".join(records)
+        index_offset = offset + len(body)
+        body += b"".join(INDEX_ENTRY.pack(*ref, number) for _, ref, number in index)
+        sections.append(SECTION.pack(
+            name.encode(), stat.st_mtime_ns, stat.st_size,
+            len(records), record_size, records_offset, len(index), index_offset,
+        ))
+    strings_offset = offset + len(body)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(compiled), strings_offset, len(strings.data)))
+        f.write(b"".join(sections))
+        f.write(body)
+        f.write(strings.data)
+    os.replace(tmp, path)
+    return summary
+
+
+if __name__ == "__main__":
+    for section, (count, skipped) in build().items():
+        print(f"{section}: {count} records" + (f" ({skipped} invalid skipped)" if skipped else ""))
+    print(f"Wrote {DATA_PACK_FILE} ({os.path.getsize(DATA_PACK_FILE):,} bytes)")
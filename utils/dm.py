@@ -0,0 +1,131 @@
+# dm.py
+# Shared DM fan-out: bounded concurrency, paced to stay under Discord's DM
+# rate limits, with cached DM channels and one progress/summary message.
+
+import asyncio
+import typing
+import discord
+
+DM_CONCURRENCY = 8  # max DMs in flight at once
+DM_RATE_PER_SECOND = 5.0  # average DMs started per second
+PROGRESS_INTERVAL = 3.0  # seconds between progress message edits
+FAILURE_PREVIEW = 20  # max failed users listed in the summary
+
+
+class FanoutReport:
+    """Result of a fan-out: who got the DM and who didn't (with a reason)."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.sent: list[discord.abc.User] = []
+        self.failed: list[tuple[discord.abc.User, str]] = []
+
+    @property
+    def done(self) -> int:
+        return len(self.sent) + len(self.failed)
+
+    def summary_text(self, label: str) -> str:
+        text = f"{label}: **{len(self.sent)}/{self.total}** delivered."
+        if self.failed:
+            preview = ", ".join(
+                f"{user.mention} ({reason})" for user, reason in self.failed[:FAILURE_PREVIEW]
+            )
+            if len(self.failed) > FAILURE_PREVIEW:
+                preview += f" and {len(self.failed) - FAILURE_PREVIEW} more"
+            text += f"\n⚠️ Couldn't DM: {preview}"
+        return text
+
+
+class DMFanout:
+    def __init__(
+        self,
+        concurrency: int = DM_CONCURRENCY,
+        rate: float = DM_RATE_PER_SECOND,
+    ):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.channels: dict[int, discord.DMChannel] = {}  # user_id -> DM channel
+        self._next_slot = 0.0
+
+    async def _pace(self):
+        """Token-bucket style spacing so bursts don't run into 429s."""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def get_channel(self, user: discord.abc.User) -> discord.DMChannel:
+        channel = self.channels.get(user.id)
+        if channel is None:
+            channel = user.dm_channel or await user.create_dm()
+            self.channels[user.id] = channel
+        return channel
+
+    async def send(self, user: discord.abc.User, **kwargs) -> typing.Optional[str]:
+        """Send one DM. Returns None on success, otherwise a short failure reason."""
+        async with self.semaphore:
+            await self._pace()
+            try:
+                channel = await self.get_channel(user)
+                await channel.send(**kwargs)
+                return None
+            except discord.Forbidden:
+                return "DMs closed"
+            except discord.HTTPException as e:
+                self.channels.pop(user.id, None)
+                return f"error {e.status}"
+
+    async def send_many(
+        self,
+        deliveries: typing.Iterable[tuple[discord.abc.User, dict]],
+        status_channel: typing.Optional[discord.abc.Messageable] = None,
+        label: str = "📨 Sending DMs",
+    ) -> FanoutReport:
+        """
+        Deliver (user, send kwargs) pairs concurrently. If status_channel is
+        given, a single message there is edited with progress and then the
+        final summary instead of posting once per failure.
+        """
+        deliveries = list(deliveries)
+        report = FanoutReport(len(deliveries))
+
+        async def deliver(user, kwargs):
+            reason = await self.send(user, **kwargs)
+            if reason is None:
+                report.sent.append(user)
+            else:
+                report.failed.append((user, reason))
+
+        status_msg = None
+        if status_channel is not None and deliveries:
+            status_msg = await status_channel.send(f"{label}... 0/{report.total}")
+
+        tasks = [asyncio.ensure_future(deliver(u, kw)) for u, kw in deliveries]
+        gathered = asyncio.gather(*tasks)
+        while status_msg is not None and not gathered.done():
+            done, _ = await asyncio.wait({gathered}, timeout=PROGRESS_INTERVAL)
+            if done:
+                break
+            try:
+                await status_msg.edit(content=f"{label}... {report.done}/{report.total}")
+            except discord.HTTPException:
+                pass
+        await gathered
+
+        if status_msg is not None:
+            try:
+                await status_msg.edit(content=report.summary_text(label))
+            except discord.HTTPException:
+                pass
+        return report
+
+
+def get_fanout(bot) -> DMFanout:
+    """One fan-out (and DM channel cache) shared by every cog on the bot."""
+    fanout = getattr(bot, "dm_fanout", None)
+    if fanout is None:
+        fanout = DMFanout()
+        bot.dm_fanout = fanout
+    return fanout
@@ -0,0 +1,222 @@
+# gamedata.py
+# Game catalogs (monsters, raid bosses, quiz questions) loaded once into
+# immutable slotted records. Entries are validated and normalized at load,
+# so game code can use fields directly without re-checking types.
+
+import logging
+import os
+import typing
+
+from config import MONSTER_IMAGE_FOLDER
+from utils.speedups import JSONDecodeError, json_load
+
+log = logging.getLogger(__name__)
+
+DATA_FOLDER = "cogs/data"
+MONSTER_DATA_FILE = os.path.join(DATA_FOLDER, "monsters.json")
+BOSS_FILE = os.path.join(DATA_FOLDER, "raid_bosses.json")
+QUESTION_FILE = os.path.join(DATA_FOLDER, "flquiz_questions.json")
+
+
+class InvalidEntry(ValueError):
+    """A catalog entry that can't be turned into a record."""
+
+
+class Record:
+    """Base for read-only slotted records; subclasses list their fields in __slots__."""
+
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+def normalize_answer(text: str) -> str:
+    """The form answers are compared in; apply the same to player guesses."""
+    return text.lower().strip()
+
+
+def is_url(path: typing.Optional[str]) -> bool:
+    return bool(path) and path.startswith(("http://", "https://"))
+
+
+def resolve_media(path, folder: typing.Optional[str] = MONSTER_IMAGE_FOLDER) -> typing.Optional[str]:
+    """URLs pass through; local paths get native separators and are made absolute."""
+    if not isinstance(path, str) or not path.strip():
+        return None
+    path = path.strip()
+    if is_url(path):
+        return path
+    path = path.replace("\\", os.sep).replace("/", os.sep)
+    if not os.path.isabs(path) and folder:
+        path = os.path.join(folder, path)
+    return os.path.abspath(path)
+
+
+def _text(entry: dict, key: str) -> str:
+    value = entry.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise InvalidEntry(f"missing or empty {key!r}")
+    return value.strip()
+
+
+def _tag(entry: dict, key: str) -> typing.Optional[str]:
+    """Optional label, casefolded so tags match however the catalog or a player writes them."""
+    value = entry.get(key)
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise InvalidEntry(f"{key!r} must be text")
+    return value.strip().casefold() or None
+
+
+def _number(entry: dict, key: str, default, kind=int):
+    value = entry.get(key, default)
+    if isinstance(value, bool):
+        raise InvalidEntry(f"{key!r} must be a number")
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise InvalidEntry(f"{key!r} must be a number") from None
+
+
+class Monster(Record):
+    __slots__ = ("names", "answers", "image", "silhouette")
+
+    names: tuple[str, ...]  # display names, as written in the catalog
+    answers: frozenset[str]  # normalized names accepted as a correct guess
+    image: typing.Optional[str]
+    silhouette: typing.Optional[str]
+
+    @property
+    def display_name(self) -> str:
+        return " or ".join(self.names)
+
+    @classmethod
+    def from_dict(cls, entry: dict, folder: typing.Optional[str] = MONSTER_IMAGE_FOLDER) -> "Monster":
+        raw = entry.get("name")
+        raw = raw if isinstance(raw, list) else [raw]
+        names = tuple(n.strip() for n in raw if isinstance(n, str) and n.strip())
+        if not names:
+            raise InvalidEntry("missing 'name'")
+        return cls(
+            names=names,
+            answers=frozenset(normalize_answer(n) for n in names),
+            image=resolve_media(entry.get("image"), folder),
+            silhouette=resolve_media(entry.get("silhouette"), folder),
+        )
+
+
+class Boss(Record):
+    __slots__ = ("name", "key", "hp", "atk", "defense", "difficulty", "base_rewards", "reward_multiplier", "image")
+
+    name: str
+    key: str  # casefolded name for lookups
+    hp: int
+    atk: int
+    defense: int
+    difficulty: int
+    base_rewards: int
+    reward_multiplier: float
+    image: typing.Optional[str]
+
+    @classmethod
+    def from_dict(cls, entry: dict, folder: typing.Optional[str] = MONSTER_IMAGE_FOLDER) -> "Boss":
+        name = _text(entry, "name")
+        hp = _number(entry, "hp", 1000)
+        if hp <= 0:
+            raise InvalidEntry("'hp' must be positive")
+        return cls(
+            name=name,
+            key=name.casefold(),
+            hp=hp,
+            atk=_number(entry, "atk", 200),
+            defense=_number(entry, "def", 50),
+            difficulty=_number(entry, "difficulty", 1),
+            base_rewards=_number(entry, "base_rewards", 0),
+            reward_multiplier=_number(entry, "reward_multiplier", 1.0, float),
+            image=resolve_media(entry.get("image"), folder),
+        )
+
+
+class Question(Record):
+    __slots__ = ("question", "answer", "answer_key", "category", "difficulty")
+
+    question: str
+    answer: str  # as shown to players
+    answer_key: str  # normalized for comparison
+    category: typing.Optional[str]  # casefolded tags; None when untagged
+    difficulty: typing.Optional[str]
+
+    @classmethod
+    def from_dict(cls, entry: dict) -> "Question":
+        answer = _text(entry, "answer")
+        return cls(
+            question=_text(entry, "question"),
+            answer=answer,
+            answer_key=normalize_answer(answer),
+            category=_tag(entry, "category"),
+            difficulty=_tag(entry, "difficulty"),
+        )
+
+
+def _load(path: str, parse: typing.Callable[[dict], Record], kind: str) -> tuple:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json_load(f)
+    except (OSError, JSONDecodeError) as e:
+        log.error("catalog unreadable", extra={"catalog": kind, "path": path, "error": str(e)})
+        return ()
+    if not isinstance(raw, list):
+        log.error("catalog is not a list", extra={"catalog": kind, "path": path})
+        return ()
+
+    records = []
+    for index, entry in enumerate(raw):
+        try:
+            if not isinstance(entry, dict):
+                raise InvalidEntry("entry is not an object")
+            records.append(parse(entry))
+        except InvalidEntry as e:
+            log.warning("skipped catalog entry", extra={"catalog": kind, "path": path, "index": index, "error": str(e)})
+    log.info("catalog loaded", extra={"catalog": kind, "path": path, "records": len(records), "skipped": len(raw) - len(records)})
+    return tuple(records)
+
+
+def _packed(kind: str, path: str):
+    # Imported here: datapack builds on the records defined in this module
+    from utils.datapack import open_catalog
+
+    return open_catalog(kind, path)
+
+
+def column(records: typing.Sequence[Record], field: str) -> list:
+    """`field` of every record, in order; a packed catalog reads it without decoding the records."""
+    if hasattr(records, "column"):
+        return records.column(field)
+    return [getattr(record, field) for record in records]
+
+
+# Each loader prefers the compiled data pack (see utils/datapack.py) when it is
+# up to date with the JSON source, and parses the JSON otherwise.
+def load_monsters(path: str = MONSTER_DATA_FILE) -> typing.Sequence[Monster]:
+    return _packed("monsters", path) or _load(path, Monster.from_dict, "monsters")
+
+
+def load_bosses(path: str = BOSS_FILE) -> typing.Sequence[Boss]:
+    return _packed("bosses", path) or _load(path, Boss.from_dict, "bosses")
+
+
+def load_questions(path: str = QUESTION_FILE) -> typing.Sequence[Question]:
+    return _packed("questions", path) or _load(path, Question.from_dict, "questions")
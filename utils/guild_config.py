@@ -0,0 +1,112 @@
+# guild_config.py
+# Per-guild settings (moderator role, game channels) loaded from a JSON store.
+# The env values in config.py are only used as defaults for guilds that have
+# not been configured yet.
+
+import logging
+import typing
+
+from config import MOD_ID, GROUP_ID, CHANNEL_ID, GUILD_CONFIG_FILE
+from utils.jsonstore import JsonFile
+from utils.speedups import JSONDecodeError, json_load
+from utils.tracing import traced
+
+log = logging.getLogger(__name__)
+
+
+class GuildSettings:
+    __slots__ = ("mod_role_id", "group_role_id", "channel_ids")
+
+    def __init__(
+        self,
+        mod_role_id: typing.Optional[int] = None,
+        group_role_id: typing.Optional[int] = None,
+        channel_ids: typing.Iterable[int] = (),
+    ):
+        self.mod_role_id = mod_role_id
+        self.group_role_id = group_role_id
+        self.channel_ids = set(channel_ids)
+
+    @classmethod
+    def defaults(cls) -> "GuildSettings":
+        return cls(
+            mod_role_id=MOD_ID,
+            group_role_id=GROUP_ID,
+            channel_ids=[CHANNEL_ID] if CHANNEL_ID else [],
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GuildSettings":
+        return cls(
+            mod_role_id=data.get("mod_role_id"),
+            group_role_id=data.get("group_role_id"),
+            channel_ids=data.get("channel_ids", []),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "mod_role_id": self.mod_role_id,
+            "group_role_id": self.group_role_id,
+            "channel_ids": sorted(self.channel_ids),
+        }
+
+
+class GuildConfigStore:
+    def __init__(self, path: str = GUILD_CONFIG_FILE):
+        self.path = path
+        self.file = JsonFile(path)
+        self.guilds: dict[int, GuildSettings] = {}
+        self._defaults = GuildSettings.defaults()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json_load(f)
+        except FileNotFoundError:
+            raw = {}
+        except JSONDecodeError as e:
+            log.error("guild config unreadable", extra={"path": self.path, "error": str(e)})
+            raw = {}
+        self.guilds = {int(gid): GuildSettings.from_dict(data) for gid, data in raw.items()}
+
+    def to_dict(self) -> dict:
+        return {str(gid): s.to_dict() for gid, s in self.guilds.items()}
+
+    @traced("data")
+    def save(self):
+        """Write the settings in the background (see utils/jsonstore.py)."""
+        self.file.save(self.to_dict())
+
+    def get(self, guild_id: typing.Optional[int]) -> GuildSettings:
+        return self.guilds.get(guild_id, self._defaults)
+
+    def edit(self, guild_id: int) -> GuildSettings:
+        """Settings for a guild, copied from the defaults on first edit. Call save() afterwards."""
+        if guild_id not in self.guilds:
+            d = self._defaults
+            self.guilds[guild_id] = GuildSettings(d.mod_role_id, d.group_role_id, d.channel_ids)
+        return self.guilds[guild_id]
+
+    # ---------- Checks used by the game cogs ----------
+    def is_game_channel(self, channel) -> bool:
+        guild = getattr(channel, "guild", None)
+        if guild is None:
+            return False
+        return channel.id in self.get(guild.id).channel_ids
+
+    def is_moderator(self, member) -> bool:
+        guild = getattr(member, "guild", None)
+        if guild is None:
+            return False
+        role_id = self.get(guild.id).mod_role_id
+        return role_id is not None and any(r.id == role_id for r in member.roles)
+
+
+def get_guild_config(bot) -> GuildConfigStore:
+    """One store shared by every cog on the bot."""
+    store = getattr(bot, "guild_config", None)
+    if store is None:
+        store = GuildConfigStore()
+        bot.guild_config = store
+    return store
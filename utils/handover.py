@@ -0,0 +1,301 @@
+# handover.py
+# Zero-downtime deploys. On SIGUSR2 (or !handover), the running process
+# stops accepting new games and waits until every live game reaches a point
+# it can be resumed from: waiting for answers, clicks or the next bingo call.
+# It then writes the games, their deadlines and its gateway session to a
+# handoff file, and exits without ending the session. The next process reads
+# the file at startup and rebuilds its guild cache over REST instead of
+# re-identifying and chunking members. It RESUMEs the gateway session, so
+# events sent in between are replayed, and each game continues where it was.
+#
+# Games opt in with register(): `export` turns a session into JSON-able
+# state (None: not at a resumable point yet), and `resume` rebuilds it.
+# Once the file is written the old process is frozen: every timer is
+# cancelled and gateway events are no longer parsed, so nothing the new
+# process resumes is also played out here while the client closes.
+#
+# Carrying the session over relies on discord.py internals (checked by
+# missing_internals(); written against 2.7): the gateway connect classmethod,
+# the state's parser table and guild cache, and the client's ready event.
+
+import asyncio
+import logging
+import os
+import time
+import typing
+
+import discord
+import yarl
+from discord.ext import commands
+from discord.gateway import DiscordWebSocket
+
+from config import HANDOVER_FILE
+from utils.sessions import GameSession, SessionManager
+from utils.speedups import JSONDecodeError, json_dump, json_load
+from utils.timers import get_scheduler
+
+log = logging.getLogger(__name__)
+
+HANDOVER_WAIT = 120  # seconds for games to reach a resumable point; longer than any join window
+HANDOVER_MAX_AGE = 90  # seconds; older handoff files are ignored (the gateway session and deadlines are stale)
+CHECKPOINT_POLL = 0.5
+RESUMABLE_CLOSE = 4000  # any close code but 1000/1001 keeps the gateway session resumable
+
+
+class NotResumable(Exception):
+    """A session that can't be carried over (e.g. a raid simulation); it is dropped."""
+
+
+def missing_internals(bot: commands.Bot) -> list[str]:
+    """discord.py internals the handover uses that this version doesn't have."""
+    state = bot._connection
+    checks = {
+        "DiscordWebSocket.from_client": isinstance(DiscordWebSocket.__dict__.get("from_client"), classmethod),
+        "ConnectionState.parsers": isinstance(getattr(state, "parsers", None), dict),
+        "ConnectionState._add_guild_from_data": callable(getattr(state, "_add_guild_from_data", None)),
+        "Client._ready": hasattr(bot, "_ready"),  # an asyncio.Event once the client is set up
+    }
+    return [name for name, present in checks.items() if not present]
+
+
+class _Game:
+    __slots__ = ("sessions", "export", "resume", "starts")
+
+    def __init__(self, sessions, export, resume, starts):
+        self.sessions = sessions
+        self.export = export
+        self.resume = resume
+        self.starts = starts
+
+
+# ---------- Helpers for game state ----------
+def deadline_in(seconds: float) -> float:
+    """Wall-clock form of a loop deadline; loop clocks don't carry across processes."""
+    return time.time() + max(0.0, seconds)
+
+
+def seconds_until(wall_time: float) -> float:
+    return max(0.0, wall_time - time.time())
+
+
+def saved_view(view: discord.ui.View, message_id: int) -> dict:
+    """Enough to reattach the same buttons in the next process: the message and its custom ids."""
+    return {"message_id": message_id, "custom_ids": [item.custom_id for item in view.children]}
+
+
+def restore_view(bot: commands.Bot, channel, view: discord.ui.View, saved: dict) -> discord.PartialMessage:
+    """
+    Give a freshly built view (timeout=None) the saved custom ids and listen
+    on the old message again. Returns the message, for closing the view later.
+    """
+    for item, custom_id in zip(view.children, saved["custom_ids"]):
+        item.custom_id = custom_id
+    bot.add_view(view, message_id=saved["message_id"])
+    return channel.get_partial_message(saved["message_id"])
+
+
+class Handover:
+    def __init__(self, bot: commands.Bot, path: str = HANDOVER_FILE):
+        self.bot = bot
+        self.path = path
+        self.games: dict[str, _Game] = {}
+        self.draining = False
+        self.incoming: typing.Optional[dict] = None  # state handed to this process, until resumed
+        self._starts: set[str] = set()
+
+    def register(
+        self,
+        game: str,
+        sessions: SessionManager,
+        export: typing.Callable[[GameSession], typing.Optional[dict]],
+        resume: typing.Callable[[dict], typing.Awaitable[None]],
+        starts: typing.Iterable[str] = (),
+    ):
+        """`starts` names the commands that start this game; they are refused while handing over."""
+        self.games[game] = _Game(sessions, export, resume, tuple(starts))
+        self._starts.update(starts)
+
+    # ---------- Outgoing ----------
+    async def _refuse_new_games(self, ctx: commands.Context) -> bool:
+        if not self.draining or ctx.command is None or ctx.command.qualified_name not in self._starts:
+            return True
+        await ctx.send("♻️ The bot is restarting for an update. New games can start again in a minute.", ephemeral=True)
+        return False
+
+    def _export(self) -> tuple[dict[str, list[dict]], int]:
+        """({game: [session state]}, sessions not at a resumable point yet). Synchronous, so one consistent snapshot."""
+        exported: dict[str, list[dict]] = {}
+        waiting = 0
+        for name, game in self.games.items():
+            for session in game.sessions:
+                try:
+                    state = game.export(session)
+                except NotResumable as e:
+                    log.info("session not handed over", extra={"game": name, "session": session.id, "reason": str(e)})
+                    continue
+                if state is None:
+                    waiting += 1
+                    continue
+                exported.setdefault(name, []).append(state)
+        return exported, waiting
+
+    def _gateway(self) -> typing.Optional[dict]:
+        ws = self.bot.ws
+        if ws is None or not ws.session_id:
+            return None
+        return {
+            "session_id": ws.session_id,
+            "sequence": ws.sequence,
+            "resume_url": str(ws.gateway),
+            "guild_ids": [guild.id for guild in self.bot.guilds],
+        }
+
+    async def hand_over(self):
+        """Drain, write the handoff file and close without ending the gateway session."""
+        if self.draining:
+            return
+        missing = missing_internals(self.bot)
+        if missing:
+            # keep serving: exiting now would end every live game
+            log.error("handover unsupported by this discord.py; not handing over", extra={"missing": missing, "discord_py": discord.__version__})
+            return
+        self.draining = True
+        self.bot.add_check(self._refuse_new_games)
+        log.info("handover started", extra={"sessions": sum(len(g.sessions) for g in self.games.values())})
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + HANDOVER_WAIT
+        while self._export()[1] and loop.time() < deadline:
+            await asyncio.sleep(CHECKPOINT_POLL)
+
+        # No await from here until the file is written: the snapshot and the
+        # gateway sequence it is resumed from must match
+        games, waiting = self._export()
+        if waiting:
+            log.warning("sessions dropped at handover; not at a resumable point in time", extra={"sessions": waiting})
+        state = {"written_at": time.time(), "gateway": self._gateway(), "games": games}
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json_dump(state, f)
+        os.replace(tmp_path, self.path)
+        self._freeze()
+        log.info("handover written", extra={"path": self.path, "games": {name: len(s) for name, s in games.items()}})
+
+        # Client.close() would close the socket with 1000, which ends the session
+        ws = self.bot.ws
+        if ws is not None:
+            close = ws.close
+            ws.close = lambda code=RESUMABLE_CLOSE: close(code=RESUMABLE_CLOSE)
+        await self.bot.close()
+
+    def _freeze(self):
+        """
+        Stop playing the games the file now holds: no timer fires (bingo
+        calls, expiries, raid turns) and no further gateway event reaches a
+        cog or view. The socket itself stays up until close().
+        """
+        get_scheduler(self.bot).close()
+        self.bot._connection.parsers.clear()
+
+    # ---------- Incoming ----------
+    def load(self) -> bool:
+        """Read (and remove) a handoff file left by the previous process. True if there is state to resume."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json_load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, JSONDecodeError) as e:
+            log.error("handoff file unreadable", extra={"path": self.path, "error": str(e)})
+            return False
+        finally:
+            # one shot: a crash while resuming must not resume the same state twice
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        age = time.time() - state.get("written_at", 0)
+        if age > HANDOVER_MAX_AGE:
+            log.warning("handoff file too old; starting fresh", extra={"path": self.path, "age": round(age)})
+            return False
+        self.incoming = state
+        return True
+
+    async def resume(self):
+        """From setup_hook, after login and cog loading: rebuild the cache, arm the RESUME and restart games."""
+        state, self.incoming = self.incoming, None
+        if not state:
+            return
+        gateway = state.get("gateway")
+        missing = missing_internals(self.bot)
+        if gateway and missing:
+            log.error("cannot resume the gateway session; identifying normally", extra={"missing": missing, "discord_py": discord.__version__})
+        elif gateway:
+            try:
+                await self._rebuild_cache(gateway["guild_ids"])
+                self._resume_gateway(gateway)
+            except discord.HTTPException as e:
+                log.error("could not rebuild the guild cache; identifying normally", extra={"error": str(e)})
+
+        for name, sessions in state.get("games", {}).items():
+            game = self.games.get(name)
+            if game is None:
+                log.warning("no game to resume sessions into", extra={"game": name, "sessions": len(sessions)})
+                continue
+            for session_state in sessions:
+                try:
+                    await game.resume(session_state)
+                except Exception:
+                    log.exception("session could not be resumed", extra={"game": name, "channel_id": session_state.get("channel_id")})
+        log.info("handover resumed", extra={"games": {name: len(s) for name, s in state.get("games", {}).items()}})
+
+    async def channel(self, channel_id: int):
+        return self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+
+    async def _rebuild_cache(self, guild_ids: typing.Iterable[int]):
+        """
+        Guilds, roles and channels over REST, in place of the GUILD_CREATEs a
+        resumed session doesn't get. Members arrive with the events that need them.
+        """
+        http = self.bot.http
+        for guild_id in guild_ids:
+            data = await http.get_guild(guild_id)
+            data["channels"] = await http.get_all_guild_channels(guild_id)
+            data["members"] = [await http.get_member(guild_id, self.bot.user.id)]
+            self.bot._connection._add_guild_from_data(data)
+
+    def _resume_gateway(self, gateway: dict):
+        """Make the first connection a RESUME of the handed-over session (discord.py re-identifies if it's rejected)."""
+        original = DiscordWebSocket.__dict__["from_client"]
+
+        async def from_client(client, **params):
+            DiscordWebSocket.from_client = original  # first connection only
+            if params.get("initial"):
+                params.update(
+                    session=gateway["session_id"],
+                    sequence=gateway["sequence"],
+                    gateway=yarl.URL(gateway["resume_url"]),
+                    resume=True,
+                )
+            return await original.__get__(None, DiscordWebSocket)(client, **params)
+
+        DiscordWebSocket.from_client = from_client
+        self.bot.add_listener(self._on_resumed, "on_resumed")
+
+    async def _on_resumed(self):
+        # READY never comes on a resumed session; mark the client ready ourselves
+        self.bot.remove_listener(self._on_resumed, "on_resumed")
+        self.bot._ready.set()
+        log.info("gateway session resumed", extra={"guilds": len(self.bot.guilds)})
+
+
+def get_handover(bot) -> Handover:
+    """One coordinator shared by every cog on the bot."""
+    handover = getattr(bot, "handover", None)
+    if handover is None:
+        handover = Handover(bot)
+        bot.handover = handover
+    return handover
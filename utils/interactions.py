@@ -0,0 +1,87 @@
+# interactions.py
+# Helpers that let game commands run as slash commands as well as prefix
+# commands, so the bot can work without the message_content intent.
+
+import typing
+import discord
+
+ANSWER_MAX_LENGTH = 100
+ANSWER_VIEW_TIMEOUT = 600  # backstop; games close their answer buttons when a round ends
+
+
+async def refuse_quietly(ctx, message: str = "⚠️ Games aren't enabled in this channel."):
+    """
+    Prefix commands used in the wrong place are ignored silently; a slash
+    command has to answer, so it gets an ephemeral note instead.
+    """
+    if ctx.interaction is not None:
+        await ctx.send(message, ephemeral=True)
+
+
+class Answer:
+    """
+    One guess for a running game, typed in chat or submitted through the
+    answer modal. Games receive both kinds through the "game_answer" event.
+    """
+
+    __slots__ = ("game", "channel", "author", "content", "id", "interaction")
+
+    def __init__(self, game, channel, author, content, id, interaction=None):
+        self.game = game
+        self.channel = channel
+        self.author = author
+        self.content = content
+        self.id = id  # message or interaction snowflake; both encode the send time
+        self.interaction = interaction
+
+    @classmethod
+    def from_message(cls, message: discord.Message, game: str) -> "Answer":
+        return cls(game, message.channel, message.author, message.content, message.id)
+
+    async def reply(self, content: typing.Optional[str] = None, **kwargs):
+        """Feedback for this player only: ephemeral for modal answers, in channel for chat ones."""
+        if self.interaction is not None:
+            await self.interaction.followup.send(content, ephemeral=True, **kwargs)
+        else:
+            await self.channel.send(content, **kwargs)
+
+
+class AnswerModal(discord.ui.Modal):
+    answer = discord.ui.TextInput(label="Your answer", max_length=ANSWER_MAX_LENGTH)
+
+    def __init__(self, game: str, title: str):
+        super().__init__(title=title)
+        self.game = game
+
+    async def on_submit(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+        interaction.client.dispatch(
+            "game_answer",
+            Answer(self.game, interaction.channel, interaction.user, self.answer.value, interaction.id, interaction),
+        )
+
+
+class AnswerView(discord.ui.View):
+    """A single "Answer" button that opens the answer modal for `game`."""
+
+    def __init__(self, game: str, title: str, timeout: float = ANSWER_VIEW_TIMEOUT):
+        super().__init__(timeout=timeout)
+        self.game = game
+        self.title = title
+        self.message: typing.Optional[discord.Message] = None
+
+    @discord.ui.button(label="Answer", emoji="✏️", style=discord.ButtonStyle.primary)
+    async def answer_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(AnswerModal(self.game, self.title))
+
+    async def close(self):
+        """Stop taking answers and remove the button from the message."""
+        self.stop()
+        if self.message is not None:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
+
+    async def on_timeout(self):
+        await self.close()
@@ -0,0 +1,62 @@
+# jsonstore.py
+# Write-behind for the small JSON files the bot rewrites as it runs (guild
+# config, quiz rotations). save() takes the data on the event loop, where it
+# is consistent, and a background task writes it atomically on a worker
+# thread. Saves that arrive while a write is running are coalesced into one
+# more write of the latest data. Outside a running loop (scripts,
+# benchmarks) save() writes straight away.
+
+import asyncio
+import logging
+import os
+import typing
+
+from utils.speedups import json_dump
+
+log = logging.getLogger(__name__)
+
+
+class JsonFile:
+    def __init__(self, path: str, indent: bool = True):
+        self.path = path
+        self.indent = indent
+        self._pending: typing.Optional[dict] = None  # newest data not yet handed to the writer
+        self._writer: typing.Optional[asyncio.Task] = None
+
+    def write(self, data: dict):
+        """Replace the file with `data`, blocking; readers never see a partial file."""
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json_dump(data, f, indent=self.indent)
+        os.replace(tmp_path, self.path)
+
+    def save(self, data: dict):
+        """Write `data` soon, off the loop; errors are logged. The caller must not mutate it afterwards."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                self.write(data)
+            except OSError as e:
+                log.error("could not save file", extra={"path": self.path, "error": str(e)})
+            return
+        self._pending = data
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while self._pending is not None:
+            data, self._pending = self._pending, None
+            try:
+                await loop.run_in_executor(None, self.write, data)
+            except OSError as e:
+                log.error("could not save file", extra={"path": self.path, "error": str(e)})
+
+    async def flush(self):
+        """Wait until every save so far is on disk; call before shutting down."""
+        if self._writer is not None and not self._writer.done():
+            await asyncio.shield(self._writer)
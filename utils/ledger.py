@@ -0,0 +1,234 @@
+# ledger.py
+# Persistent record of game winners and the rewards they are owed.
+# Games enqueue writes without awaiting; a background task flushes them in
+# batches to SQLite (WAL mode) on a single worker thread, so the event loop
+# never blocks on disk. A batch that fails to write goes back on the queue
+# and is retried with backoff; close() drains the queue before returning.
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+
+from config import DATA_DIR
+from utils.tracing import span
+
+log = logging.getLogger(__name__)
+
+LEDGER_FILE = os.path.join(DATA_DIR, "ledger.sqlite3")
+FLUSH_INTERVAL = 2.0  # seconds to coalesce writes before a flush
+MAX_BATCH = 500  # flush early once this many writes are queued
+RETRY_DELAY = 1.0  # seconds before retrying a failed flush; doubles each time
+RETRY_MAX = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER,
+    channel_id INTEGER,
+    game TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_leaderboard ON results (guild_id, game, user_id);
+
+CREATE TABLE IF NOT EXISTS rewards (
+    id INTEGER PRIMARY KEY,
+    guild_id INTEGER,
+    channel_id INTEGER,
+    game TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    fulfilled_at REAL,
+    fulfilled_by INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_rewards_owed ON rewards (guild_id, user_id) WHERE fulfilled_at IS NULL;
+"""
+
+INSERT_RESULT = "INSERT INTO results (guild_id, channel_id, game, user_id, created_at) VALUES (?, ?, ?, ?, ?)"
+INSERT_REWARD = (
+    "INSERT INTO rewards (guild_id, channel_id, game, user_id, item, amount, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class Ledger:
+    def __init__(self, path: str = LEDGER_FILE):
+        self.path = path
+        self.pending: list[tuple[str, tuple]] = []  # (sql, params) waiting for the writer
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledger")
+        self._conn: typing.Optional[sqlite3.Connection] = None
+        self._wake: typing.Optional[asyncio.Event] = None  # writes are queued
+        self._full: typing.Optional[asyncio.Event] = None  # flush now: batch full, or closing
+        self._writer: typing.Optional[asyncio.Task] = None
+        self._closing = False
+
+    # ---------- Worker thread ----------
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _write_batch(self, batch: list[tuple[str, tuple]]):
+        conn = self._connection()
+        grouped: dict[str, list[tuple]] = {}
+        for sql, params in batch:
+            grouped.setdefault(sql, []).append(params)
+        with conn:
+            for sql, rows in grouped.items():
+                conn.executemany(sql, rows)
+
+    def _query(self, sql: str, params: tuple) -> list[tuple]:
+        return self._connection().execute(sql, params).fetchall()
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        conn = self._connection()
+        with conn:
+            return conn.execute(sql, params).rowcount
+
+    async def _run(self, fn, *args):
+        with span(f"ledger {fn.__name__}", "data"):
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # ---------- Write-behind queue ----------
+    def _enqueue(self, sql: str, params: tuple):
+        self.pending.append((sql, params))
+        if self._writer is None or self._writer.done():
+            self._wake = asyncio.Event()
+            self._full = asyncio.Event()
+            self._writer = asyncio.create_task(self._write_loop())
+        self._wake.set()
+        if len(self.pending) >= MAX_BATCH:
+            self._full.set()
+
+    async def _wait_full(self, timeout: float):
+        """Sleep up to `timeout`, waking early when the batch fills or the ledger closes."""
+        try:
+            await asyncio.wait_for(self._full.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _write_loop(self):
+        retry = RETRY_DELAY
+        while True:
+            if not self._closing:
+                await self._wake.wait()
+                self._wake.clear()
+                await self._wait_full(FLUSH_INTERVAL)
+                self._full.clear()
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                if self._closing:
+                    log.error("ledger write failed on close; rows not saved", exc_info=e, extra={"rows": len(self.pending)})
+                    return
+                log.error("ledger write failed; retrying", exc_info=e, extra={"rows": len(self.pending), "retry_in": retry})
+                await self._wait_full(retry)
+                retry = min(retry * 2, RETRY_MAX)
+                self._wake.set()
+                continue
+            retry = RETRY_DELAY
+            if self._closing and not self.pending:
+                return
+
+    async def flush(self):
+        """Write everything queued so far. On a database error the batch is put back and the error raised."""
+        batch, self.pending = self.pending, []
+        if batch:
+            try:
+                await self._run(self._write_batch, batch)
+            except sqlite3.Error:
+                self.pending[:0] = batch  # the transaction rolled back; keep queue order
+                raise
+
+    async def close(self):
+        """Write everything still queued (waiting for a flush in progress), then close the database."""
+        self._closing = True
+        if self._writer is not None and not self._writer.done():
+            self._wake.set()
+            self._full.set()
+            await asyncio.shield(self._writer)
+        elif self.pending:
+            try:
+                await self.flush()
+            except sqlite3.Error as e:
+                log.error("ledger write failed on close; rows not saved", exc_info=e, extra={"rows": len(self.pending)})
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+    def record_win(
+        self,
+        session,
+        game: str,
+        user_id: int,
+        rewards: typing.Optional[dict[str, int]] = None,
+    ):
+        """Queue a win plus any rewards it earns (item name -> amount). Never blocks."""
+        now = time.time()
+        self._enqueue(INSERT_RESULT, (session.guild_id, session.channel_id, game, user_id, now))
+        for item, amount in (rewards or {}).items():
+            if amount > 0:
+                self._enqueue(
+                    INSERT_REWARD,
+                    (session.guild_id, session.channel_id, game, user_id, item, amount, now),
+                )
+
+    # ---------- Queries ----------
+    async def leaderboard(
+        self, guild_id: int, game: typing.Optional[str] = None, limit: int = 10
+    ) -> list[tuple[int, int]]:
+        """[(user_id, wins)] for the guild, optionally for one game."""
+        await self.flush()
+        if game:
+            sql = (
+                "SELECT user_id, COUNT(*) AS wins FROM results WHERE guild_id = ? AND game = ? "
+                "GROUP BY user_id ORDER BY wins DESC LIMIT ?"
+            )
+            return await self._run(self._query, sql, (guild_id, game, limit))
+        sql = (
+            "SELECT user_id, COUNT(*) AS wins FROM results WHERE guild_id = ? "
+            "GROUP BY user_id ORDER BY wins DESC LIMIT ?"
+        )
+        return await self._run(self._query, sql, (guild_id, limit))
+
+    async def rewards_owed(self, guild_id: int) -> list[tuple[int, str, int]]:
+        """[(user_id, item, amount)] of unfulfilled rewards for the guild."""
+        await self.flush()
+        sql = (
+            "SELECT user_id, item, SUM(amount) FROM rewards "
+            "WHERE guild_id = ? AND fulfilled_at IS NULL "
+            "GROUP BY user_id, item ORDER BY user_id, item"
+        )
+        return await self._run(self._query, sql, (guild_id,))
+
+    async def mark_fulfilled(self, guild_id: int, user_id: int, fulfilled_by: int) -> int:
+        """Mark every owed reward of a user as handed out; returns rows updated."""
+        await self.flush()
+        sql = (
+            "UPDATE rewards SET fulfilled_at = ?, fulfilled_by = ? "
+            "WHERE guild_id = ? AND user_id = ? AND fulfilled_at IS NULL"
+        )
+        return await self._run(self._execute, sql, (time.time(), fulfilled_by, guild_id, user_id))
+
+
+def get_ledger(bot) -> Ledger:
+    """One ledger shared by every cog on the bot."""
+    ledger = getattr(bot, "ledger", None)
+    if ledger is None:
+        ledger = Ledger()
+        bot.ledger = ledger
+    return ledger
@@ -0,0 +1,132 @@
+# log.py
+# Structured, non-blocking logging. Records are queued on the event loop and
+# written as one JSON object per line by a background thread, so a slow
+# stdout pipe or log file never stalls the gateway.
+
+import atexit
+import copy
+import datetime
+import logging
+import logging.handlers
+import queue
+import sys
+import typing
+
+from config import LOG_FILE, LOG_LEVEL
+from utils.speedups import json_dumps
+
+QUEUE_SIZE = 10000  # records buffered for the writer thread before new ones are dropped
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: typing.Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, any `extra` fields, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json_dumps(data, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """
+    Keeps 1 in `sample` records for high-frequency events logged with
+    extra={"sample": N}; the count is kept per logger and message.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.counts: dict[tuple[str, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = getattr(record, "sample", None)
+        if not every or every <= 1:
+            return True
+        key = (record.name, record.msg)
+        seen = self.counts.get(key, 0)
+        self.counts[key] = seen + 1
+        return seen % every == 0
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Never waits on a full queue; drops the record and reports the drops later."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep the record's fields for the JSON formatter; only render what
+        # can't cross threads safely (message args and exception info).
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        if self.dropped:
+            record.dropped_before = self.dropped
+            self.dropped = 0
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level: str = LOG_LEVEL, path: typing.Optional[str] = LOG_FILE):
+    """Route every logger (ours and discord.py's) through the queue. Safe to call twice."""
+    global _listener
+    if _listener is not None:
+        return
+
+    target = logging.FileHandler(path, encoding="utf-8") if path else logging.StreamHandler(sys.stdout)
+    target.setFormatter(JsonFormatter())
+
+    log_queue = queue.Queue(QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(SampleFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, target, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def fields(session=None, game: typing.Optional[str] = None, **extra) -> dict:
+    """`extra` fields tying a record to a game session."""
+    data = {}
+    if game:
+        data["game"] = game
+    if session is not None:
+        data["guild_id"] = session.guild_id
+        data["channel_id"] = session.channel_id
+        data["session_id"] = session.id
+    data.update(extra)
+    return data
@@ -0,0 +1,194 @@
+# memwatch.py
+# Slow leak detection for a bot that runs for weeks. Every few minutes it
+# records the size of each container the cogs and bot-level services hold,
+# the views discord.py still routes clicks to, and the live asyncio tasks by
+# coroutine. With BOT_TRACEMALLOC it also takes a tracemalloc snapshot.
+# Samples taken while no game is running are the ones compared: the state
+# left behind after a game should return to the same size every time, so a
+# size that keeps rising between games, with games completed in between,
+# gets flagged.
+
+import asyncio
+import collections
+import time
+import tracemalloc
+import typing
+
+from utils.sessions import SessionManager
+from utils.timers import get_scheduler
+
+SAMPLE_INTERVAL = 300  # seconds between samples
+HISTORY = 288  # samples kept (a day at the default interval)
+GROWTH_WINDOW = 4  # consecutive idle samples that must keep rising to flag a leak
+TRACED_GROWTH = 0.05  # traced bytes must also rise this much across the window; caches warm up in small steps
+TRACEMALLOC_FRAMES = 5  # stack depth tracemalloc records per allocation
+SCAN_DEPTH = 2  # levels of our own objects searched for containers below each cog or service
+OWN_MODULES = ("cogs.", "utils.")
+CONTAINERS = (dict, list, set, collections.deque)
+
+
+class Sample:
+    __slots__ = ("at", "idle", "games", "sizes", "views", "tasks", "traced", "snapshot")
+
+    def __init__(self, at, idle, games, sizes, views, tasks, traced, snapshot):
+        self.at = at  # wall time
+        self.idle = idle  # no game running anywhere
+        self.games = games  # games completed so far
+        self.sizes: dict[str, int] = sizes  # "Cog.attr.attr" -> len
+        self.views: collections.Counter = views  # view class -> live instances
+        self.tasks: collections.Counter = tasks  # coroutine -> live tasks
+        self.traced = traced  # bytes tracemalloc sees allocated, or None
+        self.snapshot: typing.Optional[tracemalloc.Snapshot] = snapshot
+
+    def metrics(self) -> dict[str, int]:
+        """Everything a leak shows up in, flattened for comparing samples."""
+        metrics = dict(self.sizes)
+        metrics.update((f"view {name}", n) for name, n in self.views.items())
+        metrics.update((f"task {name}", n) for name, n in self.tasks.items())
+        if self.traced is not None:
+            metrics["traced bytes"] = self.traced
+        return metrics
+
+
+class Growth:
+    __slots__ = ("metric", "values", "games")
+
+    def __init__(self, metric: str, values: list[int], games: int):
+        self.metric = metric
+        self.values = values
+        self.games = games  # games completed across the window
+
+
+def _own(value) -> bool:
+    return type(value).__module__.startswith(OWN_MODULES)
+
+
+def _scan(obj, prefix: str, depth: int, sizes: dict[str, int], seen: set[int]):
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    try:
+        attrs = vars(obj)
+    except TypeError:
+        # slotted records
+        attrs = {name: getattr(obj, name) for name in getattr(type(obj), "__slots__", ()) if hasattr(obj, name)}
+    for name, value in attrs.items():
+        path = f"{prefix}.{name}"
+        if isinstance(value, SessionManager):
+            sizes[path] = len(value)
+            # live games only matter while running; scanned so a stuck one stands out
+            for session in value:
+                _scan(session, f"{path}[{session.channel_id}]", depth - 1, sizes, seen)
+        elif isinstance(value, CONTAINERS):
+            sizes[path] = len(value)
+        elif depth > 0 and _own(value):
+            _scan(value, path, depth - 1, sizes, seen)
+
+
+class MemoryWatch:
+    def __init__(self, bot, interval: float = SAMPLE_INTERVAL):
+        self.bot = bot
+        self.interval = interval
+        self.samples: collections.deque[Sample] = collections.deque(maxlen=HISTORY)
+        self.baseline: typing.Optional[tracemalloc.Snapshot] = None  # first idle snapshot
+        self._timer = None
+
+    @property
+    def running(self) -> bool:
+        return self._timer is not None
+
+    def start(self, trace_allocations: bool = False):
+        if self.running:
+            return
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._timer = get_scheduler(self.bot).call_every(self.interval, self.sample, name="memory sample")
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def reset(self):
+        self.samples.clear()
+        self.baseline = None
+
+    # ---------- Sampling ----------
+    def _managers(self) -> list[SessionManager]:
+        return [v for cog in self.bot.cogs.values() for v in vars(cog).values() if isinstance(v, SessionManager)]
+
+    def _views(self) -> collections.Counter:
+        store = self.bot._connection._view_store
+        views = {id(item.view): item.view for items in store._views.values() for item in items.values() if item.view}
+        views.update((id(modal), modal) for modal in store._modals.values())
+        return collections.Counter(type(view).__name__ for view in views.values())
+
+    @staticmethod
+    def _tasks() -> collections.Counter:
+        return collections.Counter(
+            getattr(task.get_coro(), "__qualname__", type(task.get_coro()).__name__) for task in asyncio.all_tasks()
+        )
+
+    def sample(self) -> Sample:
+        sizes: dict[str, int] = {}
+        seen: set[int] = {id(self)}  # our own history grows by design
+        for name, cog in self.bot.cogs.items():
+            _scan(cog, name, SCAN_DEPTH, sizes, seen)
+        for name, service in vars(self.bot).items():
+            if _own(service):
+                _scan(service, f"bot.{name}", SCAN_DEPTH, sizes, seen)
+
+        managers = self._managers()
+        idle = not any(len(m) for m in managers)
+        traced = snapshot = None
+        if tracemalloc.is_tracing():
+            traced = tracemalloc.get_traced_memory()[0]
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),  # the samples we keep
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            if idle and self.baseline is None:
+                self.baseline = snapshot
+        sample = Sample(
+            time.time(), idle, sum(m.completed for m in managers), sizes, self._views(), self._tasks(), traced, snapshot,
+        )
+        # only the latest snapshot is needed for comparisons; older ones are large
+        if self.samples:
+            self.samples[-1].snapshot = None
+        self.samples.append(sample)
+        return sample
+
+    # ---------- Analysis ----------
+    def growth(self, window: int = GROWTH_WINDOW) -> list[Growth]:
+        """Metrics that rose at every idle sample in the last `window`, with games completed in between."""
+        idle = [s for s in self.samples if s.idle][-window:]
+        if len(idle) < window or idle[-1].games == idle[0].games:
+            return []
+        series = [s.metrics() for s in idle]
+        growing = []
+        for metric in series[-1]:
+            values = [m.get(metric, 0) for m in series]
+            if metric == "traced bytes" and values[-1] < values[0] * (1 + TRACED_GROWTH):
+                continue
+            if all(a < b for a, b in zip(values, values[1:])):
+                growing.append(Growth(metric, values, idle[-1].games - idle[0].games))
+        # bytes and counts side by side: rank by relative growth
+        return sorted(growing, key=lambda g: (g.values[-1] - g.values[0]) / max(g.values[0], 1), reverse=True)
+
+    def top_allocations(self, limit: int) -> list[tracemalloc.StatisticDiff]:
+        """Source lines whose allocations grew most since the first idle sample (tracemalloc only)."""
+        latest = self.samples[-1].snapshot if self.samples else None
+        if latest is None or self.baseline is None:
+            return []
+        diffs = latest.compare_to(self.baseline, "lineno")
+        return [d for d in diffs if d.size_diff > 0][:limit]
+
+
+def get_memwatch(bot) -> MemoryWatch:
+    """One memory watch per bot; started by the Admin cog."""
+    memwatch = getattr(bot, "memwatch", None)
+    if memwatch is None:
+        memwatch = MemoryWatch(bot)
+        bot.memwatch = memwatch
+    return memwatch
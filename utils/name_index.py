@@ -0,0 +1,79 @@
+# name_index.py
+# Name lookup for catalog records: exact (casefolded) hits from a dict,
+# autocomplete from a prefix trie, and "did you mean" from fuzzy matching.
+# Everything is built once at load from the names alone, so a packed catalog
+# (utils/datapack.py) only decodes the record a lookup returns; exact and
+# prefix lookups cost O(len(query)) no matter how many records there are.
+
+import difflib
+import typing
+
+COMPLETION_LIMIT = 25  # Discord shows at most 25 autocomplete choices
+SUGGESTION_LIMIT = 3
+FUZZY_CUTOFF = 0.6  # difflib similarity needed for a suggestion
+
+T = typing.TypeVar("T")
+
+
+class _Node:
+    __slots__ = ("children", "matches")
+
+    def __init__(self):
+        self.children: dict[str, "_Node"] = {}
+        self.matches: list[int] = []  # record numbers completing this prefix, in name order
+
+
+class NameIndex(typing.Generic[T]):
+    def __init__(self, records: typing.Sequence[T], names: typing.Sequence[str]):
+        """`names[i]` is the name of `records[i]` (see gamedata.column)."""
+        self.records = records
+        order = sorted(range(len(names)), key=lambda i: names[i].casefold())
+        self.names = [names[i] for i in order]  # name order; trie matches number into this
+        self.exact: dict[str, int] = {}  # casefolded name -> record number
+        self._display: dict[str, str] = {}
+        self._root = _Node()
+        for number, display in enumerate(self.names):
+            key = display.casefold()
+            self.exact.setdefault(key, order[number])
+            self._display.setdefault(key, display)
+            # every word start is a prefix too, so "flower" completes "Moonlight Flower"
+            starts = {0} | {i + 1 for i, ch in enumerate(key) if ch == " "}
+            for start in sorted(starts):
+                self._insert(key[start:], number)
+        self._keys = list(self.exact)
+
+    def _insert(self, key: str, number: int):
+        node = self._root
+        for ch in key:
+            node = node.children.setdefault(ch, _Node())
+            if len(node.matches) < COMPLETION_LIMIT and (not node.matches or node.matches[-1] != number):
+                node.matches.append(number)
+
+    def get(self, query: str) -> typing.Optional[T]:
+        number = self.exact.get(query.strip().casefold())
+        return None if number is None else self.records[number]
+
+    def complete(self, prefix: str, limit: int = COMPLETION_LIMIT) -> list[str]:
+        """Names starting with `prefix` (or with a word starting with it), in name order."""
+        prefix = prefix.strip().casefold()
+        if not prefix:
+            return self.names[:limit]
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [self.names[n] for n in node.matches[:limit]]
+
+    def suggest(self, query: str, limit: int = SUGGESTION_LIMIT) -> list[str]:
+        """Closest names for a miss: prefix completions first, then fuzzy matches."""
+        suggestions = self.complete(query, limit)
+        if len(suggestions) < limit:
+            for key in difflib.get_close_matches(query.strip().casefold(), self._keys, n=limit, cutoff=FUZZY_CUTOFF):
+                display = self._display[key]
+                if display not in suggestions:
+                    suggestions.append(display)
+        return suggestions[:limit]
+
+    def __len__(self) -> int:
+        return len(self.records)
@@ -0,0 +1,152 @@
+# profiler.py
+# On-demand sampling profiler for the running bot. A helper thread samples the
+# event loop thread's stack every few milliseconds for a fixed time; nothing
+# is hooked into the loop itself, so it is cheap enough to run during a live
+# raid. Each sample stands for the time since the previous one (a busy loop
+# thread holds the GIL and delays the sampler, so plain counts would favour
+# idle time). Samples taken while the loop waits for I/O count as idle;
+# the rest are aggregated per function (self and total) and as collapsed
+# stacks, the "a;b;c value" format flamegraph.pl and speedscope read.
+
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+import types
+import typing
+
+from utils.watchdog import PROJECT_ROOT
+
+PROFILE_INTERVAL = 0.005  # seconds between samples
+MAX_PROFILE_SECONDS = 300
+IDLE_FILES = ("selectors.py", "runners.py")  # the loop waiting for I/O or its next timer (uvloop waits in C, under asyncio.Runner)
+REPORT_ROWS = 25  # functions listed per table in the text report
+
+
+def _code_label(code: types.CodeType) -> str:
+    path = code.co_filename
+    if path.startswith(PROJECT_ROOT):
+        path = os.path.relpath(path, PROJECT_ROOT)
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{code.co_firstlineno} {code.co_name}"
+
+
+def _is_ours(code: types.CodeType) -> bool:
+    return code.co_filename.startswith(PROJECT_ROOT) and "site-packages" not in code.co_filename
+
+
+class Profile:
+    """Samples of one profiling run. Filled by the sampler thread; read once it has stopped."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.samples = 0
+        self.sampled = 0.0  # seconds covered by samples
+        self.idle = 0.0
+        self.self_time: collections.Counter = collections.Counter()  # code -> seconds running it
+        self.total_time: collections.Counter = collections.Counter()  # code -> seconds with it on the stack
+        self.stacks: collections.Counter = collections.Counter()  # root-first tuple of codes -> seconds
+
+    @property
+    def busy(self) -> float:
+        return self.sampled - self.idle
+
+    def share(self, seconds: float) -> float:
+        """Percentage of the sampled time."""
+        return 100 * seconds / self.sampled if self.sampled else 0.0
+
+    def add(self, stack: list[types.CodeType], weight: float):
+        """One sample standing for `weight` seconds; `stack` is leaf first."""
+        self.samples += 1
+        self.sampled += weight
+        if stack[0].co_filename.endswith(IDLE_FILES):
+            self.idle += weight
+            return
+        self.self_time[stack[0]] += weight
+        for code in set(stack):
+            self.total_time[code] += weight
+        self.stacks[tuple(reversed(stack))] += weight
+
+    def hottest(self, limit: int) -> list[tuple[str, float]]:
+        """Functions the loop thread spent the most time in, as (label, seconds)."""
+        return [(_code_label(code), t) for code, t in self.self_time.most_common(limit)]
+
+    def render(self, rows: int = REPORT_ROWS) -> str:
+        lines = [
+            f"Profile started {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at))}",
+            f"{self.duration:.1f}s, {self.samples:,} samples every {self.interval * 1000:g} ms",
+            f"Loop busy: {self.share(self.busy):.1f}% ({self.busy:.2f}s), idle: {self.share(self.idle):.1f}%",
+            "",
+            "Self time (function the loop thread was running):",
+        ]
+        lines += [f"  {self.share(t):5.1f}% {t:8.3f}s  {label}" for label, t in self.hottest(rows)]
+        # asyncio's own frames are under every busy sample; list only bot code here
+        ours = [(code, t) for code, t in self.total_time.most_common() if _is_ours(code)][:rows]
+        lines += ["", "Total time (bot function anywhere on the stack):"]
+        lines += [f"  {self.share(t):5.1f}% {t:8.3f}s  {_code_label(code)}" for code, t in ours]
+        return "\n".join(lines) + "\n"
+
+    def collapsed(self) -> str:
+        """Collapsed stacks weighted in microseconds."""
+        return "".join(
+            ";".join(_code_label(code) for code in stack) + f" {round(t * 1_000_000)}\n"
+            for stack, t in self.stacks.most_common()
+        )
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.current: typing.Optional[Profile] = None
+
+    @property
+    def running(self) -> bool:
+        return self.current is not None
+
+    async def profile(self, seconds: float) -> Profile:
+        """Sample the loop thread for `seconds` (capped at MAX_PROFILE_SECONDS); one run at a time."""
+        if self.running:
+            raise RuntimeError("a profile is already running")
+        profile = self.current = Profile(self.interval)
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=self._sample, args=(profile, threading.get_ident(), stop), name="loop-profiler", daemon=True
+        )
+        started = time.perf_counter()
+        thread.start()
+        try:
+            await asyncio.sleep(min(seconds, MAX_PROFILE_SECONDS))
+        finally:
+            stop.set()
+            thread.join()  # at most one sample away
+            profile.duration = time.perf_counter() - started
+            self.current = None
+        return profile
+
+    # ---------- Sampler thread ----------
+    def _sample(self, profile: Profile, loop_thread: int, stop: threading.Event):
+        last = time.perf_counter()
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(loop_thread)
+            now = time.perf_counter()
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                profile.add(stack, now - last)
+            last = now
+
+
+def get_profiler(bot) -> SamplingProfiler:
+    """One profiler per bot, so two !profile runs can't overlap."""
+    profiler = getattr(bot, "profiler", None)
+    if profiler is None:
+        profiler = SamplingProfiler()
+        bot.profiler = profiler
+    return profiler
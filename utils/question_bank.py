@@ -0,0 +1,175 @@
+# question_bank.py
+# Quiz questions indexed by category and difficulty, dealt from a shuffled
+# rotation so nobody sees a question twice until its pool has been used up.
+# Pools for every filter combination are built once at load from the tags
+# alone, so a packed catalog only decodes the questions that are dealt;
+# dealing k questions costs O(k). Rotation cursors are kept per guild and
+# filter and saved in the background (see utils/jsonstore.py), so they
+# survive restarts.
+
+import logging
+import random
+import typing
+
+from config import QUIZ_ROTATION_FILE
+from utils.gamedata import Question, column
+from utils.jsonstore import JsonFile
+from utils.speedups import JSONDecodeError, json_load
+from utils.tracing import traced
+
+log = logging.getLogger(__name__)
+
+ANY = "*"  # stands for "no filter" in saved pool keys
+
+
+def _pool_key(category: typing.Optional[str], difficulty: typing.Optional[str]) -> str:
+    return f"{category or ANY}/{difficulty or ANY}"
+
+
+class Rotation:
+    """
+    One pass through a pool: a permutation fixed by `seed`, dealt from
+    `cursor`. `deferred` holds questions the cursor passed but couldn't deal
+    (a deal that wrapped around had just used them); they go out first next
+    time. A pool that changed size since the rotation started gets a new one.
+    """
+
+    __slots__ = ("seed", "size", "cursor", "deferred")
+
+    def __init__(self, seed: int, size: int, cursor: int = 0, deferred: typing.Iterable[int] = ()):
+        self.seed = seed
+        self.size = size
+        self.cursor = cursor
+        self.deferred = list(deferred)
+
+    @classmethod
+    def fresh(cls, size: int) -> "Rotation":
+        return cls(random.getrandbits(32), size)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Rotation":
+        return cls(int(data["seed"]), int(data["size"]), int(data["cursor"]), map(int, data.get("deferred", ())))
+
+    def to_dict(self) -> dict:
+        data = {"seed": self.seed, "size": self.size, "cursor": self.cursor}
+        if self.deferred:
+            data["deferred"] = list(self.deferred)
+        return data
+
+
+class QuestionBank:
+    def __init__(self, questions: typing.Sequence[Question], path: str = QUIZ_ROTATION_FILE):
+        self.questions = questions
+        self.path = path
+        self.file = JsonFile(path)
+        # question numbers for each (category, difficulty) filter; None matches anything
+        self.pools: dict[tuple[typing.Optional[str], typing.Optional[str]], list[int]] = {}
+        tags = zip(column(questions, "category"), column(questions, "difficulty"))
+        for number, (category, difficulty) in enumerate(tags):
+            for key in {(None, None), (category, None), (None, difficulty), (category, difficulty)}:
+                self.pools.setdefault(key, []).append(number)
+        self.categories = sorted({c for c, _ in self.pools if c})
+        self.difficulties = sorted({d for _, d in self.pools if d})
+        self.rotations: dict[int, dict[str, Rotation]] = {}
+        self._orders: dict[tuple[str, int], list[int]] = {}  # (pool key, seed) -> dealing order
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    # ---------- Persistence ----------
+    def load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json_load(f)
+            self.rotations = {
+                int(gid): {key: Rotation.from_dict(data) for key, data in pools.items()}
+                for gid, pools in raw.items()
+            }
+        except FileNotFoundError:
+            self.rotations = {}
+        except (JSONDecodeError, KeyError, TypeError, ValueError, AttributeError) as e:
+            log.error("quiz rotation unreadable; starting over", extra={"path": self.path, "error": str(e)})
+            self.rotations = {}
+
+    def to_dict(self) -> dict:
+        return {str(gid): {key: r.to_dict() for key, r in pools.items()} for gid, pools in self.rotations.items()}
+
+    def save(self):
+        """Write the rotations in the background; deal() calls this."""
+        self.file.save(self.to_dict())
+
+    # ---------- Filters ----------
+    def match_tags(self, words: typing.Iterable[typing.Optional[str]]) -> tuple[typing.Optional[str], typing.Optional[str], list[str]]:
+        """
+        Sort free-form filter words into (category, difficulty, unknown words),
+        so "geography hard" and "hard" both work whatever order they come in.
+        """
+        category = difficulty = None
+        unknown = []
+        for word in words:
+            if not word or not word.strip():
+                continue
+            tag = word.strip().casefold()
+            if category is None and tag in self.categories:
+                category = tag
+            elif difficulty is None and tag in self.difficulties:
+                difficulty = tag
+            else:
+                unknown.append(word.strip())
+        return category, difficulty, unknown
+
+    def available(self, category: typing.Optional[str] = None, difficulty: typing.Optional[str] = None) -> int:
+        return len(self.pools.get((category, difficulty), ()))
+
+    # ---------- Dealing ----------
+    def _order(self, key: str, pool: list[int], rotation: Rotation) -> list[int]:
+        order = self._orders.get((key, rotation.seed))
+        if order is None:
+            order = pool[:]
+            random.Random(rotation.seed).shuffle(order)
+            self._orders[(key, rotation.seed)] = order
+        return order
+
+    @traced("data")
+    def deal(
+        self,
+        guild_id: int,
+        count: int,
+        category: typing.Optional[str] = None,
+        difficulty: typing.Optional[str] = None,
+    ) -> list[Question]:
+        """
+        The next `count` questions of the guild's rotation for this filter (fewer
+        if the pool is smaller). When the pool runs out a new shuffle starts,
+        skipping anything already dealt in this call. Saves the cursor.
+        """
+        pool = self.pools.get((category, difficulty))
+        if not pool or count <= 0:
+            return []
+        key = _pool_key(category, difficulty)
+        rotations = self.rotations.setdefault(guild_id, {})
+        rotation = rotations.get(key)
+        if rotation is None or rotation.size != len(pool):
+            rotation = rotations[key] = Rotation.fresh(len(pool))
+        order = self._order(key, pool, rotation)
+
+        want = min(count, len(pool))
+        picked = rotation.deferred[:want]
+        del rotation.deferred[:want]
+        seen = set(picked)
+        while len(picked) < want:
+            if rotation.cursor >= len(order):
+                self._orders.pop((key, rotation.seed), None)
+                rotation = rotations[key] = Rotation.fresh(len(pool))
+                order = self._order(key, pool, rotation)
+            number = order[rotation.cursor]
+            rotation.cursor += 1
+            if number in seen:
+                rotation.deferred.append(number)  # this pass's turn for it; kept for the next deal
+            else:
+                seen.add(number)
+                picked.append(number)
+
+        self.save()
+        return [self.questions[n] for n in picked]
@@ -0,0 +1,265 @@
+# raid_report.py
+# Raid turn summaries and status pages whose size doesn't grow with the
+# party: aggregates, the top damage dealers and only the players whose state
+# changed this turn, with the full roster on paged buttons. Status reads
+# come from a read-only snapshot published once per turn, never from the
+# state a turn is in the middle of changing.
+
+import heapq
+import math
+import types
+import typing
+
+import discord
+
+from config import PREFIX, SLASH_ONLY
+from utils.tracing import traced
+
+HP_BAR_LENGTH = 12
+TOP_DEALERS = 5
+CHANGED_PREVIEW = 10  # players listed under "Changed This Turn"
+NAME_PREVIEW = 25  # names listed for deaths / AFK before "and N more"
+ROSTER_PAGE_SIZE = 25  # players per roster page; ~70 characters each
+ROSTER_VIEW_TIMEOUT = 120
+FIELD_VALUE_LIMIT = 1024
+DESCRIPTION_BUDGET = 2000  # keeps a whole summary well under Discord's 6000 per embed
+MORE_RESERVE = 24  # room kept for a trailing "…and N more"
+
+_BARS = tuple("█" * i + "░" * (HP_BAR_LENGTH - i) for i in range(HP_BAR_LENGTH + 1))
+
+
+def hp_bar(hp: int, max_hp: int) -> str:
+    if max_hp <= 0:
+        return ""
+    filled = int(round(hp / max_hp * HP_BAR_LENGTH))
+    return _BARS[max(0, min(HP_BAR_LENGTH, filled))]
+
+
+def clip_lines(lines: typing.Sequence[str], limit: int) -> str:
+    """Join as many lines as fit in `limit` characters, then "…and N more"."""
+    out, size = [], 0
+    for i, line in enumerate(lines):
+        reserve = 0 if i == len(lines) - 1 else MORE_RESERVE
+        if size + len(line) + 1 + reserve > limit:
+            out.append(f"…and {len(lines) - i} more")
+            break
+        out.append(line)
+        size += len(line) + 1
+    return "\n".join(out)
+
+
+def name_preview(names: typing.Sequence[str]) -> str:
+    preview = ", ".join(names[:NAME_PREVIEW])
+    return preview + (f" …and {len(names) - NAME_PREVIEW} more" if len(names) > NAME_PREVIEW else "")
+
+
+def player_line(p: dict, delta: typing.Optional[int] = None) -> str:
+    status = "💀" if not p["alive"] else "❤️"
+    line = f"{status} **{p['name']}** — {hp_bar(p['hp'], p['max_hp'])} {p['hp']}/{p['max_hp']}"
+    return f"{line} ({delta:+})" if delta else line
+
+
+def boss_line(boss: dict) -> str:
+    return f"{hp_bar(boss['hp'], boss['max_hp'])} {boss['hp']:,}/{boss['max_hp']:,}"
+
+
+def hp_distribution(players: typing.Iterable[dict]) -> str:
+    """Party health in buckets: >75%, 50–75%, 25–50%, ≤25%, defeated."""
+    buckets = [0] * 5
+    for p in players:
+        if not p["alive"]:
+            buckets[4] += 1
+            continue
+        ratio = p["hp"] / p["max_hp"] if p["max_hp"] else 0
+        buckets[0 if ratio > 0.75 else 1 if ratio > 0.5 else 2 if ratio > 0.25 else 3] += 1
+    healthy, hurt, wounded, critical, dead = buckets
+    return (
+        f"🟩 >75% **{healthy}** · 🟨 50–75% **{hurt}** · 🟧 25–50% **{wounded}**\n"
+        f"🟥 ≤25% **{critical}** · 💀 **{dead}**"
+    )
+
+
+def top_dealers(players: dict[int, dict], damage: dict[int, int], limit: int = TOP_DEALERS) -> str:
+    best = heapq.nlargest(limit, damage.items(), key=lambda item: item[1])
+    lines = [f"{rank}. **{players[pid]['name']}** — {amount:,}" for rank, (pid, amount) in enumerate(best, 1) if amount > 0]
+    return "\n".join(lines) or "(no damage)"
+
+
+def usage(command: str) -> str:
+    """How to type `command` here: with the prefix, or as a slash command in slash-only mode."""
+    return f"{'/' if SLASH_ONLY else PREFIX}{command}"
+
+
+class TurnReport:
+    """
+    What happened in one raid turn, filled in while it resolves. Player HP is
+    snapshotted at the start so the summary can list only who changed.
+    """
+
+    def __init__(self, turn: int, players: dict[int, dict]):
+        self.turn = turn
+        self.before = {pid: (p["hp"], p["alive"]) for pid, p in players.items()}
+        self.damage: dict[int, int] = {}
+        self.total_damage = 0
+        self.healers = 0
+        self.healed = 0
+        self.defenders = 0
+        self.phase: typing.Optional[str] = None
+        self.boss_hits: list[str] = []
+        self.afk: list[str] = []
+
+    def attack(self, pid: int, amount: int):
+        self.damage[pid] = self.damage.get(pid, 0) + amount
+        self.total_damage += amount
+
+    def heal(self, amount: int):
+        self.healers += 1
+        self.healed += amount
+
+    @traced("render")
+    def render(self, boss: dict, players: dict[int, dict]) -> discord.Embed:
+        changed, fallen = [], []
+        for pid, p in players.items():
+            hp, alive = self.before.get(pid, (p["hp"], p["alive"]))
+            if p["hp"] != hp or p["alive"] != alive:
+                changed.append((p["hp"] - hp, pid))
+                if alive and not p["alive"]:
+                    fallen.append(p["name"])
+
+        lines = []
+        if self.total_damage > 0:
+            lines.append(f"🔥 Players dealt **{self.total_damage:,}** total damage to **{boss['name']}**.")
+        if self.healers:
+            lines.append(f"💉 **{self.healers}** players healed for **{self.healed:,}** HP in total.")
+        if self.defenders:
+            lines.append(f"🛡️ **{self.defenders}** players defended.")
+        if self.phase:
+            lines.append(f"🔥 **{boss['name']}** is {self.phase}")
+        lines.extend(self.boss_hits)
+        if fallen:
+            lines.append(f"💀 **Fell this turn:** {name_preview(fallen)}")
+        if self.afk:
+            lines.append(f"⏳ **Skipped Turn (AFK penalty):** {name_preview(self.afk)} — They took damage!")
+
+        summary = discord.Embed(title=f"🔔 Turn {self.turn} Results", color=discord.Color.dark_teal())
+        summary.description = clip_lines(lines, DESCRIPTION_BUDGET) if lines else "No actions this turn."
+        summary.add_field(name=f"Boss: {boss['name']}", value=boss_line(boss), inline=False)
+        if self.damage:
+            summary.add_field(name="Top Damage", value=top_dealers(players, self.damage), inline=True)
+        alive = sum(1 for p in players.values() if p["alive"])
+        summary.add_field(name=f"Party — {alive}/{len(players)} alive", value=hp_distribution(players.values()), inline=True)
+        if changed:
+            # biggest losses first (deaths included), then heals
+            shown = heapq.nsmallest(CHANGED_PREVIEW, changed)
+            rows = [player_line(players[pid], delta) for delta, pid in shown]
+            if len(changed) > len(shown):
+                rows.append(f"…and {len(changed) - len(shown)} more")
+            summary.add_field(name="Changed This Turn", value=clip_lines(rows, FIELD_VALUE_LIMIT), inline=False)
+        summary.set_footer(text=f"Full roster: {usage('raidstatus')}")
+        return summary
+
+
+class RaidSnapshot:
+    """
+    Read-only copy of a raid's boss and players, published by the turn engine
+    between turns. Readers use whichever snapshot is current without locking;
+    a new turn's changes only show up once it publishes the next one. Player
+    records that haven't changed since the previous snapshot are shared with
+    it instead of being copied again.
+    """
+
+    __slots__ = ("turn", "boss", "players", "order", "_copies")
+
+    def __init__(self, turn: int, boss, players, order: tuple[int, ...], copies: dict[int, dict]):
+        self.turn = turn
+        self.boss: typing.Optional[typing.Mapping] = boss
+        self.players: typing.Mapping[int, typing.Mapping] = players
+        self.order = order
+        self._copies = copies  # private copies behind the read-only player views
+
+    @classmethod
+    def publish(
+        cls,
+        turn: int,
+        boss: typing.Optional[dict],
+        players: dict[int, dict],
+        order: list[int],
+        previous: typing.Optional["RaidSnapshot"] = None,
+    ) -> "RaidSnapshot":
+        old_copies = previous._copies if previous else {}
+        old_views = previous.players if previous else {}
+        copies, views = {}, {}
+        for pid, p in players.items():
+            copy = old_copies.get(pid)
+            if copy is not None and copy == p:
+                copies[pid], views[pid] = copy, old_views[pid]
+            else:
+                copies[pid] = copy = dict(p)
+                views[pid] = types.MappingProxyType(copy)
+        return cls(
+            turn,
+            types.MappingProxyType(dict(boss)) if boss else None,
+            types.MappingProxyType(views),
+            tuple(order),
+            copies,
+        )
+
+
+class RosterPages(discord.ui.View):
+    """
+    Raid status with the roster split over pages. Each page is rendered from
+    the raid's latest snapshot when shown, so paging later shows current HP.
+    """
+
+    def __init__(self, latest: typing.Callable[[], typing.Optional[RaidSnapshot]]):
+        super().__init__(timeout=ROSTER_VIEW_TIMEOUT)
+        self.latest = latest
+        self.snapshot = latest()
+        self.index = 0
+        self.message: typing.Optional[discord.Message] = None
+
+    @property
+    def page_count(self) -> int:
+        return max(1, math.ceil(len(self.snapshot.order) / ROSTER_PAGE_SIZE))
+
+    @traced("render")
+    def page(self, index: int) -> discord.Embed:
+        # the raid may have ended since; keep showing how it stood
+        self.snapshot = self.latest() or self.snapshot
+        boss, players, order = self.snapshot.boss, self.snapshot.players, self.snapshot.order
+        self.index = index % self.page_count
+        start = self.index * ROSTER_PAGE_SIZE
+        rows = [player_line(players[pid]) for pid in order[start:start + ROSTER_PAGE_SIZE] if pid in players]
+
+        embed = discord.Embed(title="🛡️ Raid Status", color=discord.Color.blue())
+        embed.description = clip_lines(rows, DESCRIPTION_BUDGET) if rows else "(none)"
+        if boss:
+            embed.add_field(name=f"Boss: {boss['name']}", value=f"HP: {boss_line(boss)}", inline=False)
+        damage = {pid: p["damage"] for pid, p in players.items()}
+        if any(damage.values()):
+            embed.add_field(name="Top Damage (raid)", value=top_dealers(players, damage), inline=True)
+        alive = sum(1 for p in players.values() if p["alive"])
+        embed.add_field(name=f"Party — {alive}/{len(players)} alive", value=hp_distribution(players.values()), inline=True)
+        footer = f"Players {start + 1 if rows else 0}–{start + len(rows)} of {len(order)} · Page {self.index + 1}/{self.page_count}"
+        if self.snapshot.turn:
+            footer += f" · as of turn {self.snapshot.turn}"
+        embed.set_footer(text=footer)
+        return embed
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        await interaction.response.edit_message(embed=self.page(index), view=self)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index - 1)
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
+
+    async def on_timeout(self):
+        if self.message:
+            try:
+                await self.message.edit(view=None)
+            except discord.HTTPException:
+                pass
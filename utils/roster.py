@@ -0,0 +1,147 @@
+# roster.py
+# Join phase tracking with one periodically-edited roster message,
+# instead of one channel message per joiner.
+
+import asyncio
+import typing
+import discord
+
+from config import SLASH_ONLY
+from utils.tracing import traced
+
+JOIN_EMOJI = "✅"
+ROSTER_REFRESH = 3.0  # seconds between roster message edits
+RECENT_PREVIEW = 10  # recent joiners shown on the roster
+
+
+class JoinButton(discord.ui.View):
+    """Join button on the roster message; works without the reactions intent."""
+
+    def __init__(self, roster: "JoinRoster"):
+        super().__init__(timeout=None)
+        self.roster = roster
+
+    @discord.ui.button(label="Join", emoji=JOIN_EMOJI, style=discord.ButtonStyle.success)
+    async def join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if not self.roster.open:
+            await interaction.response.send_message("⌛ The join window has closed.", ephemeral=True)
+        elif self.roster.on_join(interaction.user):
+            await interaction.response.send_message("✅ You're in!", ephemeral=True)
+        else:
+            await interaction.response.send_message("✅ You're already signed up.", ephemeral=True)
+
+
+class JoinRoster:
+    """
+    Members are kept in an insertion-ordered dict (user_id -> user), so joins
+    and duplicate checks are O(1). The owning cog feeds raw reaction events
+    for `message_id` (and any join commands) into `add`. Presses of the
+    roster's Join button go through `on_join`, which defaults to `add`.
+    """
+
+    def __init__(
+        self,
+        channel: discord.abc.Messageable,
+        title: str,
+        ends_at: typing.Optional[float] = None,
+        color: discord.Color = discord.Color.blurple(),
+        on_join: typing.Optional[typing.Callable[[discord.abc.User], bool]] = None,
+    ):
+        self.channel = channel
+        self.title = title
+        self.ends_at = ends_at  # loop time the join window closes, if known
+        self.color = color
+        self.on_join = on_join or self.add
+        self.react = False
+        self.message_id: typing.Optional[int] = None
+        self.members: dict[int, discord.abc.User] = {}
+        self.open = False
+        self._roster_msg: typing.Optional[discord.Message] = None
+        self._dirty = False
+        self._refresher: typing.Optional[asyncio.Task] = None
+        self._button: typing.Optional[JoinButton] = None
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self.members
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    async def start(self, join_message: discord.Message, react: bool = not SLASH_ONLY):
+        """Attach to the announcement message and post the roster message."""
+        self.message_id = join_message.id
+        self.open = True
+        self.react = react
+        if react:
+            try:
+                await join_message.add_reaction(JOIN_EMOJI)
+            except discord.HTTPException:
+                pass
+        self._button = JoinButton(self)
+        self._roster_msg = await self.channel.send(embed=self.render(), view=self._button)
+        self._refresher = asyncio.create_task(self._refresh_loop())
+
+    def add(self, user: discord.abc.User) -> bool:
+        """Returns True if the user is newly added."""
+        if not self.open or user.bot or user.id in self.members:
+            return False
+        self.members[user.id] = user
+        self._dirty = True
+        return True
+
+    def matches(self, payload: discord.RawReactionActionEvent) -> bool:
+        return (
+            self.open
+            and payload.message_id == self.message_id
+            and str(payload.emoji) == JOIN_EMOJI
+            and payload.member is not None
+        )
+
+    @traced("render")
+    def render(self, final: bool = False) -> discord.Embed:
+        count = len(self.members)
+        embed = discord.Embed(
+            title=f"📋 {self.title} — {count} joined",
+            color=self.color,
+        )
+        recent = list(self.members.values())[-RECENT_PREVIEW:]
+        if recent:
+            names = ", ".join(getattr(u, "display_name", u.name) for u in reversed(recent))
+            embed.add_field(name="Recent joiners", value=names[:1024], inline=False)
+        how = f"Press Join or react with {JOIN_EMOJI} to join" if self.react else "Press Join to join"
+        if final:
+            embed.set_footer(text="Join window closed.")
+        elif self.ends_at is not None:
+            remaining = max(0, int(self.ends_at - asyncio.get_running_loop().time()))
+            embed.set_footer(text=f"{how} — {remaining}s left.")
+        else:
+            embed.set_footer(text=f"{how}.")
+        return embed
+
+    async def _refresh_loop(self):
+        try:
+            while self.open:
+                await asyncio.sleep(ROSTER_REFRESH)
+                if self._dirty or self.ends_at is not None:
+                    self._dirty = False
+                    await self._edit(self.render())
+        except asyncio.CancelledError:
+            return
+
+    async def _edit(self, embed: discord.Embed, **kwargs):
+        if self._roster_msg is None:
+            return
+        try:
+            await self._roster_msg.edit(embed=embed, **kwargs)
+        except discord.HTTPException:
+            pass
+
+    async def close(self) -> list[discord.abc.User]:
+        """Stop accepting joins, post the final roster and return members in join order."""
+        self.open = False
+        if self._refresher and not self._refresher.done():
+            self._refresher.cancel()
+        if self._button is not None:
+            self._button.stop()
+        await self._edit(self.render(final=True), view=None)
+        return list(self.members.values())
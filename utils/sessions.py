@@ -0,0 +1,101 @@
+# sessions.py
+# Game state keyed by (guild_id, channel_id) so every channel can run its own
+# independent game of each kind.
+
+import asyncio
+import itertools
+import logging
+import typing
+
+from utils.log import fields
+from utils.tracing import span
+
+log = logging.getLogger(__name__)
+
+_session_ids = itertools.count(1)
+
+
+def session_key(channel) -> tuple[typing.Optional[int], int]:
+    guild = getattr(channel, "guild", None)
+    return (guild.id if guild else None, channel.id)
+
+
+class SessionLock(asyncio.Lock):
+    """asyncio.Lock whose waits show up in command traces."""
+
+    async def acquire(self):
+        if not self.locked():
+            return await super().acquire()
+        with span("lock wait", "lock"):
+            return await super().acquire()
+
+
+class GameSession:
+    """
+    Base class for one running game in one channel. Cogs subclass it and add
+    their own state; `lock` serializes work inside this session only.
+    """
+
+    def __init__(self, guild_id: typing.Optional[int], channel_id: int, started_by: int):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.started_by = started_by
+        self.id = next(_session_ids)  # process-unique, ties log records to one game
+        self.lock = SessionLock()
+
+    @property
+    def key(self) -> tuple[typing.Optional[int], int]:
+        return (self.guild_id, self.channel_id)
+
+
+class SessionManager:
+    """Holds at most one session per channel for a single game type."""
+
+    def __init__(self, factory: typing.Callable[..., GameSession], game: str):
+        self.factory = factory
+        self.game = game
+        self.sessions: dict[tuple[typing.Optional[int], int], GameSession] = {}
+        self.completed = 0  # sessions ended since startup
+
+    def get(self, channel) -> typing.Optional[GameSession]:
+        return self.sessions.get(session_key(channel))
+
+    def lookup(self, guild_id: typing.Optional[int], channel_id: int) -> typing.Optional[GameSession]:
+        """Same as get(), for raw gateway payloads that only carry ids."""
+        return self.sessions.get((guild_id, channel_id))
+
+    def start(self, channel, started_by: int, **kwargs) -> typing.Optional[GameSession]:
+        """
+        Create a session for the channel, or return None if one is already
+        running. There is no await between the check and the insert, so two
+        start commands racing in the same channel cannot both succeed.
+        """
+        key = session_key(channel)
+        if key in self.sessions:
+            return None
+        session = self.factory(key[0], key[1], started_by, **kwargs)
+        self.sessions[key] = session
+        log.info("session started", extra=fields(session, self.game, started_by=started_by))
+        return session
+
+    def end(self, channel_or_session) -> typing.Optional[GameSession]:
+        if isinstance(channel_or_session, GameSession):
+            key = channel_or_session.key
+            if self.sessions.get(key) is not channel_or_session:
+                return None
+        else:
+            key = session_key(channel_or_session)
+        session = self.sessions.pop(key, None)
+        if session is not None:
+            self.completed += 1
+            log.info("session ended", extra=fields(session, self.game))
+        return session
+
+    def in_guild(self, guild_id: int) -> list[GameSession]:
+        return [s for s in self.sessions.values() if s.guild_id == guild_id]
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(list(self.sessions.values()))
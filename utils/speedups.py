@@ -0,0 +1,92 @@
+# speedups.py
+# Optional accelerated backends. With uvloop installed the bot runs on
+# uvloop's event loop, and with orjson installed every JSON file and log line
+# goes through orjson. Neither is a requirement: when one is missing, or is
+# turned off with BOT_EVENT_LOOP=asyncio / BOT_JSON=json, the standard
+# library is used. Anything that reads or writes JSON imports json_load /
+# json_dump (and friends) from here rather than the json module, so both
+# codecs produce the same text: UTF-8 rather than \u escapes, and a two
+# space indent when one is asked for. python -m bench.backends compares
+# them.
+
+import asyncio
+import json
+import typing
+
+from config import EVENT_LOOP, JSON_CODEC
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Raised by json_load/json_loads on bad input; orjson's own error is a subclass
+JSONDecodeError = json.JSONDecodeError
+
+# (setting, requested backend) that couldn't be used; logged once logging is set up
+fallbacks: list[tuple[str, str]] = []
+
+
+def _pick(setting: str, requested: str, fast: str, module, standard: str) -> str:
+    if requested == "auto":
+        return fast if module is not None else standard
+    if requested == fast and module is None:
+        fallbacks.append((setting, requested))
+        return standard
+    if requested not in (fast, standard):
+        fallbacks.append((setting, requested))
+        return standard
+    return requested
+
+
+LOOP_BACKEND = _pick("BOT_EVENT_LOOP", EVENT_LOOP, "uvloop", uvloop, "asyncio")
+JSON_BACKEND = _pick("BOT_JSON", JSON_CODEC, "orjson", orjson, "json")
+
+
+def describe() -> dict[str, str]:
+    """Backends in use, for the startup log line."""
+    return {"loop": LOOP_BACKEND, "json": JSON_BACKEND}
+
+
+# ---------- Event loop ----------
+def run(main: typing.Coroutine):
+    """asyncio.run on the chosen event loop."""
+    if LOOP_BACKEND == "uvloop":
+        return uvloop.run(main)
+    return asyncio.run(main)
+
+
+# ---------- JSON ----------
+def _std_dumps(obj, indent: bool, default) -> str:
+    return json.dumps(obj, indent=2 if indent else None, default=default, ensure_ascii=False)
+
+
+def json_dumps(obj, indent: bool = False, default: typing.Optional[typing.Callable] = None) -> str:
+    if JSON_BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except orjson.JSONEncodeError:
+            # integers past 64 bits, or anything else orjson refuses that json takes
+            pass
+    return _std_dumps(obj, indent, default)
+
+
+def json_loads(data: typing.Union[str, bytes]):
+    if JSON_BACKEND == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_load(f: typing.IO):
+    """Parse an open file (text or binary) in one read."""
+    return json_loads(f.read())
+
+
+def json_dump(obj, f: typing.IO[str], indent: bool = False):
+    f.write(json_dumps(obj, indent=indent))
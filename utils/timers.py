@@ -0,0 +1,231 @@
+# timers.py
+# One scheduler for every game deadline and cadence. Timers live in a heap
+# owned by a single runner task, which keeps exactly one loop wakeup armed
+# for the earliest deadline. Cancelling is O(1) (timers are skipped lazily).
+
+import asyncio
+import heapq
+import itertools
+import logging
+import typing
+
+log = logging.getLogger(__name__)
+
+COMPACT_MIN = 64  # rebuild the heap once this many cancelled timers pile up
+
+
+class Timer:
+    __slots__ = ("when", "name", "callback", "args", "interval", "cancelled", "seq", "_scheduler")
+
+    def __init__(self, scheduler, when, callback, args, name, interval, seq):
+        self._scheduler = scheduler
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.name = name
+        self.interval = interval
+        self.cancelled = False
+        self.seq = seq
+
+    def __lt__(self, other: "Timer") -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self._scheduler._on_cancel()
+
+    def remaining(self) -> float:
+        return max(0.0, self.when - asyncio.get_running_loop().time())
+
+
+class Deadline:
+    """
+    Async context manager that cancels the enclosing task at a deadline and
+    raises asyncio.TimeoutError instead. `reschedule` moves the deadline.
+    """
+
+    def __init__(self, scheduler: "Scheduler", delay: float, name: str):
+        self._scheduler = scheduler
+        self._delay = delay
+        self._name = name
+        self._task: typing.Optional[asyncio.Task] = None
+        self._timer: typing.Optional[Timer] = None
+        self.expired = False
+
+    def _expire(self):
+        self.expired = True
+        self._task.cancel()
+
+    def remaining(self) -> float:
+        return self._timer.remaining() if self._timer is not None and not self.expired else 0.0
+
+    def reschedule(self, delay: float):
+        if self._timer is not None and not self.expired:
+            self._timer.cancel()
+            self._timer = self._scheduler.call_later(delay, self._expire, name=self._name)
+
+    async def __aenter__(self) -> "Deadline":
+        self._task = asyncio.current_task()
+        self._timer = self._scheduler.call_later(self._delay, self._expire, name=self._name)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._timer.cancel()
+        if self.expired and exc_type is asyncio.CancelledError:
+            if hasattr(self._task, "uncancel"):
+                self._task.uncancel()
+            raise asyncio.TimeoutError
+        return False
+
+
+class Scheduler:
+    def __init__(self):
+        self._heap: list[Timer] = []
+        self._seq = itertools.count()
+        self._cancelled = 0
+        self._runner: typing.Optional[asyncio.Task] = None
+        self._waiter: typing.Optional[asyncio.Future] = None
+        self._callbacks: set[asyncio.Task] = set()  # coroutine callbacks still running
+        self.closed = False
+
+    # ---------- Scheduling ----------
+    def call_at(
+        self,
+        when: float,
+        callback: typing.Callable,
+        *args,
+        name: str = "timer",
+        interval: typing.Optional[float] = None,
+    ) -> Timer:
+        """Run callback(*args) at loop time `when`. Coroutine results are run as tasks."""
+        timer = Timer(self, when, callback, args, name, interval, next(self._seq))
+        if self.closed:
+            timer.cancelled = True  # never fires; sleeps on it never wake
+            return timer
+        heapq.heappush(self._heap, timer)
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.get_running_loop().create_task(self._run())
+        elif self._heap[0] is timer:
+            self._wake()
+        return timer
+
+    def call_later(self, delay: float, callback: typing.Callable, *args, name: str = "timer") -> Timer:
+        return self.call_at(asyncio.get_running_loop().time() + delay, callback, *args, name=name)
+
+    def call_every(
+        self,
+        interval: float,
+        callback: typing.Callable,
+        *args,
+        name: str = "timer",
+        first: float = 0.0,
+    ) -> Timer:
+        """
+        Repeat every `interval` seconds on a fixed grid (first + k * interval),
+        so slow callbacks or a busy loop don't make the cadence drift.
+        """
+        start = asyncio.get_running_loop().time() + first
+        return self.call_at(start, callback, *args, name=name, interval=interval)
+
+    async def sleep(self, delay: float, name: str = "sleep"):
+        await self.sleep_until(asyncio.get_running_loop().time() + delay, name=name)
+
+    async def sleep_until(self, when: float, name: str = "sleep"):
+        future = asyncio.get_running_loop().create_future()
+        timer = self.call_at(when, _resolve, future, name=name)
+        try:
+            await future
+        finally:
+            timer.cancel()
+
+    def timeout(self, delay: float, name: str = "timeout") -> Deadline:
+        return Deadline(self, delay, name)
+
+    def close(self):
+        """Cancel every timer and running callback; nothing scheduled from now on fires."""
+        self.closed = True
+        for timer in self._heap:
+            timer.cancelled = True
+        self._heap.clear()
+        self._cancelled = 0
+        if self._runner is not None:
+            self._runner.cancel()
+        for task in list(self._callbacks):
+            task.cancel()
+
+    # ---------- Inspection ----------
+    def pending(self) -> list[Timer]:
+        return sorted(t for t in self._heap if not t.cancelled)
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    # ---------- Runner ----------
+    def _on_cancel(self):
+        self._cancelled += 1
+        if self._cancelled >= COMPACT_MIN and self._cancelled * 2 > len(self._heap):
+            self._heap = [t for t in self._heap if not t.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def _wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            while self._heap and (self._heap[0].cancelled or self._heap[0].when <= now):
+                timer = heapq.heappop(self._heap)
+                if timer.cancelled:
+                    self._cancelled = max(0, self._cancelled - 1)
+                    continue
+                if timer.interval:
+                    timer.when += timer.interval
+                    while timer.when <= now:  # skip ticks missed while the loop was blocked
+                        timer.when += timer.interval
+                    heapq.heappush(self._heap, timer)
+                else:
+                    timer.cancelled = True  # fired; a later cancel() is a no-op
+                self._fire(timer)
+
+            self._waiter = loop.create_future()
+            wakeup = loop.call_at(self._heap[0].when, self._wake) if self._heap else None
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+                if wakeup is not None:
+                    wakeup.cancel()
+
+    def _fire(self, timer: Timer):
+        try:
+            result = timer.callback(*timer.args)
+        except Exception:
+            log.exception("timer callback failed", extra={"timer": timer.name})
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.get_running_loop().create_task(result)
+            self._callbacks.add(task)
+            task.add_done_callback(lambda task: self._finished(task, timer.name))
+
+    def _finished(self, task: asyncio.Task, name: str):
+        self._callbacks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            log.error("timer callback failed", exc_info=task.exception(), extra={"timer": name})
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def get_scheduler(bot) -> Scheduler:
+    """One scheduler shared by every cog on the bot."""
+    scheduler = getattr(bot, "timers", None)
+    if scheduler is None:
+        scheduler = Scheduler()
+        bot.timers = scheduler
+    return scheduler
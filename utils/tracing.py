@@ -0,0 +1,440 @@
+# tracing.py
+# Per-invocation latency traces. With BOT_TRACE_FILE set, every listener,
+# prefix or slash command, button click and modal submit runs inside a trace.
+# Each trace records spans for checks, data access, rendering, session lock
+# waits and every REST call, and each call is split into its rate limit wait
+# and the send itself. Traces go to that file in Chrome Trace Event Format
+# (open it in ui.perfetto.dev or chrome://tracing): one process per
+# invocation, one thread row per task, with the time to the first response
+# in the root span's args. Spans are recorded as plain tuples; finished
+# traces are queued, and a background thread turns them into trace events
+# and writes them, like log records. Each process starts its own file: if
+# the path already holds an earlier run, the start time and pid are added to
+# the name, so trace ids (pids in the file) never collide. Without
+# BOT_TRACE_FILE no hooks are installed, and span() is a single context
+# variable lookup.
+#
+# The hooks wrap discord.py internals (see missing_internals); install()
+# checks for them first and leaves tracing off, with a warning, when a
+# discord.py upgrade has moved one. uninstall() puts every original back.
+#
+# Spans only count while their invocation is running. Work it leaves behind
+# (timers, background tasks) inherits the context but is not recorded once
+# the invocation has returned.
+
+import asyncio
+import atexit
+import contextlib
+import contextvars
+import functools
+import inspect
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+import typing
+
+import discord
+from discord.ext import commands
+from discord.webhook.async_ import AsyncWebhookAdapter
+
+from config import TRACE_FILE
+from utils.speedups import json_dumps
+
+log = logging.getLogger(__name__)
+
+TRACE_MIN_DURATION = 0.005  # seconds; quicker invocations that made no REST call aren't written
+WAIT_MIN_DURATION = 0.0005  # rate limit waits shorter than this are just bookkeeping, not spans
+QUEUE_SIZE = 10000  # finished traces buffered for the writer thread before new ones are dropped
+WRITE_INTERVAL = 0.25  # seconds the writer collects traces for before formatting them in one go
+
+_trace_ids = itertools.count(1)
+_UNSET = object()  # marks an attribute install() added rather than replaced
+
+
+def _task_id() -> int:
+    try:
+        return id(asyncio.current_task())
+    except RuntimeError:
+        return 0
+
+
+class Trace:
+    """
+    One invocation: its spans so far and when it first answered Discord.
+    Each span is (name, cat, start, end, args, task id); the writer thread
+    turns them into trace events.
+    """
+
+    __slots__ = ("id", "name", "start", "events", "first_response", "rest_calls", "open")
+
+    def __init__(self, name: str):
+        self.id = next(_trace_ids)
+        self.name = name
+        self.start = time.perf_counter()
+        self.events: list[tuple] = []
+        self.first_response: typing.Optional[float] = None
+        self.rest_calls = 0
+        self.open = True
+
+
+class Span:
+    """A timed block inside a trace; entering it makes it the parent of spans opened within."""
+
+    __slots__ = ("trace", "name", "cat", "start", "args", "mark", "_token")
+
+    def __init__(self, trace: Trace, name: str, cat: str, args: typing.Optional[dict]):
+        self.trace = trace
+        self.name = name
+        self.cat = cat
+        self.start = time.perf_counter()
+        self.args = args
+        self.mark = self.start  # REST calls: end of the last send (or the call's start)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        trace = self.trace
+        if trace.open:
+            trace.events.append((self.name, self.cat, self.start, time.perf_counter(), self.args, _task_id()))
+        return False
+
+
+class _RootSpan(Span):
+    """The span an invocation runs in; closing it closes the trace and queues it for writing."""
+
+    __slots__ = ("_tracer",)
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str):
+        super().__init__(Trace(name), name, cat, None)
+        self._tracer = tracer
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        end = time.perf_counter()
+        trace = self.trace
+        trace.open = False
+        if trace.rest_calls or end - trace.start >= TRACE_MIN_DURATION:
+            # the root span goes last; _format adds its args
+            trace.events.append((trace.name, self.cat, trace.start, end, None, _task_id()))
+            self._tracer._submit(trace)
+        return False
+
+
+_current: contextvars.ContextVar[typing.Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+_NO_SPAN = contextlib.nullcontext()  # what span() returns outside a trace
+
+
+def _format(trace: Trace) -> str:
+    """A closed trace as Chrome trace events, one per line; runs on the writer thread."""
+    rows: dict[int, int] = {}  # task id -> thread row, numbered in order of appearance
+    events = [{"name": "process_name", "ph": "M", "pid": trace.id, "args": {"name": trace.name}}]
+    for name, cat, start, end, args, task in trace.events:
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round(start * 1_000_000),
+            "dur": round((end - start) * 1_000_000),
+            "pid": trace.id,
+            "tid": rows.setdefault(task, len(rows) + 1),
+        }
+        if args:
+            event["args"] = args
+        events.append(event)
+    root = events[-1]
+    root["args"] = {"total_ms": round(root["dur"] / 1000, 2), "rest_calls": trace.rest_calls}
+    if trace.first_response is not None:
+        root["args"]["first_response_ms"] = round(trace.first_response * 1000, 2)
+    return ",\n".join(json_dumps(event) for event in events) + ",\n"
+
+
+def span(name: str, cat: str = "app", **args) -> typing.ContextManager[typing.Optional[Span]]:
+    """Time a block as a child of whatever is being traced; a no-op (binding None) outside a trace."""
+    parent = _current.get()
+    if parent is None or not parent.trace.open:
+        return _NO_SPAN
+    return Span(parent.trace, name, cat, args)
+
+
+def traced(cat: str, name: typing.Optional[str] = None):
+    """Decorator form of span() for a function or coroutine, named after it by default."""
+
+    def decorate(fn):
+        label = name or fn.__qualname__
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with span(label, cat):
+                    return await fn(*args, **kwargs)
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with span(label, cat):
+                    return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+class _TimedRequest:
+    """aiohttp's request context manager, timed from the call to the end of the response body."""
+
+    __slots__ = ("_request", "_parent", "_start", "_method")
+
+    def __init__(self, request, parent: Span, method: str):
+        self._request = request
+        self._parent = parent
+        self._method = method
+        self._start = time.perf_counter()
+
+    async def __aenter__(self):
+        return await self._request.__aenter__()
+
+    async def __aexit__(self, *exc):
+        try:
+            return await self._request.__aexit__(*exc)
+        finally:
+            parent, trace, end = self._parent, self._parent.trace, time.perf_counter()
+            if trace.open:
+                trace.events.append(("send", "http", self._start, end, None, _task_id()))
+                if self._method != "GET" and trace.first_response is None:
+                    trace.first_response = end - trace.start
+            parent.mark = end
+
+
+def _fresh_path(path: str) -> str:
+    """`path`, or a sibling named after this run if an earlier one already wrote there."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}{ext}"
+
+
+def _defines(cls, attr: str) -> bool:
+    return any(attr in klass.__dict__ for klass in cls.__mro__)
+
+
+def missing_internals(bot: commands.Bot) -> list[str]:
+    """discord.py internals the tracing hooks wrap that this version doesn't have."""
+    session = getattr(bot.http, "_HTTPClient__session", None)
+    checks = {
+        "Client._run_event": callable(getattr(bot, "_run_event", None)),
+        "CommandTree._call": callable(getattr(bot.tree, "_call", None)),
+        "HTTPClient.__session": callable(getattr(session, "request", None)),
+        "View._scheduled_task": _defines(discord.ui.View, "_scheduled_task"),
+        "Modal._scheduled_task": _defines(discord.ui.Modal, "_scheduled_task"),
+        "AsyncWebhookAdapter.request": _defines(AsyncWebhookAdapter, "request"),
+    }
+    return [name for name, present in checks.items() if not present]
+
+
+class Tracer:
+    def __init__(self, path: str = TRACE_FILE):
+        self.path = path
+        self.installed = False
+        self.written = 0
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+        self._thread: typing.Optional[threading.Thread] = None
+        self._stopped = False
+        self._patches: list[tuple[object, str, object]] = []  # (target, attribute, original or _UNSET)
+
+    # ---------- Hooks ----------
+    def install(self, bot: commands.Bot) -> bool:
+        """
+        Call from setup_hook: the HTTP session exists by then and no event has
+        been dispatched yet. Returns False, leaving discord.py untouched, if
+        an internal the hooks need is missing.
+        """
+        if self.installed:
+            return True
+        missing = missing_internals(bot)
+        if missing:
+            log.warning("tracing unavailable on this discord.py", extra={"missing": missing, "discord_py": discord.__version__})
+            return False
+        self.installed = True
+        tracer = self
+
+        run_event = bot._run_event
+
+        async def traced_event(coro, event_name, *args, **kwargs):
+            name = getattr(coro, "__qualname__", event_name)
+            with tracer.trace(f"{event_name} {name}", "event"):
+                await run_event(coro, event_name, *args, **kwargs)
+
+        self._patch(bot, "_run_event", traced_event)
+
+        invoke = bot.invoke
+
+        async def traced_invoke(ctx):
+            # prefix commands run inside Bot.on_message's trace; name it after the command
+            current = _current.get()
+            if current is not None and ctx.command is not None:
+                current.trace.name = f"{ctx.prefix}{ctx.command.qualified_name}"
+            with span(f"command {ctx.command.qualified_name}" if ctx.command else "command", "command"):
+                await invoke(ctx)
+
+        self._patch(bot, "invoke", traced_invoke)
+
+        tree_call = bot.tree._call
+
+        async def traced_call(interaction):
+            command = (interaction.data or {}).get("name", "?")
+            with tracer.trace(f"/{command}", "interaction"):
+                await tree_call(interaction)
+
+        self._patch(bot.tree, "_call", traced_call)
+
+        self._wrap(commands.Command, "prepare", self._checks)
+        self._wrap(discord.ui.View, "_scheduled_task", self._component)
+        self._wrap(discord.ui.Modal, "_scheduled_task", self._modal)
+        self._wrap(AsyncWebhookAdapter, "request", self._rest)
+        self._patch(bot.http, "request", self._rest(bot.http.request))
+        session = bot.http._HTTPClient__session  # shared with interaction responses and webhooks
+        self._patch(session, "request", self._send(session.request))
+        log.info("tracing on", extra={"path": self.path})
+        return True
+
+    def uninstall(self):
+        """Put back everything install() replaced, newest first."""
+        while self._patches:
+            target, attr, original = self._patches.pop()
+            if original is _UNSET:
+                delattr(target, attr)  # the instance used its class's attribute before
+            else:
+                setattr(target, attr, original)
+        self.installed = False
+
+    def _patch(self, target, attr: str, replacement):
+        self._patches.append((target, attr, vars(target).get(attr, _UNSET)))
+        setattr(target, attr, replacement)
+
+    def _wrap(self, cls, attr: str, wrap):
+        """Patch `attr` where it is defined (View inherits _scheduled_task from a base class in recent discord.py)."""
+        owner = next(klass for klass in cls.__mro__ if attr in klass.__dict__)
+        self._patch(owner, attr, wrap(owner.__dict__[attr]))
+
+    @staticmethod
+    def _checks(prepare):
+        async def traced_prepare(command, ctx, /):
+            with span("checks", "check", command=command.qualified_name):
+                return await prepare(command, ctx)
+
+        return traced_prepare
+
+    def _component(self, scheduled_task):
+        tracer = self
+
+        async def traced_task(view, item, interaction):
+            label = getattr(item, "label", None) or getattr(item, "custom_id", None) or type(item).__name__
+            with tracer.trace(f"{type(view).__name__} {label}", "component"):
+                return await scheduled_task(view, item, interaction)
+
+        return traced_task
+
+    def _modal(self, scheduled_task):
+        tracer = self
+
+        async def traced_task(modal, interaction, *args):
+            with tracer.trace(f"{type(modal).__name__} {modal.title}", "modal"):
+                return await scheduled_task(modal, interaction, *args)
+
+        return traced_task
+
+    @staticmethod
+    def _rest(request):
+        """A REST call: discord.py's rate limiting plus however many sends it took."""
+
+        async def traced_request(*args, **kwargs):
+            route = next((a for a in args if isinstance(a, discord.http.Route)), None)
+            if route is None:
+                return await request(*args, **kwargs)
+            with span(f"{route.method} {route.path}", "http") as current:
+                if current is not None:
+                    current.trace.rest_calls += 1
+                return await request(*args, **kwargs)
+
+        return traced_request
+
+    @staticmethod
+    def _send(session_request):
+        def traced_send(method, url, *args, **kwargs):
+            current = _current.get()
+            if current is None or not current.trace.open:
+                return session_request(method, url, *args, **kwargs)
+            now = time.perf_counter()
+            trace = current.trace
+            if current.cat == "http" and now - current.mark >= WAIT_MIN_DURATION:
+                # lock waits, bucket sleeps and 429 retry sleeps since the last send
+                trace.events.append(("ratelimit wait", "ratelimit", current.mark, now, None, _task_id()))
+            return _TimedRequest(session_request(method, url, *args, **kwargs), current, method)
+
+        return traced_send
+
+    # ---------- Traces ----------
+    def trace(self, name: str, cat: str) -> Span:
+        """A root span for one invocation; nested invocations just become spans."""
+        parent = _current.get()
+        if parent is not None and parent.trace.open:
+            return Span(parent.trace, name, cat, None)
+        return _RootSpan(self, name, cat)
+
+    # ---------- Writer thread ----------
+    def _submit(self, trace: Trace):
+        """Hand a closed trace to the writer thread; never blocks the loop."""
+        if self._stopped:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._writer, name="trace-writer", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self):
+        """Write what is queued and stop the writer thread; later traces are discarded."""
+        self._stopped = True
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _writer(self):
+        self.path = _fresh_path(self.path)
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("[\n")  # the closing ] is optional in this format
+            while True:
+                # wake once per batch rather than once per trace, so the
+                # thread rarely competes with the event loop for the GIL
+                batch = [self._queue.get()]
+                if batch[0] is not None:
+                    time.sleep(WRITE_INTERVAL)
+                while batch[-1] is not None and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                traces = [trace for trace in batch if trace is not None]
+                # closed traces aren't touched by the loop any more
+                f.write("".join(_format(trace) for trace in traces))
+                f.flush()
+                self.written += len(traces)
+                if batch[-1] is None:
+                    return
+
+
+def get_tracer(bot) -> Tracer:
+    """One tracer per bot; installed by setup_hook when BOT_TRACE_FILE is set."""
+    tracer = getattr(bot, "tracer", None)
+    if tracer is None:
+        tracer = Tracer()
+        bot.tracer = tracer
+    return tracer
@@ -0,0 +1,150 @@
+# watchdog.py
+# Event loop lag watchdog. A loop task measures how late its own sleeps wake
+# up; a helper thread notices when that task stops beating and grabs the loop
+# thread's stack while it is still blocked, so stalls come with a call site.
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import typing
+
+log = logging.getLogger(__name__)
+
+TICK_INTERVAL = 0.25  # seconds between lag measurements
+LAG_THRESHOLD = 0.2  # lag (seconds) counted as a stall
+STACK_DEPTH = 8  # frames kept per offender
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Offender:
+    """One blocking call site and how much loop time it has cost."""
+
+    __slots__ = ("site", "stack", "count", "total", "worst")
+
+    def __init__(self, site: str, stack: list[str]):
+        self.site = site
+        self.stack = stack
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+
+def _frame_label(frame: traceback.FrameSummary) -> str:
+    path = frame.filename
+    if path.startswith(PROJECT_ROOT):
+        path = os.path.relpath(path, PROJECT_ROOT)
+    else:
+        path = os.path.basename(path)
+    return f"{path}:{frame.lineno} in {frame.name}"
+
+
+def _call_site(stack: traceback.StackSummary) -> str:
+    """Innermost frame of our own code, plus the library call it was blocked in."""
+    leaf = stack[-1]
+    for frame in reversed(stack):
+        if frame.filename.startswith(PROJECT_ROOT) and "site-packages" not in frame.filename:
+            site = _frame_label(frame)
+            return site if frame is leaf else f"{site} → {leaf.name}"
+    return _frame_label(leaf)
+
+
+class LoopWatchdog:
+    def __init__(self, interval: float = TICK_INTERVAL, threshold: float = LAG_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = 0.0  # latest measurement
+        self.max_lag = 0.0
+        self.ticks = 0
+        self.stalls = 0
+        self.offenders: dict[str, Offender] = {}
+        self._beat = time.monotonic()  # written by the loop task, read by the thread
+        self._captured: typing.Optional[traceback.StackSummary] = None
+        self._loop_thread: typing.Optional[int] = None
+        self._task: typing.Optional[asyncio.Task] = None
+        self._thread: typing.Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def reset(self):
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.offenders.clear()
+
+    def worst(self, limit: int) -> list[Offender]:
+        return sorted(self.offenders.values(), key=lambda o: o.total, reverse=True)[:limit]
+
+    # ---------- Loop side ----------
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._beat = time.monotonic()
+            captured, self._captured = self._captured, None
+
+            self.ticks += 1
+            self.lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if lag >= self.threshold:
+                self._record(lag, captured)
+
+    def _record(self, lag: float, stack: typing.Optional[traceback.StackSummary]):
+        self.stalls += 1
+        if stack:
+            site = _call_site(stack)
+            frames = [_frame_label(f) for f in stack[-STACK_DEPTH:]]
+        else:
+            site = "(not caught in the act)"
+            frames = []
+        offender = self.offenders.get(site)
+        if offender is None:
+            offender = self.offenders[site] = Offender(site, frames)
+        offender.count += 1
+        offender.total += lag
+        offender.worst = max(offender.worst, lag)
+        log.warning("event loop stalled", extra={"lag": round(lag, 3), "site": site})
+
+    # ---------- Watcher thread ----------
+    def _watch(self):
+        # The loop task beats every `interval`; a beat older than
+        # interval + threshold means the loop thread is stuck right now.
+        while not self._stop.wait(self.threshold / 2):
+            if self._captured is not None:
+                continue  # already have this stall's stack
+            if time.monotonic() - self._beat > self.interval + self.threshold:
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._captured = traceback.extract_stack(frame)
+
+
+def get_watchdog(bot) -> LoopWatchdog:
+    """One watchdog per bot; started by the Admin cog."""
+    watchdog = getattr(bot, "watchdog", None)
+    if watchdog is None:
+        watchdog = LoopWatchdog()
+        bot.watchdog = watchdog
+    return watchdog